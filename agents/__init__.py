@@ -3,6 +3,8 @@ AI Political Agents package for simulating historical figure debates.
 """
 
 from .base_agent import HistoricalAgent, PersonalityTraits, HistoricalContext, Ideology
+from .history import Transcript, ConversationHistory
+from .context_window import HistoryWindow, HistorySummarizer, ExtractiveSummarizer, LLMSummarizer, count_tokens
 from .hitler_agent import HitlerAgent
 from .gandhi_agent import GandhiAgent
 from .jinnah_agent import JinnahAgent
@@ -12,6 +14,13 @@ __all__ = [
     'PersonalityTraits', 
     'HistoricalContext',
     'Ideology',
+    'Transcript',
+    'ConversationHistory',
+    'HistoryWindow',
+    'HistorySummarizer',
+    'ExtractiveSummarizer',
+    'LLMSummarizer',
+    'count_tokens',
     'HitlerAgent',
     'GandhiAgent', 
     'JinnahAgent'
@@ -36,6 +36,9 @@ class GenericAgent(HistoricalAgent):
     ) -> str:
         """Generate a response based on the agent's configuration."""
         
+        if self.llm_client is not None:
+            return self.generate_llm_response(topic, other_agents, debate_context)
+        
         opponent_names = [agent.name for agent in other_agents if agent.name != self.name]
         opponents_str = ", ".join(opponent_names) if opponent_names else "my colleagues"
         
@@ -50,6 +53,9 @@ class GenericAgent(HistoricalAgent):
     def evaluate_proposal(self, proposal: str, proposer: HistoricalAgent) -> Dict[str, Any]:
         """Evaluate a proposal from another agent."""
         
+        if self.llm_client is not None:
+            return self.evaluate_llm_proposal(proposal, proposer)
+        
         # Check red lines first
         for red_line in self.red_lines:
             if red_line.lower() in proposal.lower():
@@ -3,10 +3,20 @@ Base class for historical figure AI agents.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import asyncio
+import itertools
 import json
+import re
+import threading
+
+from llm.types import CompletionRequest, DeadlineExceeded
+
+from .context_window import HistoryWindow, format_turn
+from .history import ConversationHistory, Transcript
 
 
 class Ideology(Enum):
@@ -21,6 +31,19 @@ class Ideology(Enum):
     CONSERVATISM = "conservatism"
 
 
+# Ideology compatibility matrix, read as row ideology -> column ideology.
+# Pairs that are not listed fall back to DEFAULT_IDEOLOGY_COMPATIBILITY.
+IDEOLOGY_COMPATIBILITY: Dict[Ideology, Dict[Ideology, float]] = {
+    Ideology.FASCISM: {Ideology.FASCISM: 1.0, Ideology.AUTHORITARIANISM: 0.7, Ideology.CONSERVATISM: 0.5, Ideology.COMMUNISM: 0.2, Ideology.DEMOCRACY: 0.1, Ideology.LIBERALISM: 0.1, Ideology.NONVIOLENCE: 0.0},
+    Ideology.COMMUNISM: {Ideology.COMMUNISM: 1.0, Ideology.AUTHORITARIANISM: 0.6, Ideology.LIBERALISM: 0.3, Ideology.DEMOCRACY: 0.2, Ideology.CONSERVATISM: 0.2, Ideology.FASCISM: 0.2, Ideology.NONVIOLENCE: 0.1},
+    Ideology.DEMOCRACY: {Ideology.DEMOCRACY: 1.0, Ideology.LIBERALISM: 0.8, Ideology.CONSERVATISM: 0.6, Ideology.NONVIOLENCE: 0.7, Ideology.COMMUNISM: 0.2, Ideology.AUTHORITARIANISM: 0.1, Ideology.FASCISM: 0.1},
+    Ideology.NONVIOLENCE: {Ideology.NONVIOLENCE: 1.0, Ideology.DEMOCRACY: 0.7, Ideology.LIBERALISM: 0.6, Ideology.CONSERVATISM: 0.4, Ideology.COMMUNISM: 0.1, Ideology.AUTHORITARIANISM: 0.0, Ideology.FASCISM: 0.0},
+    Ideology.MUSLIM_NATIONALISM: {Ideology.MUSLIM_NATIONALISM: 1.0, Ideology.CONSERVATISM: 0.5, Ideology.AUTHORITARIANISM: 0.4, Ideology.DEMOCRACY: 0.3, Ideology.LIBERALISM: 0.2, Ideology.COMMUNISM: 0.2, Ideology.FASCISM: 0.1, Ideology.NONVIOLENCE: 0.3},
+}
+
+DEFAULT_IDEOLOGY_COMPATIBILITY = 0.5
+
+
 @dataclass
 class PersonalityTraits:
     """Core personality traits that define a historical figure's behavior."""
@@ -45,6 +68,30 @@ class HistoricalContext:
     defining_moments: List[str]
 
 
+def parse_evaluation(text: str) -> Dict[str, Any]:
+    """
+    Parse a model's proposal verdict into {'accept', 'reasoning', 'counter_proposal'}.
+    Falls back to treating the whole reply as reasoning when it is not valid JSON.
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            return {
+                'accept': bool(data.get('accept', False)),
+                'reasoning': str(data.get('reasoning', '')),
+                'counter_proposal': str(data.get('counter_proposal', ''))
+            }
+        except (json.JSONDecodeError, AttributeError):
+            pass
+    
+    return {
+        'accept': False,
+        'reasoning': text.strip(),
+        'counter_proposal': ''
+    }
+
+
 class HistoricalAgent(ABC):
     """
     Base class for AI agents representing historical political figures.
@@ -56,16 +103,131 @@ class HistoricalAgent(ABC):
         ideology: Ideology,
         personality: PersonalityTraits,
         context: HistoricalContext,
-        llm_client: Any = None
+        llm_client: Any = None,
+        history_window: Optional[HistoryWindow] = None
     ):
+        # Bumped whenever ideology, traits, context or position change, so
+        # consensus caches can tell which agents need rescoring
+        self._state_version = 0
+        self._persona_prompt: Optional[Tuple[Tuple[Any, ...], str]] = None
+        self._position_prompt: Optional[Tuple[int, str]] = None
         self.name = name
         self.ideology = ideology
         self.personality = personality
         self.context = context
+        self._template_threads: Set[int] = set()  # Threads currently falling back to templates
         self.llm_client = llm_client
-        self.conversation_history: List[Dict[str, Any]] = []
+        self._history = ConversationHistory()
+        # Bounds how much of the history goes into model prompts
+        self.history_window = history_window or HistoryWindow()
         self.current_position: Dict[str, Any] = {}
         self.red_lines: List[str] = []  # Non-negotiable positions
+    
+    @property
+    def state_version(self) -> int:
+        """Counter that changes whenever the agent's scored state changes."""
+        return self._state_version
+    
+    def mark_changed(self) -> None:
+        """
+        Record a change to the agent's scored state. Call this after mutating
+        personality, context or position objects in place.
+        """
+        self._state_version += 1
+        self._persona_prompt = None
+    
+    def _position_changed(self) -> None:
+        # Positions are scored but are not part of the persona prompt prefix
+        self._state_version += 1
+    
+    @property
+    def llm_client(self) -> Any:
+        """Model client behind the agent's responses; None while it falls back to its templates."""
+        if self._template_threads and threading.get_ident() in self._template_threads:
+            return None
+        return self._llm_client
+    
+    @llm_client.setter
+    def llm_client(self, client: Any) -> None:
+        self._llm_client = client
+    
+    @contextmanager
+    def _templates_only(self) -> Iterator[None]:
+        # Per thread, so a fallback does not affect other calls in flight on this agent
+        ident = threading.get_ident()
+        self._template_threads.add(ident)
+        try:
+            yield
+        finally:
+            self._template_threads.discard(ident)
+    
+    def template_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> str:
+        """The agent's rule-based response, bypassing llm_client."""
+        with self._templates_only():
+            return self.generate_response(topic, other_agents, debate_context)
+    
+    def template_evaluation(self, proposal: str, proposer: 'HistoricalAgent') -> Dict[str, Any]:
+        """The agent's rule-based proposal evaluation, bypassing llm_client."""
+        with self._templates_only():
+            return self.evaluate_proposal(proposal, proposer)
+    
+    @property
+    def conversation_history(self) -> ConversationHistory:
+        """Read-only view of every turn this agent has heard."""
+        return self._history
+    
+    @conversation_history.setter
+    def conversation_history(self, entries: List[Dict[str, Any]]) -> None:
+        self._history = ConversationHistory(list(entries))
+    
+    def attach_transcript(self, transcript: Transcript) -> None:
+        """Hear every turn appended to a shared debate transcript from now on."""
+        self._history.follow(transcript)
+    
+    def detach_transcript(self, transcript: Transcript) -> None:
+        """Stop following a debate transcript, keeping the turns already heard."""
+        self._history.unfollow(transcript)
+    
+    @property
+    def ideology(self) -> Ideology:
+        return self._ideology
+    
+    @ideology.setter
+    def ideology(self, value: Ideology) -> None:
+        self._ideology = value
+        self.mark_changed()
+    
+    @property
+    def personality(self) -> PersonalityTraits:
+        return self._personality
+    
+    @personality.setter
+    def personality(self, value: PersonalityTraits) -> None:
+        self._personality = value
+        self.mark_changed()
+    
+    @property
+    def context(self) -> HistoricalContext:
+        return self._context
+    
+    @context.setter
+    def context(self, value: HistoricalContext) -> None:
+        self._context = value
+        self.mark_changed()
+    
+    @property
+    def current_position(self) -> Dict[str, Any]:
+        return self._current_position
+    
+    @current_position.setter
+    def current_position(self, value: Dict[str, Any]) -> None:
+        self._current_position = value
+        self._position_changed()
         
     @abstractmethod
     def generate_response(
@@ -91,22 +253,215 @@ class HistoricalAgent(ABC):
         """
         pass
     
+    def build_response_request(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> CompletionRequest:
+        """Render the persona, debate setting and conversation so far as a model request."""
+        others = ", ".join(agent.name for agent in other_agents if agent.name != self.name) or "the assembly"
+        # Initial context keys come before the per-round entries, so stop at the first round key
+        setting = "\n".join(
+            f"- {key}: {value}" for key, value in itertools.takewhile(
+                lambda item: not str(item[0]).startswith("round_"), debate_context.items()
+            )
+        )
+        summary, recent = self.history_window.render(self.conversation_history)
+        transcript = "\n\n".join(format_turn(entry) for entry in recent)
+        
+        prompt = f"Debate topic: {topic}\nOther participants: {others}\n"
+        if setting:
+            prompt += f"\nSetting:\n{setting}\n"
+        if summary:
+            prompt += f"\nSummary of earlier statements:\n{summary}\n"
+        if transcript:
+            prompt += f"\n{'Most recent statements' if summary else 'Debate so far'}:\n{transcript}\n"
+        prompt += "\nGive your next statement in the debate, in your own voice."
+        
+        return CompletionRequest(
+            system=self.get_persona_prompt(),
+            system_suffix=self.get_position_prompt(),
+            messages=[{"role": "user", "content": prompt}]
+        )
+    
+    def generate_llm_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> str:
+        """
+        Generate a response with llm_client instead of the agent's templates,
+        falling back to the templates if the call misses its deadline.
+        """
+        request = self.build_response_request(topic, other_agents, debate_context)
+        try:
+            return self.llm_client.complete(request).text.strip()
+        except DeadlineExceeded:
+            return self.template_response(topic, other_agents, debate_context)
+    
+    def stream_llm_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Stream generate_llm_response() as text chunks from llm_client. If the
+        stream does not start before its deadline, the template response is
+        yielded instead.
+        """
+        request = self.build_response_request(topic, other_agents, debate_context)
+        # Strip like generate_llm_response: drop leading whitespace and hold back trailing whitespace
+        pending = ""
+        started = False
+        chunks = self.llm_client.stream(request)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            return
+        except DeadlineExceeded:
+            yield self.template_response(topic, other_agents, debate_context)
+            return
+        for chunk in itertools.chain([first], chunks):
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            text = chunk.rstrip()
+            if text:
+                yield pending + text
+                pending = chunk[len(text):]
+            else:
+                pending += chunk
+    
+    def stream_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Generate a response as a sequence of text chunks. Agents with an
+        llm_client that can stream yield tokens as the model produces them;
+        template agents yield their whole response as one chunk. Override
+        together with generate_response when changing how an agent speaks.
+        """
+        if self.llm_client is not None and hasattr(self.llm_client, 'stream'):
+            yield from self.stream_llm_response(topic, other_agents, debate_context)
+        else:
+            yield self.generate_response(topic, other_agents, debate_context)
+    
+    def build_evaluation_request(self, proposal: str, proposer: 'HistoricalAgent') -> CompletionRequest:
+        """Render a proposal evaluation as a model request that asks for a JSON verdict."""
+        prompt = (
+            f"{proposer.name} proposes:\n{proposal}\n\n"
+            "Decide whether you accept this proposal. Reply with JSON only, in the form "
+            '{"accept": true or false, "reasoning": "...", "counter_proposal": "..."}'
+        )
+        return CompletionRequest(
+            system=self.get_persona_prompt(),
+            system_suffix=self.get_position_prompt(),
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0
+        )
+    
+    def evaluate_llm_proposal(self, proposal: str, proposer: 'HistoricalAgent') -> Dict[str, Any]:
+        """
+        Evaluate a proposal with llm_client instead of the agent's rules,
+        falling back to the rules if the call misses its deadline.
+        """
+        request = self.build_evaluation_request(proposal, proposer)
+        try:
+            return parse_evaluation(self.llm_client.complete(request).text)
+        except DeadlineExceeded:
+            return self.template_evaluation(proposal, proposer)
+    
+    async def agenerate_llm_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> str:
+        """Async variant of generate_llm_response() that awaits llm_client.acomplete."""
+        request = self.build_response_request(topic, other_agents, debate_context)
+        try:
+            return (await self.llm_client.acomplete(request)).text.strip()
+        except DeadlineExceeded:
+            return self.template_response(topic, other_agents, debate_context)
+    
+    async def aevaluate_llm_proposal(self, proposal: str, proposer: 'HistoricalAgent') -> Dict[str, Any]:
+        """Async variant of evaluate_llm_proposal() that awaits llm_client.acomplete."""
+        request = self.build_evaluation_request(proposal, proposer)
+        try:
+            return parse_evaluation((await self.llm_client.acomplete(request)).text)
+        except DeadlineExceeded:
+            return self.template_evaluation(proposal, proposer)
+    
+    async def agenerate_response(
+        self, 
+        topic: str, 
+        other_agents: List['HistoricalAgent'],
+        debate_context: Dict[str, Any]
+    ) -> str:
+        """
+        Async variant of generate_response.
+        
+        Template agents answer inline. Agents with an llm_client await its
+        acomplete(), so concurrent debates share the client's pool instead
+        of each holding a worker thread; clients without acomplete() are
+        called in a worker thread. Override together with generate_response
+        when changing how an agent speaks.
+        """
+        client = self.llm_client
+        if client is None:
+            return self.generate_response(topic, other_agents, debate_context)
+        if hasattr(client, 'acomplete'):
+            return await self.agenerate_llm_response(topic, other_agents, debate_context)
+        return await asyncio.to_thread(self.generate_response, topic, other_agents, debate_context)
+    
+    async def aevaluate_proposal(
+        self, 
+        proposal: str, 
+        proposer: 'HistoricalAgent'
+    ) -> Dict[str, Any]:
+        """Async variant of evaluate_proposal, adapted the same way as agenerate_response."""
+        client = self.llm_client
+        if client is None:
+            return self.evaluate_proposal(proposal, proposer)
+        if hasattr(client, 'acomplete'):
+            return await self.aevaluate_llm_proposal(proposal, proposer)
+        return await asyncio.to_thread(self.evaluate_proposal, proposal, proposer)
+    
     def update_position(self, new_position: Dict[str, Any]) -> None:
         """Update the agent's current position on the topic."""
         self.current_position.update(new_position)
+        self._position_changed()
+    
+    def update_personality(self, **traits: float) -> None:
+        """Update one or more personality traits, e.g. update_personality(cooperativeness=0.7)."""
+        for trait, value in traits.items():
+            if not hasattr(self.personality, trait):
+                raise ValueError(f"Unknown personality trait: {trait}")
+            setattr(self.personality, trait, value)
+        self.mark_changed()
     
     def add_to_history(self, speaker: str, content: str, context: Dict[str, Any]) -> None:
-        """Add an interaction to the conversation history."""
-        self.conversation_history.append({
-            'speaker': speaker,
-            'content': content,
-            'context': context,
-            'timestamp': len(self.conversation_history)
-        })
+        """Add an interaction to this agent's own conversation history."""
+        self._history.record(speaker, content, context)
     
-    def get_personality_prompt(self) -> str:
-        """Generate a personality prompt for the LLM."""
-        return f"""
+    def get_persona_prompt(self) -> str:
+        """
+        Static part of the personality prompt: identity, traits, historical
+        context and red lines. It is rendered once and reused until one of
+        those changes, so it is a byte-stable prefix for provider-side prompt
+        caching.
+        """
+        key = (self.name, tuple(self.red_lines))
+        if self._persona_prompt is None or self._persona_prompt[0] != key:
+            self._persona_prompt = (key, f"""
         You are {self.name}, a historical figure with the following characteristics:
         
         Ideology: {self.ideology.value}
@@ -131,12 +486,23 @@ class HistoricalAgent(ABC):
         Red Lines (Non-negotiable positions):
         {', '.join(self.red_lines) if self.red_lines else 'None specified'}
         
-        Current Position: {json.dumps(self.current_position, indent=2)}
-        
         Respond as this historical figure would, staying true to their personality,
         ideology, and historical context. Be authentic to their speaking style
         and decision-making patterns.
-        """
+        """)
+        return self._persona_prompt[1]
+    
+    def get_position_prompt(self) -> str:
+        """Dynamic part of the personality prompt: the agent's current position."""
+        if self._position_prompt is None or self._position_prompt[0] != self._state_version:
+            self._position_prompt = (self._state_version, f"""
+        Current Position: {json.dumps(self.current_position, indent=2)}
+        """)
+        return self._position_prompt[1]
+    
+    def get_personality_prompt(self) -> str:
+        """Generate a personality prompt for the LLM: the persona prefix followed by the position."""
+        return self.get_persona_prompt() + self.get_position_prompt()
     
     def calculate_consensus_score(self, other_agent: 'HistoricalAgent') -> float:
         """
@@ -163,16 +529,7 @@ class HistoricalAgent(ABC):
     
     def _calculate_ideology_compatibility(self, other_ideology: Ideology) -> float:
         """Calculate ideological compatibility between agents."""
-        # Define ideology compatibility matrix
-        compatibility_matrix = {
-            Ideology.FASCISM: {Ideology.FASCISM: 1.0, Ideology.AUTHORITARIANISM: 0.7, Ideology.CONSERVATISM: 0.5, Ideology.COMMUNISM: 0.2, Ideology.DEMOCRACY: 0.1, Ideology.LIBERALISM: 0.1, Ideology.NONVIOLENCE: 0.0},
-            Ideology.COMMUNISM: {Ideology.COMMUNISM: 1.0, Ideology.AUTHORITARIANISM: 0.6, Ideology.LIBERALISM: 0.3, Ideology.DEMOCRACY: 0.2, Ideology.CONSERVATISM: 0.2, Ideology.FASCISM: 0.2, Ideology.NONVIOLENCE: 0.1},
-            Ideology.DEMOCRACY: {Ideology.DEMOCRACY: 1.0, Ideology.LIBERALISM: 0.8, Ideology.CONSERVATISM: 0.6, Ideology.NONVIOLENCE: 0.7, Ideology.COMMUNISM: 0.2, Ideology.AUTHORITARIANISM: 0.1, Ideology.FASCISM: 0.1},
-            Ideology.NONVIOLENCE: {Ideology.NONVIOLENCE: 1.0, Ideology.DEMOCRACY: 0.7, Ideology.LIBERALISM: 0.6, Ideology.CONSERVATISM: 0.4, Ideology.COMMUNISM: 0.1, Ideology.AUTHORITARIANISM: 0.0, Ideology.FASCISM: 0.0},
-            Ideology.MUSLIM_NATIONALISM: {Ideology.MUSLIM_NATIONALISM: 1.0, Ideology.CONSERVATISM: 0.5, Ideology.AUTHORITARIANISM: 0.4, Ideology.DEMOCRACY: 0.3, Ideology.LIBERALISM: 0.2, Ideology.COMMUNISM: 0.2, Ideology.FASCISM: 0.1, Ideology.NONVIOLENCE: 0.3},
-        }
-        
-        return compatibility_matrix.get(self.ideology, {}).get(other_ideology, 0.5)
+        return IDEOLOGY_COMPATIBILITY.get(self.ideology, {}).get(other_ideology, DEFAULT_IDEOLOGY_COMPATIBILITY)
     
     def _calculate_personality_compatibility(self, other_personality: PersonalityTraits) -> float:
         """Calculate personality compatibility between agents."""
@@ -0,0 +1,191 @@
+"""
+Token-budgeted views of an agent's conversation history for model prompts.
+"""
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from llm.types import CompletionRequest
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token for English text)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def format_turn(entry: Dict[str, Any]) -> str:
+    """Render one history entry the way it appears in a prompt."""
+    return f"{entry['speaker']}: {entry['content']}"
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class HistorySummarizer(ABC):
+    """Folds turns that fell out of the verbatim window into a rolling summary."""
+
+    @abstractmethod
+    def summarize(self, previous: str, turns: List[Dict[str, Any]], budget: int) -> str:
+        """Return a summary of `previous` followed by `turns`, within about `budget` tokens."""
+        pass
+
+
+class ExtractiveSummarizer(HistorySummarizer):
+    """
+    Summarizes each turn as its speaker and opening sentence, dropping the
+    oldest lines once the summary exceeds its budget. Needs no model calls.
+    """
+
+    def __init__(self, max_chars: int = 200):
+        self.max_chars = max_chars
+
+    def summarize(self, previous: str, turns: List[Dict[str, Any]], budget: int) -> str:
+        lines = previous.splitlines() if previous else []
+        for entry in turns:
+            content = " ".join(str(entry['content']).split())
+            sentence = _SENTENCE_END.split(content, 1)[0]
+            if len(sentence) > self.max_chars:
+                sentence = sentence[:self.max_chars].rstrip() + "..."
+            lines.append(f"- {entry['speaker']}: {sentence}")
+
+        total = sum(count_tokens(line) for line in lines)
+        while len(lines) > 1 and total > budget:
+            total -= count_tokens(lines.pop(0))
+        return "\n".join(lines)
+
+
+class LLMSummarizer(HistorySummarizer):
+    """
+    Asks a model to condense the running summary and the new turns.
+    Results are memoized on their inputs, so agents sharing this summarizer
+    and hearing the same debate reuse each other's summaries.
+    """
+
+    def __init__(self, llm_client: Any, max_cached: int = 1024):
+        self.llm_client = llm_client
+        self.max_cached = max_cached
+        self._cache: Dict[str, str] = {}
+
+    def summarize(self, previous: str, turns: List[Dict[str, Any]], budget: int) -> str:
+        transcript = "\n\n".join(format_turn(entry) for entry in turns)
+        key = hashlib.blake2b(
+            f"{budget}\0{previous}\0{transcript}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        if key in self._cache:
+            return self._cache[key]
+
+        prompt = ""
+        if previous:
+            prompt += f"Summary of the debate so far:\n{previous}\n\n"
+        prompt += (
+            f"New statements:\n{transcript}\n\n"
+            f"Write an updated summary of the whole debate in under {budget} tokens. "
+            "Keep each participant's positions, proposals, concessions and red lines."
+        )
+        request = CompletionRequest(
+            system="You summarize political debates accurately and concisely.",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=budget,
+            temperature=0.0
+        )
+        summary = self.llm_client.complete(request).text.strip()
+
+        if len(self._cache) >= self.max_cached:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = summary
+        return summary
+
+
+class HistoryWindow:
+    """
+    Keeps the prompt's view of a conversation history within a token budget.
+
+    Recent turns are kept verbatim; older turns are folded into a rolling
+    summary. Compaction happens in chunks: when the verbatim window
+    overflows token_budget, it is shrunk to compact_to of the budget and the
+    turns that fell out are summarized in one call. The summary is kept
+    between calls, so each turn is summarized once and rendering costs stay
+    flat however long the debate runs.
+
+    Args:
+        token_budget: Tokens allowed for summary plus verbatim turns
+        min_recent_turns: Turns always kept verbatim, even over budget
+        summary_budget: Target size of the rolling summary, in tokens
+        compact_to: Fraction of the budget the window is shrunk to on compaction
+        summarizer: Defaults to ExtractiveSummarizer (no model calls)
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        min_recent_turns: int = 4,
+        summary_budget: int = 500,
+        compact_to: float = 0.6,
+        summarizer: Optional[HistorySummarizer] = None
+    ):
+        if not 0.0 < compact_to <= 1.0:
+            raise ValueError("compact_to must be in (0, 1]")
+        self.token_budget = token_budget
+        self.min_recent_turns = min_recent_turns
+        self.summary_budget = summary_budget
+        self.compact_to = compact_to
+        self.summarizer = summarizer or ExtractiveSummarizer()
+        self.compactions = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the rolling summary."""
+        self._summary = ""
+        self._compacted = 0  # Turns [0, _compacted) are represented by the summary
+        self._anchor: Optional[Tuple[str, str]] = None  # Last compacted turn, to detect a replaced history
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def compacted_turns(self) -> int:
+        """Number of leading turns represented by the summary."""
+        return self._compacted
+
+    def _still_valid(self, history: Sequence[Dict[str, Any]]) -> bool:
+        if self._compacted == 0:
+            return True
+        if len(history) < self._compacted:
+            return False
+        entry = history[self._compacted - 1]
+        return (entry['speaker'], entry['content']) == self._anchor
+
+    def render(self, history: Sequence[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Return (summary of older turns, recent turns kept verbatim)."""
+        if not self._still_valid(history):
+            self.reset()
+
+        length = len(history)
+        budget = self.token_budget - (count_tokens(self._summary) if self._summary else 0)
+        start = length
+        tokens = 0
+        sizes: List[int] = []  # Token counts of history[start:], newest first
+        while start > self._compacted:
+            size = count_tokens(format_turn(history[start - 1]))
+            if len(sizes) >= self.min_recent_turns and tokens + size > budget:
+                break
+            tokens += size
+            sizes.append(size)
+            start -= 1
+
+        if start > self._compacted:
+            # Overflow: shrink the window below the budget so the next compaction is several rounds away
+            target = budget * self.compact_to
+            while len(sizes) > self.min_recent_turns and tokens > target:
+                tokens -= sizes.pop()
+                start += 1
+            turns = [history[i] for i in range(self._compacted, start)]
+            self._summary = self.summarizer.summarize(self._summary, turns, self.summary_budget)
+            self._compacted = start
+            self._anchor = (turns[-1]['speaker'], turns[-1]['content'])
+            self.compactions += 1
+
+        return self._summary, [history[i] for i in range(self._compacted, length)]
@@ -68,6 +68,9 @@ class GandhiAgent(HistoricalAgent):
     def generate_response(self, topic: str, other_agents: List[HistoricalAgent], debate_context: Dict[str, Any]) -> str:
         """Generate Gandhi's response to a debate topic."""
         
+        if self.llm_client is not None:
+            return self.generate_llm_response(topic, other_agents, debate_context)
+        
         # Identify opponents
         opponent_names = [agent.name for agent in other_agents if agent.name != self.name]
         opponents_str = ", ".join(opponent_names) if opponent_names else "my friends"
@@ -137,6 +140,9 @@ class GandhiAgent(HistoricalAgent):
     def evaluate_proposal(self, proposal: str, proposer: HistoricalAgent) -> Dict[str, Any]:
         """Evaluate a proposal from another agent."""
         
+        if self.llm_client is not None:
+            return self.evaluate_llm_proposal(proposal, proposer)
+        
         # Gandhi evaluates proposals based on their alignment with truth and non-violence
         if "non-violence" in proposal.lower() or "peaceful" in proposal.lower():
             return {
@@ -0,0 +1,154 @@
+"""
+Shared debate transcripts and per-agent conversation history views.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+
+class Transcript:
+    """
+    Append-only log of debate turns, owned by the debate and shared by every
+    participating agent. Each turn is stored once no matter how many agents
+    read it.
+    """
+
+    def __init__(self):
+        self._entries: List[Dict[str, Any]] = []
+
+    def append(self, speaker: str, content: str, context: Mapping[str, Any]) -> int:
+        """Record a turn and return its index."""
+        self._entries.append({
+            'speaker': speaker,
+            'content': content,
+            'context': context
+        })
+        return len(self._entries) - 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._entries[index]
+
+
+class _Segment:
+    """A run of entries taken from a local list or a shared Transcript."""
+
+    __slots__ = ('source', 'start', 'stop')
+
+    def __init__(self, source: Union[List[Dict[str, Any]], Transcript], start: int = 0, stop: Optional[int] = None):
+        self.source = source
+        self.start = start
+        self.stop = stop  # None while still following a live transcript
+
+    def __len__(self) -> int:
+        stop = len(self.source) if self.stop is None else self.stop
+        return stop - self.start
+
+
+class ConversationHistory(Sequence):
+    """
+    Read-only view of everything an agent has heard, compatible with the
+    list of {'speaker', 'content', 'context', 'timestamp'} dicts that
+    HistoricalAgent.conversation_history used to be.
+
+    Turns broadcast during a debate are not copied into the view; it keeps a
+    cursor into the shared Transcript instead, so broadcasting a turn to any
+    number of agents is a single append.
+    """
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None):
+        self._segments: List[_Segment] = []
+        self._following: Optional[_Segment] = None
+        self._pins: List[int] = []
+        if entries:
+            self._segments.append(_Segment([dict(entry) for entry in entries]))
+
+    def record(self, speaker: str, content: str, context: Mapping[str, Any]) -> None:
+        """Record a turn heard outside any shared transcript (see HistoricalAgent.add_to_history)."""
+        entry = {'speaker': speaker, 'content': content, 'context': context}
+        if self._following is not None:
+            # Close the live cursor so this entry lands after what was heard so far
+            transcript = self._following.source
+            self.unfollow(transcript)
+            self._segments.append(_Segment([entry]))
+            self.follow(transcript)
+            return
+        if self._segments and isinstance(self._segments[-1].source, list):
+            self._segments[-1].source.append(entry)
+        else:
+            self._segments.append(_Segment([entry]))
+
+    def follow(self, transcript: Transcript) -> None:
+        """Start seeing every turn appended to the transcript from now on."""
+        if self._following is not None:
+            self.unfollow(self._following.source)
+        self._following = _Segment(transcript, start=len(transcript))
+        self._segments.append(self._following)
+
+    def unfollow(self, transcript: Transcript) -> None:
+        """Stop following the transcript, keeping the turns already heard."""
+        if self._following is None or self._following.source is not transcript:
+            return
+        self._following.stop = len(transcript)
+        if len(self._following) == 0:
+            self._segments.remove(self._following)
+        self._following = None
+
+    def pin(self) -> None:
+        """
+        Freeze the visible length at its current value until unpin(), so a
+        reader on another thread sees a stable history while new turns keep
+        arriving in the shared transcript.
+        """
+        self._pins.append(sum(len(segment) for segment in self._segments))
+
+    def unpin(self) -> None:
+        """Release the oldest pin; the view extends to every turn heard once no pins remain."""
+        if self._pins:
+            self._pins.pop(0)
+
+    def __len__(self) -> int:
+        length = sum(len(segment) for segment in self._segments)
+        if self._pins:
+            return min(length, min(self._pins))
+        return length
+
+    def _entry(self, index: int) -> Dict[str, Any]:
+        offset = index
+        for segment in self._segments:
+            size = len(segment)
+            if offset < size:
+                return {**segment.source[segment.start + offset], 'timestamp': index}
+            offset -= size
+        raise IndexError("conversation history index out of range")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("conversation history index out of range")
+        return self._entry(index)
+
+    def __iter__(self):
+        remaining = len(self)
+        index = 0
+        for segment in self._segments:
+            stop = segment.start + min(len(segment), remaining - index)
+            for position in range(segment.start, stop):
+                yield {**segment.source[position], 'timestamp': index}
+                index += 1
+            if index >= remaining:
+                return
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, ConversationHistory)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ConversationHistory({len(self)} entries)"
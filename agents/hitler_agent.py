@@ -68,6 +68,9 @@ class HitlerAgent(HistoricalAgent):
     def generate_response(self, topic: str, other_agents: List[HistoricalAgent], debate_context: Dict[str, Any]) -> str:
         """Generate Hitler's response to a debate topic."""
         
+        if self.llm_client is not None:
+            return self.generate_llm_response(topic, other_agents, debate_context)
+        
         # Identify opponents
         opponent_names = [agent.name for agent in other_agents if agent.name != self.name]
         opponents_str = ", ".join(opponent_names) if opponent_names else "the opposition"
@@ -122,6 +125,9 @@ class HitlerAgent(HistoricalAgent):
     def evaluate_proposal(self, proposal: str, proposer: HistoricalAgent) -> Dict[str, Any]:
         """Evaluate a proposal from another agent."""
         
+        if self.llm_client is not None:
+            return self.evaluate_llm_proposal(proposal, proposer)
+        
         # Hitler rarely accepts proposals from others
         if proposer.ideology == Ideology.FASCISM:
             # Might consider proposals from fellow fascists
@@ -67,6 +67,9 @@ class JinnahAgent(HistoricalAgent):
     def generate_response(self, topic: str, other_agents: List[HistoricalAgent], debate_context: Dict[str, Any]) -> str:
         """Generate Jinnah's response to a debate topic."""
         
+        if self.llm_client is not None:
+            return self.generate_llm_response(topic, other_agents, debate_context)
+        
         # Identify opponents
         opponent_names = [agent.name for agent in other_agents if agent.name != self.name]
         opponents_str = ", ".join(opponent_names) if opponent_names else "my colleagues"
@@ -145,6 +148,9 @@ class JinnahAgent(HistoricalAgent):
     def evaluate_proposal(self, proposal: str, proposer: HistoricalAgent) -> Dict[str, Any]:
         """Evaluate a proposal from another agent."""
         
+        if self.llm_client is not None:
+            return self.evaluate_llm_proposal(proposal, proposer)
+        
         # Jinnah evaluates proposals based on their impact on Muslim interests
         if "pakistan" in proposal.lower() or "separate state" in proposal.lower():
             return {
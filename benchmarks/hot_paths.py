@@ -0,0 +1,282 @@
+"""
+Benchmarks for the agent and debate hot paths.
+
+Usage:
+    python -m benchmarks.hot_paths --output bench.json
+    python -m benchmarks.hot_paths --quick --baseline bench.json
+
+Results are written as JSON. With --baseline, each benchmark's median is
+compared against the matching entry of an earlier run, and the exit code
+is 1 if any benchmark slowed down by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.agent_factory import create_agent
+from agents.base_agent import HistoricalAgent, Ideology
+from debates import DebateSimulator, ConsensusMatrix, RepetitionDetector, TranscriptLog, TranscriptLogWriter
+
+
+AGENT_COUNTS = [2, 10, 100, 1000]
+ROUND_COUNTS = [10, 100, 1000, 10000]
+QUICK_AGENT_COUNTS = [2, 10, 100]
+QUICK_ROUND_COUNTS = [10, 100, 1000]
+
+POSITION_TOPICS = 30
+# Each exported round repeats the whole context so far, so export output grows
+# quadratically with rounds; beyond this the JSON file runs to gigabytes.
+EXPORT_MAX_ROUNDS = 1000
+TRAITS = [
+    "assertiveness", "cooperativeness", "openness_to_change", "emotional_stability",
+    "dominance", "charisma", "pragmatism", "idealism"
+]
+EVENTS = [f"Event {i}" for i in range(40)]
+WORDS = ["peace", "war", "trade", "border", "unity", "rights", "state", "people", "land", "treaty", "law", "faith"]
+
+
+def make_agents(count: int, seed: int = 0) -> List[HistoricalAgent]:
+    """Create a reproducible assembly of generic agents with varied traits and positions."""
+    rng = random.Random(seed)
+    agents = []
+    for i in range(count):
+        agent = create_agent(
+            name=f"Delegate {i}",
+            ideology=rng.choice(list(Ideology)).value,
+            personality_traits={trait: rng.random() for trait in TRAITS},
+            time_period=rng.choice(["1920s-1940s", "1940s", "1960s"]),
+            major_events=rng.sample(EVENTS, rng.randint(2, 8)),
+            cultural_background=rng.choice(["European", "South Asian", "American", "East Asian"])
+        )
+        agent.current_position = {
+            f"topic_{t}": " ".join(rng.choice(WORDS) for _ in range(8)) for t in range(POSITION_TOPICS)
+        }
+        agents.append(agent)
+    return agents
+
+
+def make_simulator(rounds: int) -> DebateSimulator:
+    # Never stop early: consensus above 1.0 is unreachable and max_unique=0 never deadlocks
+    return DebateSimulator(
+        max_rounds=rounds,
+        consensus_threshold=1.01,
+        deadlock_detector=RepetitionDetector(window=5, max_unique=0)
+    )
+
+
+def _time(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        func() if state is None else func(state)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_create_agent(agents: int, repeat: int) -> List[float]:
+    return _time(lambda: make_agents(agents), repeat)
+
+
+def bench_consensus_pairwise(agents: int, repeat: int) -> List[float]:
+    assembly = make_agents(agents)
+
+    def run():
+        for i, agent1 in enumerate(assembly):
+            for agent2 in assembly[i + 1:]:
+                agent1.calculate_consensus_score(agent2)
+
+    return _time(run, repeat)
+
+
+def bench_consensus_matrix(agents: int, repeat: int) -> List[float]:
+    assembly = make_agents(agents)
+    return _time(lambda: ConsensusMatrix(assembly).mean_score(), repeat)
+
+
+def bench_analyze_positions(agents: int, repeat: int) -> List[float]:
+    assembly = make_agents(agents)
+    simulator = DebateSimulator()
+    return _time(lambda: simulator._analyze_positions(assembly), repeat)
+
+
+def bench_debate(agents: int, rounds: int, repeat: int) -> List[float]:
+    return _time(
+        lambda state: state[0].debate(state[1], topic="territorial_disputes"),
+        repeat,
+        setup=lambda: (make_simulator(rounds), make_agents(agents))
+    )
+
+
+def _finished_simulator(rounds: int) -> DebateSimulator:
+    simulator = make_simulator(rounds)
+    simulator.debate(make_agents(2), topic="territorial_disputes", initial_context={"benchmark": True})
+    return simulator
+
+
+def bench_get_debate_transcript(rounds: int, repeat: int) -> List[float]:
+    simulator = _finished_simulator(rounds)
+    return _time(simulator.get_debate_transcript, repeat)
+
+
+def bench_export_debate_data(rounds: int, repeat: int) -> List[float]:
+    simulator = _finished_simulator(rounds)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "debate.json")
+        return _time(lambda: simulator.export_debate_data(path), repeat)
+
+
+def bench_export_debate_jsonl(rounds: int, repeat: int) -> List[float]:
+    simulator = _finished_simulator(rounds)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "debate.jsonl.gz")
+        return _time(lambda: simulator.export_debate_jsonl(path), repeat)
+
+
+def bench_transcript_log_page(rounds: int, repeat: int) -> List[float]:
+    simulator = _finished_simulator(rounds)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "transcripts.log")
+        with TranscriptLogWriter(path) as writer:
+            debate_id = writer.append_debate(simulator.debate_history)
+        with TranscriptLog(path) as log:
+            # The last page of 20 rounds, which a list-backed transcript would have to load in full
+            return _time(lambda: log.get_debate_transcript(debate_id, offset=max(rounds - 20, 0), limit=20), repeat)
+
+
+def plan(agent_counts: List[int], round_counts: List[int]) -> List[Tuple[str, Dict[str, int], Callable[..., List[float]]]]:
+    """List every (benchmark name, parameters, function) to run."""
+    cases = []
+    for agents in agent_counts:
+        cases.append(("create_agent", {"agents": agents}, bench_create_agent))
+        cases.append(("calculate_consensus_score", {"agents": agents}, bench_consensus_pairwise))
+        cases.append(("consensus_matrix", {"agents": agents}, bench_consensus_matrix))
+        cases.append(("_analyze_positions", {"agents": agents, "topics": POSITION_TOPICS}, bench_analyze_positions))
+    for agents in agent_counts:
+        for rounds in round_counts:
+            cases.append(("debate", {"agents": agents, "rounds": rounds}, bench_debate))
+    for rounds in round_counts:
+        cases.append(("get_debate_transcript", {"rounds": rounds}, bench_get_debate_transcript))
+        if rounds <= EXPORT_MAX_ROUNDS:
+            cases.append(("export_debate_data", {"rounds": rounds}, bench_export_debate_data))
+        cases.append(("export_debate_jsonl", {"rounds": rounds}, bench_export_debate_jsonl))
+        cases.append(("transcript_log_page", {"rounds": rounds}, bench_transcript_log_page))
+    return cases
+
+
+def run_benchmarks(
+    agent_counts: List[int],
+    round_counts: List[int],
+    repeat: int = 3,
+    only: Optional[List[str]] = None,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """Run the benchmark plan and return a JSON-serializable report."""
+    results = []
+    for name, params, func in plan(agent_counts, round_counts):
+        if only and name not in only:
+            continue
+        kwargs = {key: value for key, value in params.items() if key != "topics"}
+        timings = func(repeat=repeat, **kwargs)
+        entry = {
+            "name": name,
+            "params": params,
+            "repeat": repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+        }
+        results.append(entry)
+        if verbose:
+            print(f"{name:28} {_params_label(params):28} median {entry['median'] * 1000:10.3f} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _params_label(params: Dict[str, int]) -> str:
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def _key(entry: Dict[str, Any]) -> Tuple[str, str]:
+    return entry["name"], json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Compare medians against a baseline report; returns one row per shared benchmark."""
+    baseline_results = {_key(entry): entry for entry in baseline.get("results", [])}
+    rows = []
+    for entry in report["results"]:
+        previous = baseline_results.get(_key(entry))
+        if previous is None or previous["median"] <= 0:
+            continue
+        ratio = entry["median"] / previous["median"]
+        rows.append({
+            "name": entry["name"],
+            "params": entry["params"],
+            "baseline_median": previous["median"],
+            "median": entry["median"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + tolerance,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark agent and debate hot paths")
+    parser.add_argument("--agents", nargs="+", type=int, default=None, help=f"Agent counts (default: {AGENT_COUNTS})")
+    parser.add_argument("--rounds", nargs="+", type=int, default=None, help=f"Round counts (default: {ROUND_COUNTS})")
+    parser.add_argument("--quick", action="store_true", help="Use the smaller default grid")
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per case")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging, e.g. 0.10")
+
+    args = parser.parse_args(argv)
+
+    agent_counts = args.agents or (QUICK_AGENT_COUNTS if args.quick else AGENT_COUNTS)
+    round_counts = args.rounds or (QUICK_ROUND_COUNTS if args.quick else ROUND_COUNTS)
+    report = run_benchmarks(agent_counts, round_counts, repeat=args.repeat, only=args.only)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "results": rows}
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:28} {_params_label(row['params']):28} x{row['ratio']:.2f} {flag}", file=sys.stderr)
+        if any(row["regression"] for row in rows):
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,38 @@
 Debate simulation package for AI political agents.
 """
 
-from .debate_simulator import DebateSimulator, DebateStatus, DebateRound, DebateResult
+from .debate_simulator import DebateSimulator, DebateStatus, DebateRound, DebateResult, RoundUpdate
+from .round_store import RoundStore
+from .consensus import ConsensusMatrix, ConsensusTracker
+from .context import DebateContext
+from .deadlock import DeadlockDetector, RepetitionDetector, NearDuplicateDetector
+from .positions import PositionIndex
+from .export import JSONLExporter, read_records, read_rounds, export_rounds
+from .columnar import ParquetStore
+from .repository import DebateRepository, DebateSummary
+from .transcript_log import TranscriptLog, TranscriptLogWriter
 
 __all__ = [
     'DebateSimulator',
     'DebateStatus', 
     'DebateRound',
-    'DebateResult'
+    'DebateResult',
+    'RoundUpdate',
+    'RoundStore',
+    'ConsensusMatrix',
+    'ConsensusTracker',
+    'DebateContext',
+    'DeadlockDetector',
+    'RepetitionDetector',
+    'NearDuplicateDetector',
+    'PositionIndex',
+    'JSONLExporter',
+    'read_records',
+    'read_rounds',
+    'export_rounds',
+    'ParquetStore',
+    'DebateRepository',
+    'DebateSummary',
+    'TranscriptLog',
+    'TranscriptLogWriter'
 ]
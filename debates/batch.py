@@ -0,0 +1,316 @@
+"""
+Process-pool batch runner for large debate sweeps.
+
+Usage:
+    python -m debates.batch --agent-sets hitler,gandhi gandhi,jinnah \\
+        --topics territorial_disputes race_relations \\
+        --rounds 10 20 --thresholds 0.7 0.8 --output sweep.jsonl
+    python -m debates.batch --agent-sets gandhi,jinnah --topics partition_of_india \\
+        --llm anthropic --cache responses.sqlite
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from agents import HitlerAgent, GandhiAgent, JinnahAgent
+from llm import LLMClient, Priority, ResponseCache, get_scheduler
+from .columnar import ParquetStore
+from .repository import DebateRepository
+from .debate_simulator import DebateSimulator, DebateResult
+
+
+AGENT_CLASSES = {
+    "hitler": HitlerAgent,
+    "gandhi": GandhiAgent,
+    "jinnah": JinnahAgent,
+}
+
+
+@dataclass
+class DebateScenario:
+    """One point of a sweep: who debates what, and under which settings."""
+    agents: Tuple[str, ...]
+    topic: str
+    max_rounds: int = 20
+    consensus_threshold: float = 0.8
+    initial_context: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class BatchOutcome:
+    """Result of one scenario; exactly one of result and error is set."""
+    index: int
+    scenario: DebateScenario
+    result: Optional[DebateResult] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_record(self) -> Dict[str, Any]:
+        """Flatten into a JSON-serializable summary record."""
+        record = {"index": self.index, **asdict(self.scenario)}
+        record["agents"] = list(self.scenario.agents)
+        if self.result is not None:
+            record.update({
+                "status": self.result.status.value,
+                "consensus_score": self.result.consensus_score,
+                "rounds": len(self.result.rounds),
+                "duration_minutes": self.result.duration_minutes,
+                "key_agreements": list(self.result.key_agreements),
+                "key_disagreements": list(self.result.key_disagreements),
+            })
+        else:
+            record["error"] = self.error
+        return record
+
+
+def scenario_grid(
+    agent_sets: Iterable[Sequence[str]],
+    topics: Iterable[str],
+    max_rounds: Iterable[int] = (20,),
+    consensus_thresholds: Iterable[float] = (0.8,),
+    initial_context: Optional[Dict[str, Any]] = None
+) -> List[DebateScenario]:
+    """Build the cartesian product of agent sets, topics, round limits and thresholds."""
+    return [
+        DebateScenario(
+            agents=tuple(agent_set),
+            topic=topic,
+            max_rounds=rounds,
+            consensus_threshold=threshold,
+            initial_context=initial_context
+        )
+        for agent_set, topic, rounds, threshold in itertools.product(
+            list(agent_sets), list(topics), list(max_rounds), list(consensus_thresholds)
+        )
+    ]
+
+
+def make_llm_client(settings: Optional[Dict[str, Any]]) -> Optional[LLMClient]:
+    """
+    Build an LLMClient from picklable settings, so each worker process can
+    open its own connection pool. 'cache' names a ResponseCache file shared
+    by all workers and 'cache_ttl' its TTL in seconds. 'requests_per_minute'
+    and 'tokens_per_minute' configure this process's scheduler. Every other
+    key is passed to LLMClient, with sweeps defaulting to batch priority.
+    """
+    if not settings:
+        return None
+    settings = dict(settings)
+    cache_path = settings.pop("cache", None)
+    cache_ttl = settings.pop("cache_ttl", None)
+    requests_per_minute = settings.pop("requests_per_minute", None)
+    tokens_per_minute = settings.pop("tokens_per_minute", None)
+    settings.setdefault("priority", Priority.BATCH)
+
+    cache = ResponseCache(cache_path, ttl=cache_ttl) if cache_path else None
+    client = LLMClient(cache=cache, **settings)
+    if requests_per_minute or tokens_per_minute:
+        get_scheduler().configure(
+            client.provider.name,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute
+        )
+    return client
+
+
+def run_scenario(
+    scenario: DebateScenario,
+    keep_rounds: bool = True,
+    llm_client: Optional[LLMClient] = None
+) -> DebateResult:
+    """Run a single scenario in the current process."""
+    unknown = [name for name in scenario.agents if name.lower() not in AGENT_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown agents: {unknown}. Available: {list(AGENT_CLASSES.keys())}")
+
+    agents = [AGENT_CLASSES[name.lower()](llm_client=llm_client) for name in scenario.agents]
+    simulator = DebateSimulator(
+        max_rounds=scenario.max_rounds,
+        consensus_threshold=scenario.consensus_threshold
+    )
+    result = simulator.debate(agents=agents, topic=scenario.topic, initial_context=scenario.initial_context)
+    if not keep_rounds:
+        # Rounds dominate the size of what gets pickled back to the parent
+        result.rounds = []
+    return result
+
+
+def _run_chunk(
+    chunk: List[Tuple[int, DebateScenario]],
+    keep_rounds: bool,
+    llm: Optional[Dict[str, Any]] = None
+) -> List[BatchOutcome]:
+    """Worker entry point: run a chunk, isolating failures per scenario."""
+    outcomes = []
+    llm_client = make_llm_client(llm)
+    try:
+        for index, scenario in chunk:
+            try:
+                result = run_scenario(scenario, keep_rounds, llm_client)
+                outcomes.append(BatchOutcome(index, scenario, result=result))
+            except Exception:
+                outcomes.append(BatchOutcome(index, scenario, error=traceback.format_exc()))
+    finally:
+        if llm_client is not None:
+            llm_client.close()
+            if llm_client.cache is not None:
+                llm_client.cache.close()
+    return outcomes
+
+
+def run_batch(
+    scenarios: Sequence[DebateScenario],
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    keep_rounds: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+    llm: Optional[Dict[str, Any]] = None
+) -> Iterator[BatchOutcome]:
+    """
+    Fan scenarios out across a ProcessPoolExecutor and yield outcomes as
+    chunks finish (not in submission order; use BatchOutcome.index).
+
+    Args:
+        scenarios: Scenarios to run, e.g. from scenario_grid()
+        max_workers: Worker processes (defaults to the CPU count)
+        chunksize: Scenarios per task; defaults to about four tasks per worker
+        keep_rounds: Ship full round lists back to the parent process
+        progress: Called as progress(completed, total) after every outcome
+        llm: LLMClient settings for model-backed agents (see make_llm_client);
+            None runs the agents' built-in templates. Rate limits are for the
+            whole sweep and are split evenly between workers
+    """
+    total = len(scenarios)
+    if total == 0:
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    if llm:
+        # Each worker process has its own scheduler, so give each a share of the rate limits
+        llm = dict(llm)
+        for key in ("requests_per_minute", "tokens_per_minute"):
+            if llm.get(key):
+                llm[key] = llm[key] / workers
+    if chunksize is None:
+        chunksize = max(1, total // (workers * 4))
+    indexed = list(enumerate(scenarios))
+    chunks = [indexed[i:i + chunksize] for i in range(0, total, chunksize)]
+
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_chunk, chunk, keep_rounds, llm): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                outcomes = future.result()
+            except Exception as e:
+                # The worker itself died (or the chunk could not be pickled)
+                error = f"{type(e).__name__}: {e}"
+                outcomes = [BatchOutcome(index, scenario, error=error) for index, scenario in futures[future]]
+
+            for outcome in outcomes:
+                completed += 1
+                if progress is not None:
+                    progress(completed, total)
+                yield outcome
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for debate sweeps."""
+    parser = argparse.ArgumentParser(description="Run a grid of debates across worker processes")
+    parser.add_argument(
+        "--agent-sets",
+        nargs="+",
+        required=True,
+        help="Comma-separated agent sets, e.g. hitler,gandhi gandhi,jinnah"
+    )
+    parser.add_argument("--topics", nargs="+", required=True, help="Debate topics")
+    parser.add_argument("--rounds", nargs="+", type=int, default=[20], help="Max rounds values")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[0.8], help="Consensus thresholds")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Scenarios per worker task")
+    parser.add_argument("--output", default=None, help="JSONL output file (default: stdout)")
+    parser.add_argument("--parquet", default=None, help="Also store results and rounds in this Parquet dataset directory")
+    parser.add_argument("--db", default=None, help="Also store results and rounds in this SQLite debate repository")
+    parser.add_argument("--llm", choices=["openai", "anthropic"], default=None, help="Model provider for agents")
+    parser.add_argument("--model", default=None, help="Model name for --llm")
+    parser.add_argument("--cache", default=None, help="SQLite response cache shared by all workers")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Response cache TTL in seconds")
+    parser.add_argument("--rpm", type=float, default=None, help="Provider requests per minute for the whole sweep")
+    parser.add_argument("--tpm", type=float, default=None, help="Provider tokens per minute for the whole sweep")
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds per model call before template fallback")
+    parser.add_argument("--hedge", type=float, default=None, help="Latency percentile after which calls are hedged")
+
+    args = parser.parse_args(argv)
+
+    scenarios = scenario_grid(
+        agent_sets=[agent_set.split(",") for agent_set in args.agent_sets],
+        topics=args.topics,
+        max_rounds=args.rounds,
+        consensus_thresholds=args.thresholds
+    )
+
+    llm = None
+    if args.llm:
+        llm = {
+            "provider": args.llm,
+            "model": args.model,
+            "cache": args.cache,
+            "cache_ttl": args.cache_ttl,
+            "requests_per_minute": args.rpm,
+            "tokens_per_minute": args.tpm,
+            "deadline": args.deadline,
+            "hedge_percentile": args.hedge,
+        }
+
+    def report(completed: int, total: int) -> None:
+        print(f"\r{completed}/{total} debates", end="", file=sys.stderr, flush=True)
+
+    failures = 0
+    store = ParquetStore(args.parquet) if args.parquet else None
+    repository = DebateRepository(args.db) if args.db else None
+    # Debates are written to the repository in batches, one transaction each
+    pending: List[Tuple[DebateResult, str, None]] = []
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for outcome in run_batch(
+            scenarios, max_workers=args.workers, chunksize=args.chunksize, progress=report, llm=llm,
+            keep_rounds=store is not None or repository is not None
+        ):
+            if not outcome.ok:
+                failures += 1
+            else:
+                # Both stores default agents to the full names in the result's final positions
+                if store is not None:
+                    store.add(outcome.result, topic=outcome.scenario.topic)
+                if repository is not None:
+                    pending.append((outcome.result, outcome.scenario.topic, None))
+                    if len(pending) >= 100:
+                        repository.add_many(pending)
+                        pending.clear()
+            out.write(json.dumps(outcome.to_record(), ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+        if repository is not None:
+            repository.add_many(pending)
+            repository.close()
+    print(f"\nDone: {len(scenarios) - failures} succeeded, {failures} failed", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
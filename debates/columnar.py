@@ -0,0 +1,249 @@
+"""
+Columnar Parquet store for debate results from large sweeps.
+"""
+
+import os
+import uuid
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from .debate_simulator import DebateResult
+
+
+PARTITION_COLUMNS = ("topic", "agent_set", "date")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ImportError("The Parquet store needs the 'pyarrow' package: pip install pyarrow") from None
+    return pyarrow, pyarrow.dataset
+
+
+def agent_set_key(agents: Sequence[str]) -> str:
+    """Partition value for a set of agents: their names, sorted and joined with '+'."""
+    return "+".join(sorted(agents))
+
+
+class ParquetStore:
+    """
+    Stores DebateResults as two partitioned Parquet datasets under `root`:
+
+    - debates/: one row per debate (status, consensus score, round count,
+      duration, agents, key agreements and disagreements)
+    - rounds/: one row per round (round number, speaker, response, timestamp)
+
+    Both are hive-partitioned by topic, agent set and date
+    (root/rounds/topic=.../agent_set=.../date=YYYY-MM-DD/part-*.parquet),
+    and the rows of one debate share a debate_id. Low-cardinality columns
+    (speaker, status, topic, agent set) are dictionary-encoded, on disk and
+    in the tables returned by the readers.
+
+    Rows are buffered and written as new files every max_buffered_rows
+    rounds and on flush()/close(), so a sweep writes a few large files
+    rather than one per debate. The readers push column projections and
+    filters down to the Parquet scan: partitions that cannot match are
+    never opened, and only the requested columns are decoded.
+
+    Needs pyarrow.
+
+    Example:
+        >>> with ParquetStore("runs") as store:
+        ...     for outcome in run_batch(scenarios, keep_rounds=True):
+        ...         store.add(outcome.result, topic=outcome.scenario.topic, agents=outcome.scenario.agents)
+        >>> deadlocks = ParquetStore("runs").read_debates(
+        ...     columns=["debate_id", "consensus_score"], topic="partition_of_india", status="deadlock"
+        ... )
+    """
+
+    def __init__(self, root: str, max_buffered_rows: int = 100_000, compression: str = "zstd"):
+        self.root = root
+        self.max_buffered_rows = max_buffered_rows
+        self.compression = compression
+        self.files_written = 0
+        self._debates: Dict[str, List[Any]] = self._empty_debates()
+        self._rounds: Dict[str, List[Any]] = self._empty_rounds()
+
+    @staticmethod
+    def _empty_debates() -> Dict[str, List[Any]]:
+        return {
+            name: [] for name in (
+                "debate_id", "topic", "agent_set", "date", "agents", "status", "consensus_score",
+                "rounds", "duration_minutes", "key_agreements", "key_disagreements"
+            )
+        }
+
+    @staticmethod
+    def _empty_rounds() -> Dict[str, List[Any]]:
+        return {
+            name: [] for name in (
+                "debate_id", "topic", "agent_set", "date", "round_number", "speaker", "response", "timestamp"
+            )
+        }
+
+    @staticmethod
+    def _schemas():
+        pa, _ = _pyarrow()
+        category = pa.dictionary(pa.int32(), pa.string())
+        # Partition columns are plain strings here; they live in directory names, not in the files
+        debates = pa.schema([
+            ("debate_id", pa.string()),
+            ("topic", pa.string()),
+            ("agent_set", pa.string()),
+            ("date", pa.string()),
+            ("agents", pa.list_(category)),
+            ("status", category),
+            ("consensus_score", pa.float64()),
+            ("rounds", pa.int32()),
+            ("duration_minutes", pa.float64()),
+            ("key_agreements", pa.list_(pa.string())),
+            ("key_disagreements", pa.list_(pa.string())),
+        ])
+        rounds = pa.schema([
+            ("debate_id", pa.string()),
+            ("topic", pa.string()),
+            ("agent_set", pa.string()),
+            ("date", pa.string()),
+            ("round_number", pa.int32()),
+            ("speaker", category),
+            ("response", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+        ])
+        return debates, rounds
+
+    def add(
+        self,
+        result: DebateResult,
+        topic: Optional[str] = None,
+        agents: Optional[Sequence[str]] = None,
+        debate_id: Optional[str] = None,
+        run_date: Optional[date] = None
+    ) -> str:
+        """
+        Buffer one debate and return its debate_id. The topic, agents and
+        date default to those of its rounds (or today for a debate whose
+        rounds were not kept).
+        """
+        rounds = result.rounds
+        if topic is None:
+            topic = rounds[0].topic if rounds else ""
+        if agents is None:
+            agents = list(result.final_positions) or list(dict.fromkeys(r.speaker for r in rounds))
+        if run_date is None:
+            run_date = rounds[0].timestamp.date() if rounds else date.today()
+        debate_id = debate_id or uuid.uuid4().hex
+        partition = (topic, agent_set_key(agents), run_date.isoformat())
+
+        debates = self._debates
+        for name, value in zip(PARTITION_COLUMNS, partition):
+            debates[name].append(value)
+        debates["debate_id"].append(debate_id)
+        debates["agents"].append(list(agents))
+        debates["status"].append(result.status.value)
+        debates["consensus_score"].append(float(result.consensus_score))
+        debates["rounds"].append(len(rounds))
+        debates["duration_minutes"].append(float(result.duration_minutes))
+        debates["key_agreements"].append(list(result.key_agreements))
+        debates["key_disagreements"].append(list(result.key_disagreements))
+
+        columns = self._rounds
+        for round_data in rounds:
+            for name, value in zip(PARTITION_COLUMNS, partition):
+                columns[name].append(value)
+            columns["debate_id"].append(debate_id)
+            columns["round_number"].append(round_data.round_number)
+            columns["speaker"].append(round_data.speaker)
+            columns["response"].append(round_data.response)
+            columns["timestamp"].append(round_data.timestamp)
+
+        if len(columns["debate_id"]) >= self.max_buffered_rows or len(debates["debate_id"]) >= self.max_buffered_rows:
+            self.flush()
+        return debate_id
+
+    def _write(self, name: str, columns: Dict[str, List[Any]], schema: Any) -> None:
+        pa, ds = _pyarrow()
+        table = pa.table(columns, schema=schema)
+        partitioning = ds.partitioning(
+            pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive"
+        )
+        ds.write_dataset(
+            table,
+            os.path.join(self.root, name),
+            format="parquet",
+            partitioning=partitioning,
+            # Unique per flush, so earlier files in the same partition are kept
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=self.compression)
+        )
+        self.files_written += 1
+
+    def flush(self) -> None:
+        """Write buffered rows out as new Parquet files."""
+        if not self._debates["debate_id"]:
+            return
+        debates_schema, rounds_schema = self._schemas()
+        self._write("debates", self._debates, debates_schema)
+        if self._rounds["debate_id"]:
+            self._write("rounds", self._rounds, rounds_schema)
+        self._debates = self._empty_debates()
+        self._rounds = self._empty_rounds()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'ParquetStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def dataset(self, name: str) -> Any:
+        """The 'debates' or 'rounds' dataset as a pyarrow.dataset.Dataset, for custom scans."""
+        pa, ds = _pyarrow()
+        category = pa.dictionary(pa.int32(), pa.string())
+        partitioning = ds.partitioning(
+            pa.schema([("topic", category), ("agent_set", category), ("date", pa.string())]),
+            flavor="hive",
+            dictionaries="infer"
+        )
+        return ds.dataset(os.path.join(self.root, name), format="parquet", partitioning=partitioning)
+
+    def _read(
+        self,
+        name: str,
+        columns: Optional[List[str]],
+        filter: Any,
+        equals: Dict[str, Any]
+    ) -> Any:
+        _, ds = _pyarrow()
+        expression = filter
+        for column, value in equals.items():
+            if isinstance(value, (list, tuple, set)):
+                condition = ds.field(column).isin(list(value))
+            else:
+                condition = ds.field(column) == value
+            expression = condition if expression is None else expression & condition
+        return self.dataset(name).to_table(columns=columns, filter=expression)
+
+    def read_debates(self, columns: Optional[List[str]] = None, filter: Any = None, **equals: Any) -> Any:
+        """
+        Read debate rows as a pyarrow.Table. Only the listed columns are
+        read, and only the rows matching `filter` (a pyarrow.dataset
+        expression) and every column=value keyword. A list or tuple value
+        matches any of its items.
+
+        Example:
+            >>> store.read_debates(
+            ...     columns=["debate_id", "status", "consensus_score"],
+            ...     filter=pyarrow.dataset.field("date") >= "2026-10-01",
+            ...     topic="partition_of_india"
+            ... ).to_pandas()
+        """
+        return self._read("debates", columns, filter, equals)
+
+    def read_rounds(self, columns: Optional[List[str]] = None, filter: Any = None, **equals: Any) -> Any:
+        """Read round rows as a pyarrow.Table; arguments as for read_debates()."""
+        return self._read("rounds", columns, filter, equals)
@@ -0,0 +1,220 @@
+"""
+Vectorized consensus scoring for debate assemblies.
+"""
+
+from typing import List, Dict, Sequence, Union
+
+import numpy as np
+
+from agents.base_agent import (
+    HistoricalAgent,
+    Ideology,
+    IDEOLOGY_COMPATIBILITY,
+    DEFAULT_IDEOLOGY_COMPATIBILITY,
+)
+
+
+# Ideology ordinals used to index the packed compatibility table
+IDEOLOGY_ORDINALS: Dict[Ideology, int] = {ideology: i for i, ideology in enumerate(Ideology)}
+
+
+def _build_ideology_table() -> np.ndarray:
+    """Pack IDEOLOGY_COMPATIBILITY into a dense (ideology x ideology) array."""
+    table = np.full((len(Ideology), len(Ideology)), DEFAULT_IDEOLOGY_COMPATIBILITY)
+    for row_ideology, row in IDEOLOGY_COMPATIBILITY.items():
+        for col_ideology, value in row.items():
+            table[IDEOLOGY_ORDINALS[row_ideology], IDEOLOGY_ORDINALS[col_ideology]] = value
+    return table
+
+
+IDEOLOGY_TABLE = _build_ideology_table()
+
+
+class ConsensusMatrix:
+    """
+    Computes the full N x N consensus score matrix for a group of agents.
+
+    Entry [i, j] equals agents[i].calculate_consensus_score(agents[j]). The
+    agents' personality traits, ideology ordinals and historical context are
+    packed into arrays once, so every pair is scored in a single vectorized
+    pass instead of a Python loop over HistoricalAgent helper methods.
+    """
+
+    def __init__(self, agents: Sequence[HistoricalAgent]):
+        self.agents: List[HistoricalAgent] = list(agents)
+        n = len(self.agents)
+
+        self._ideology = np.zeros(n, dtype=np.intp)
+        self._traits = np.zeros((n, 3), dtype=np.float64)
+        # Categorical context features become integer codes so equality is a cheap comparison
+        self._time_codes: Dict[str, int] = {}
+        self._culture_codes: Dict[str, int] = {}
+        self._event_codes: Dict[str, int] = {}
+        self._time_period = np.zeros(n, dtype=np.intp)
+        self._culture = np.zeros(n, dtype=np.intp)
+        # Event incidence matrix (agents x distinct events); duplicates count once, as in set()
+        self._events = np.zeros((n, 0), dtype=np.float64)
+        # The per-pair code divides by the raw list lengths, duplicates included
+        self._event_counts = np.zeros(n, dtype=np.float64)
+
+        self._scores = None
+        for i in range(n):
+            self._pack_agent(i)
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def _pack_agent(self, i: int) -> None:
+        """Pack agents[i]'s features into row i of the feature arrays."""
+        agent = self.agents[i]
+
+        self._ideology[i] = IDEOLOGY_ORDINALS[agent.ideology]
+        self._traits[i] = (
+            agent.personality.assertiveness,
+            agent.personality.cooperativeness,
+            agent.personality.openness_to_change,
+        )
+        self._time_period[i] = self._time_codes.setdefault(agent.context.time_period, len(self._time_codes))
+        self._culture[i] = self._culture_codes.setdefault(agent.context.cultural_background, len(self._culture_codes))
+
+        codes = [self._event_codes.setdefault(event, len(self._event_codes)) for event in agent.context.major_events]
+        if len(self._event_codes) > self._events.shape[1]:
+            padding = np.zeros((len(self.agents), len(self._event_codes) - self._events.shape[1]))
+            self._events = np.hstack([self._events, padding])
+        self._events[i] = 0.0
+        self._events[i, codes] = 1.0
+        self._event_counts[i] = len(agent.context.major_events)
+
+    def refresh(self, indices: Sequence[int]) -> None:
+        """
+        Re-pack the given agents and rescore only the rows and columns they
+        touch, leaving every other pair's cached score untouched.
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        if indices.size == 0:
+            return
+        for i in indices:
+            self._pack_agent(int(i))
+        if self._scores is None:
+            return
+
+        everyone = np.arange(len(self.agents))
+        self._scores[indices, :] = self._score_block(indices, everyone)
+        self._scores[:, indices] = self._score_block(everyone, indices)
+
+    def scores(self) -> np.ndarray:
+        """Return the N x N matrix of pairwise consensus scores."""
+        if self._scores is None:
+            self._scores = self._score_block(np.arange(len(self.agents)), np.arange(len(self.agents)))
+        return self._scores
+
+    def _score_block(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Score agents[rows] against agents[cols], mirroring calculate_consensus_score."""
+        ideology_compatibility = IDEOLOGY_TABLE[self._ideology[rows][:, None], self._ideology[cols][None, :]]
+
+        diffs = np.abs(self._traits[rows][:, None, :] - self._traits[cols][None, :, :])
+        avg_diff = (diffs[..., 0] + diffs[..., 1] + diffs[..., 2]) / 3
+        personality_compatibility = 1.0 - avg_diff
+
+        time_compatibility = np.where(self._time_period[rows][:, None] == self._time_period[cols][None, :], 1.0, 0.5)
+        cultural_compatibility = np.where(self._culture[rows][:, None] == self._culture[cols][None, :], 1.0, 0.3)
+        shared_events = self._events[rows] @ self._events[cols].T
+        event_denominator = np.maximum(
+            np.maximum(self._event_counts[rows][:, None], self._event_counts[cols][None, :]), 1.0
+        )
+        event_compatibility = shared_events / event_denominator
+        context_compatibility = (time_compatibility + cultural_compatibility + event_compatibility) / 3
+
+        consensus = (
+            ideology_compatibility * 0.4 +
+            personality_compatibility * 0.3 +
+            context_compatibility * 0.3
+        )
+        return np.clip(consensus, 0.0, 1.0)
+
+    def pair_score(self, i: int, j: int) -> float:
+        """Consensus score of agents[i] towards agents[j]."""
+        return float(self.scores()[i, j])
+
+    def mean_score(self) -> float:
+        """
+        Average score over all pairs (i, j) with i < j, the same pairs
+        DebateSimulator has always scored. Returns 1.0 for fewer than two agents.
+        """
+        n = len(self.agents)
+        if n < 2:
+            return 1.0
+        upper = self.scores()[np.triu_indices(n, k=1)]
+        return float(upper.sum() / upper.size)
+
+
+class ConsensusTracker:
+    """
+    Caches pairwise consensus scores across debate rounds.
+
+    Agents bump their state_version through update_position, update_personality
+    or attribute assignment; the tracker only rescores pairs that involve an
+    agent whose version moved (or that was passed to mark_dirty), so a round in
+    which nobody changed costs O(N) version checks instead of O(N^2) scoring.
+    """
+
+    def __init__(self, agents: Sequence[HistoricalAgent]):
+        self.matrix = ConsensusMatrix(agents)
+        self.agents = self.matrix.agents
+        self.trajectory: List[float] = []
+        self._index = {id(agent): i for i, agent in enumerate(self.agents)}
+        self._versions = [agent.state_version for agent in self.agents]
+        self._dirty: set = set()
+
+        n = len(self.agents)
+        if n >= 2:
+            upper = self.matrix.scores()[np.triu_indices(n, k=1)]
+            self._total = float(upper.sum())
+            self._pair_count = upper.size
+        else:
+            self._total = 0.0
+            self._pair_count = 0
+
+    def mark_dirty(self, agent: Union[HistoricalAgent, int]) -> None:
+        """Force an agent's pairs to be rescored on the next current_score() call."""
+        self._dirty.add(agent if isinstance(agent, int) else self._index[id(agent)])
+
+    def _collect_dirty(self) -> List[int]:
+        dirty = self._dirty
+        for i, agent in enumerate(self.agents):
+            if agent.state_version != self._versions[i]:
+                self._versions[i] = agent.state_version
+                dirty.add(i)
+        self._dirty = set()
+        return sorted(dirty)
+
+    def _affected_pairs(self, dirty: List[int]):
+        """Upper-triangle (i < j) coordinates of every pair involving a dirty agent."""
+        n = len(self.agents)
+        flat = []
+        for d in dirty:
+            flat.append(d * n + np.arange(d + 1, n))   # (d, j) for j > d
+            flat.append(np.arange(d) * n + d)           # (i, d) for i < d
+        flat = np.unique(np.concatenate(flat))
+        return flat // n, flat % n
+
+    def current_score(self) -> float:
+        """Mean consensus over all pairs, rescoring only dirty agents."""
+        if self._pair_count == 0:
+            return 1.0
+
+        dirty = self._collect_dirty()
+        if dirty:
+            rows, cols = self._affected_pairs(dirty)
+            scores = self.matrix.scores()
+            old = scores[rows, cols].sum()
+            self.matrix.refresh(dirty)
+            self._total += float(scores[rows, cols].sum() - old)
+
+        return self._total / self._pair_count
+
+    def record_round(self) -> float:
+        """Score the current state and append it to the consensus trajectory."""
+        score = self.current_score()
+        self.trajectory.append(score)
+        return score
@@ -0,0 +1,105 @@
+"""
+Persistent debate context with structural sharing between rounds.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+_ROUND_PREFIX = "round_"
+_ROUND_FIELDS = {"_response": 0, "_speaker": 1}
+
+
+def _parse_round_key(key: Any) -> Optional[Tuple[int, int]]:
+    """Split 'round_N_response' / 'round_N_speaker' into (N, field index)."""
+    if not isinstance(key, str) or not key.startswith(_ROUND_PREFIX):
+        return None
+    for suffix, field_index in _ROUND_FIELDS.items():
+        if key.endswith(suffix):
+            number = key[len(_ROUND_PREFIX):-len(suffix)]
+            # Reject forms such as 'round_01_response' that the dict never held
+            if number.isdigit() and str(int(number)) == number:
+                return int(number), field_index
+    return None
+
+
+class DebateContext(Mapping):
+    """
+    Immutable mapping of the initial debate context plus the
+    round_N_response / round_N_speaker entries added after each round.
+
+    Every snapshot shares one append-only list of (response, speaker) pairs
+    and only remembers how many of them it can see, so with_round() and
+    storing a snapshot in a DebateRound are O(1) instead of copying a dict
+    that grows every round.
+    """
+
+    __slots__ = ("_base", "_rounds", "_length")
+
+    def __init__(self, initial: Optional[Mapping] = None):
+        self._base: Dict[str, Any] = dict(initial or {})
+        self._rounds: List[Tuple[str, str]] = []
+        self._length = 0
+
+    @classmethod
+    def _snapshot(cls, base: Dict[str, Any], rounds: List[Tuple[str, str]], length: int) -> 'DebateContext':
+        context = cls.__new__(cls)
+        context._base = base
+        context._rounds = rounds
+        context._length = length
+        return context
+
+    def with_round(self, speaker: str, response: str) -> 'DebateContext':
+        """Return a new context that also holds the next round's speaker and response."""
+        if self._length == len(self._rounds):
+            rounds = self._rounds
+        else:
+            # An older snapshot is being extended; fork so later snapshots stay intact
+            rounds = self._rounds[:self._length]
+        rounds.append((response, speaker))
+        return self._snapshot(self._base, rounds, self._length + 1)
+
+    @property
+    def rounds_recorded(self) -> int:
+        """Number of rounds visible in this snapshot."""
+        return self._length
+
+    def same_history(self, other: Any) -> bool:
+        """Whether other is a snapshot of the same debate, sharing this one's rounds."""
+        return isinstance(other, DebateContext) and other._base is self._base and other._rounds is self._rounds
+
+    def truncated(self, length: int) -> 'DebateContext':
+        """The earlier snapshot of this debate that saw only its first `length` rounds, in O(1)."""
+        if not 0 <= length <= self._length:
+            raise ValueError(f"Snapshot has {self._length} rounds, cannot truncate to {length}")
+        return self._snapshot(self._base, self._rounds, length)
+
+    def __getitem__(self, key: str) -> Any:
+        parsed = _parse_round_key(key)
+        if parsed is not None and 1 <= parsed[0] <= self._length:
+            round_number, field_index = parsed
+            return self._rounds[round_number - 1][field_index]
+        return self._base[key]
+
+    def _shadowed(self, key: str) -> bool:
+        parsed = _parse_round_key(key)
+        return parsed is not None and 1 <= parsed[0] <= self._length
+
+    def __iter__(self) -> Iterator[str]:
+        # Same key order a dict updated round by round would have
+        yield from self._base
+        for round_number in range(1, self._length + 1):
+            for key in (f"round_{round_number}_response", f"round_{round_number}_speaker"):
+                if key not in self._base:
+                    yield key
+
+    def __len__(self) -> int:
+        shadowed = sum(1 for key in self._base if self._shadowed(key))
+        return len(self._base) + 2 * self._length - shadowed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the snapshot as a plain dict, e.g. for JSON export."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"DebateContext({self.to_dict()!r})"
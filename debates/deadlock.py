@@ -0,0 +1,142 @@
+"""
+Pluggable deadlock detectors for debate simulations.
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Deque, List
+import hashlib
+import re
+
+import numpy as np
+
+
+class DeadlockDetector(ABC):
+    """
+    Watches the stream of responses and reports when a debate has stalled.
+    DebateSimulator calls reset() at the start of each debate and observe()
+    once per round.
+    """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget everything observed so far."""
+        pass
+
+    @abstractmethod
+    def observe(self, response: str) -> None:
+        """Record the latest response."""
+        pass
+
+    @abstractmethod
+    def is_deadlocked(self) -> bool:
+        """Whether the recent responses indicate the debate is going in circles."""
+        pass
+
+
+def _fingerprint(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+class RepetitionDetector(DeadlockDetector):
+    """
+    Flags a deadlock when the last `window` responses contain at most
+    `max_unique` distinct texts. Each response is hashed once into a rolling
+    window of fingerprints with a running count of distinct values, so every
+    round costs O(1) regardless of window size or response length history.
+    """
+
+    def __init__(self, window: int = 5, max_unique: int = 2):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.max_unique = max_unique
+        self._fingerprints: Deque[bytes] = deque()
+        self._counts: Counter = Counter()
+
+    def reset(self) -> None:
+        self._fingerprints.clear()
+        self._counts.clear()
+
+    def observe(self, response: str) -> None:
+        fingerprint = _fingerprint(response)
+        self._fingerprints.append(fingerprint)
+        self._counts[fingerprint] += 1
+        if len(self._fingerprints) > self.window:
+            expired = self._fingerprints.popleft()
+            self._counts[expired] -= 1
+            if self._counts[expired] == 0:
+                del self._counts[expired]
+
+    def is_deadlocked(self) -> bool:
+        return len(self._fingerprints) >= self.window and len(self._counts) <= self.max_unique
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'big')
+
+
+class MinHasher:
+    """
+    MinHash signatures over a text's word set. The fraction of equal
+    signature slots estimates the Jaccard similarity of the two word sets.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        tokens = set(_TOKEN_PATTERN.findall(text.lower()))
+        if not tokens:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter((_token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+        # (a * x + b) mod p for every permutation x token pair, then min per permutation
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.count_nonzero(a == b)) / a.size
+
+
+class NearDuplicateDetector(DeadlockDetector):
+    """
+    Like RepetitionDetector, but responses whose estimated word-set Jaccard
+    similarity is at least `similarity` count as the same point, so agents
+    that paraphrase themselves are also cut off. Each response is MinHashed
+    once; grouping only looks at the fixed-size window.
+    """
+
+    def __init__(self, window: int = 5, max_unique: int = 2, similarity: float = 0.5, num_perm: int = 128):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.max_unique = max_unique
+        self.similarity = similarity
+        self._hasher = MinHasher(num_perm)
+        self._signatures: Deque[np.ndarray] = deque(maxlen=window)
+
+    def reset(self) -> None:
+        self._signatures.clear()
+
+    def observe(self, response: str) -> None:
+        self._signatures.append(self._hasher.signature(response))
+
+    def _distinct_points(self) -> int:
+        representatives: List[np.ndarray] = []
+        for signature in self._signatures:
+            if not any(MinHasher.similarity(signature, seen) >= self.similarity for seen in representatives):
+                representatives.append(signature)
+        return len(representatives)
+
+    def is_deadlocked(self) -> bool:
+        return len(self._signatures) >= self.window and self._distinct_points() <= self.max_unique
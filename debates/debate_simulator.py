@@ -2,14 +2,26 @@
 Debate simulation system for historical figure AI agents.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+import asyncio
 import json
+import queue
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
 from agents.base_agent import HistoricalAgent
+from agents.history import Transcript
+from .consensus import ConsensusMatrix, ConsensusTracker
+from .context import DebateContext
+from .deadlock import DeadlockDetector, RepetitionDetector
+from .positions import PositionIndex, jaccard_matrix, tokenize_position
+from .round_store import DebateRound, RoundStore
+
+
+ChunkCallback = Callable[[int, str, str], None]  # (round_number, speaker name, text chunk)
 
 
 class DebateStatus(Enum):
@@ -20,27 +32,53 @@ class DebateStatus(Enum):
     DEADLOCK = "deadlock"
 
 
-@dataclass
-class DebateRound:
-    """Represents a single round of debate."""
-    round_number: int
-    speaker: str
-    topic: str
-    response: str
-    timestamp: datetime
-    context: Dict[str, Any]
+class _PositionSummary:
+    """
+    Dataclass field descriptor for DebateResult.key_agreements and
+    key_disagreements. When no list is passed in, it is derived from the
+    result's position_index on first read and then cached.
+    """
+    
+    def __init__(self, part: int):
+        self.part = part
+    
+    def __set_name__(self, owner, name):
+        self.attr = '_' + name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None  # Field default: compute lazily
+        value = obj.__dict__.get(self.attr)
+        if value is None:
+            index = obj.__dict__.get('position_index')
+            value = list(index.analyze()[self.part]) if index is not None else []
+            obj.__dict__[self.attr] = value
+        return value
+    
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
 
 
 @dataclass
 class DebateResult:
     """Result of a debate simulation."""
     status: DebateStatus
-    rounds: List[DebateRound]
+    rounds: Sequence[DebateRound]  # A RoundStore for debates run by DebateSimulator
     consensus_score: float
-    key_agreements: List[str]
-    key_disagreements: List[str]
-    final_positions: Dict[str, Dict[str, Any]]
-    duration_minutes: float
+    key_agreements: List[str] = _PositionSummary(0)
+    key_disagreements: List[str] = _PositionSummary(1)
+    final_positions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    duration_minutes: float = 0.0
+    consensus_trajectory: List[float] = field(default_factory=list)  # Consensus score after each round
+    position_index: Optional[PositionIndex] = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class RoundUpdate:
+    """A round yielded by DebateSimulator.iter_rounds, with the running consensus."""
+    round: DebateRound
+    consensus_score: float
+    result: Optional[DebateResult] = None  # Set on the round that ends the debate
 
 
 class DebateSimulator:
@@ -48,127 +86,472 @@ class DebateSimulator:
     Simulates debates between historical figure AI agents.
     """
     
-    def __init__(self, max_rounds: int = 20, consensus_threshold: float = 0.8):
+    def __init__(
+        self,
+        max_rounds: int = 20,
+        consensus_threshold: float = 0.8,
+        deadlock_detector: Optional[DeadlockDetector] = None,
+        pipeline: bool = False
+    ):
         self.max_rounds = max_rounds
         self.consensus_threshold = consensus_threshold
-        self.debate_history: List[DebateRound] = []
+        # Default: 2 or fewer unique responses in the last 5 rounds
+        self.deadlock_detector = deadlock_detector or RepetitionDetector(window=5, max_unique=2)
+        # Generate the next speaker's turn while the current one is still in flight
+        self.pipeline = pipeline
+        self.discarded_turns = 0  # Speculative turns dropped because their debate ended first (running total)
+        self.debate_history = RoundStore()  # Rounds kept as columns, materialized on access
+        self.consensus_tracker: Optional[ConsensusTracker] = None
+        self.transcript = Transcript()
+        self.last_result: Optional[DebateResult] = None
         
     def debate(
         self, 
         agents: List[HistoricalAgent], 
         topic: str,
-        initial_context: Optional[Dict[str, Any]] = None
+        initial_context: Optional[Dict[str, Any]] = None,
+        on_chunk: Optional[ChunkCallback] = None,
+        exporter: Optional[Any] = None
     ) -> DebateResult:
         """
         Simulate a debate between agents on a given topic.
         """
+        for _ in self.iter_rounds(agents, topic, initial_context, on_chunk=on_chunk, exporter=exporter):
+            pass
+        return self.last_result
+    
+    async def adebate(
+        self, 
+        agents: List[HistoricalAgent], 
+        topic: str,
+        initial_context: Optional[Dict[str, Any]] = None,
+        exporter: Optional[Any] = None
+    ) -> DebateResult:
+        """
+        Async variant of debate() that awaits agenerate_response, so many
+        debates can share one event loop while agents wait on model I/O.
+        Use one DebateSimulator per concurrently running debate.
+        
+        LLMClient.acomplete() still runs each blocking HTTP call on the
+        client's thread pool, so a waiting turn holds one of its
+        max_concurrency threads: at most max_concurrency model calls are in
+        flight at once, however many debates share the loop.
+        """
+        async for _ in self.aiter_rounds(agents, topic, initial_context, exporter=exporter):
+            pass
+        return self.last_result
+    
+    def poll_assembly(
+        self,
+        proposal: str,
+        proposer: HistoricalAgent,
+        agents: List[HistoricalAgent],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Put a proposal to every agent other than the proposer and collect
+        their evaluate_proposal() verdicts, keyed by agent name.
+        
+        Model-backed agents are evaluated concurrently, so when they share a
+        MicroBatcher as their llm_client the whole vote goes out as one
+        batch, fanned out over the client's pool.
+        """
+        voters = [agent for agent in agents if agent is not proposer]
+        remote = [agent for agent in voters if agent.llm_client is not None]
+        
+        futures = {}
+        if remote:
+            with ThreadPoolExecutor(max_workers=max_workers or len(remote)) as pool:
+                futures = {
+                    id(agent): pool.submit(agent.evaluate_proposal, proposal, proposer) for agent in remote
+                }
+        
+        return {
+            agent.name: futures[id(agent)].result() if id(agent) in futures
+            else agent.evaluate_proposal(proposal, proposer)
+            for agent in voters
+        }
+    
+    async def apoll_assembly(
+        self,
+        proposal: str,
+        proposer: HistoricalAgent,
+        agents: List[HistoricalAgent],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Async variant of poll_assembly()."""
+        return await asyncio.to_thread(self.poll_assembly, proposal, proposer, agents, max_workers)
+    
+    def iter_rounds(
+        self,
+        agents: List[HistoricalAgent],
+        topic: str,
+        initial_context: Optional[Dict[str, Any]] = None,
+        retain_history: bool = True,
+        on_chunk: Optional[ChunkCallback] = None,
+        exporter: Optional[Any] = None
+    ) -> Iterator[RoundUpdate]:
+        """
+        Run a debate incrementally, yielding a RoundUpdate as soon as each
+        round is produced. The update for the final round carries the
+        DebateResult, which is also stored in last_result. Breaking out of
+        the loop stops the debate early.
+        
+        With retain_history=False, rounds are neither kept in debate_history
+        nor broadcast to the agents' conversation histories, so memory stays
+        constant however long the debate runs.
+        
+        When the simulator was built with pipeline=True, each speaker starts
+        generating as soon as the previous speaker has started, on the history and context as they
+        stand at that moment: every turn hears all earlier turns except the
+        one immediately before it. For model-backed agents this roughly
+        halves wall time. A turn still in flight when the debate ends is
+        cancelled or its result discarded.
+        
+        With on_chunk, responses are streamed: on_chunk(round_number,
+        speaker_name, chunk) is called for each piece of text as the
+        speaker's model produces it, before the round's update is yielded.
+        Callbacks always run on the calling thread, also when pipelining, so
+        they may update a UI directly. Template agents deliver their whole
+        response as one chunk.
+        
+        With an exporter (see debates.export.JSONLExporter), each round is
+        written out as soon as it is produced, followed by the result, so a
+        crash loses at most the rounds since the exporter's last flush.
+        """
+        start_time, current_context = self._begin_debate(agents, initial_context)
+        if exporter is not None:
+            exporter.begin(topic, [agent.name for agent in agents], current_context)
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="debate-pipeline") if self.pipeline else None
+        pending: Optional[Future] = None  # This round's turn, started during the previous round
+        pending_chunks: Optional[queue.Queue] = None
+        
+        try:
+            for round_num in range(self.max_rounds):
+                # Determine current speaker (rotate through agents)
+                current_speaker = agents[round_num % len(agents)]
+                
+                # Generate response
+                if executor is None and on_chunk is None:
+                    response = current_speaker.generate_response(
+                        topic=topic,
+                        other_agents=[a for a in agents if a.name != current_speaker.name],
+                        debate_context=current_context
+                    )
+                elif executor is None:
+                    parts = []
+                    for chunk in current_speaker.stream_response(
+                        topic=topic,
+                        other_agents=[a for a in agents if a.name != current_speaker.name],
+                        debate_context=current_context
+                    ):
+                        parts.append(chunk)
+                        on_chunk(round_num + 1, current_speaker.name, chunk)
+                    response = "".join(parts)
+                else:
+                    if pending is None:
+                        pending_chunks = queue.Queue() if on_chunk is not None else None
+                        pending = self._start_turn(
+                            executor, current_speaker, agents, topic, current_context, pending_chunks
+                        )
+                    following = following_chunks = None
+                    if round_num + 1 < self.max_rounds:
+                        following_chunks = queue.Queue() if on_chunk is not None else None
+                        following = self._start_turn(
+                            executor, agents[(round_num + 1) % len(agents)], agents, topic, current_context,
+                            following_chunks
+                        )
+                    if pending_chunks is not None:
+                        self._relay_chunks(pending, pending_chunks, round_num + 1, current_speaker.name, on_chunk)
+                    response = pending.result()
+                    pending, pending_chunks = following, following_chunks
+                
+                update = self._complete_round(
+                    round_num, current_speaker, topic, response, current_context, agents, start_time, retain_history
+                )
+                if exporter is not None:
+                    exporter.write_round(update.round)
+                    if update.result is not None:
+                        exporter.write_result(update.result)
+                yield update
+                if update.result is not None:
+                    return
+                
+                # Update context for next round
+                current_context = current_context.with_round(current_speaker.name, response)
+            
+            # Only reached when max_rounds < 1, so no round carried a result
+            result = self._conclude_debate(agents, start_time)
+            if exporter is not None:
+                exporter.write_result(result)
+        finally:
+            if pending is not None:
+                self._discard_turn(pending)
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._end_debate(agents)
+    
+    async def aiter_rounds(
+        self,
+        agents: List[HistoricalAgent],
+        topic: str,
+        initial_context: Optional[Dict[str, Any]] = None,
+        retain_history: bool = True,
+        exporter: Optional[Any] = None
+    ) -> AsyncIterator[RoundUpdate]:
+        """Async-iterator twin of iter_rounds() built on agenerate_response."""
+        start_time, current_context = self._begin_debate(agents, initial_context)
+        if exporter is not None:
+            exporter.begin(topic, [agent.name for agent in agents], current_context)
+        pending: Optional[asyncio.Future] = None
+        
+        try:
+            for round_num in range(self.max_rounds):
+                current_speaker = agents[round_num % len(agents)]
+                
+                if not self.pipeline:
+                    response = await current_speaker.agenerate_response(
+                        topic=topic,
+                        other_agents=[a for a in agents if a.name != current_speaker.name],
+                        debate_context=current_context
+                    )
+                else:
+                    if pending is None:
+                        pending = self._astart_turn(current_speaker, agents, topic, current_context)
+                    following = None
+                    if round_num + 1 < self.max_rounds:
+                        following = self._astart_turn(
+                            agents[(round_num + 1) % len(agents)], agents, topic, current_context
+                        )
+                    response = await pending
+                    pending = following
+                
+                update = self._complete_round(
+                    round_num, current_speaker, topic, response, current_context, agents, start_time, retain_history
+                )
+                if exporter is not None:
+                    exporter.write_round(update.round)
+                    if update.result is not None:
+                        exporter.write_result(update.result)
+                yield update
+                if update.result is not None:
+                    return
+                
+                current_context = current_context.with_round(current_speaker.name, response)
+            
+            # Only reached when max_rounds < 1, so no round carried a result
+            result = self._conclude_debate(agents, start_time)
+            if exporter is not None:
+                exporter.write_result(result)
+        finally:
+            if pending is not None:
+                self._discard_turn(pending)
+            self._end_debate(agents)
+    
+    def _start_turn(
+        self,
+        executor: ThreadPoolExecutor,
+        speaker: HistoricalAgent,
+        agents: List[HistoricalAgent],
+        topic: str,
+        context: DebateContext,
+        chunks: Optional[queue.Queue] = None
+    ) -> Future:
+        """
+        Generate a turn on a worker thread, on the speaker's history as it
+        stands now. With a chunks queue, the response is streamed into it.
+        """
+        history = speaker.conversation_history
+        # Turns broadcast while this one is generating must not leak into its prompt
+        history.pin()
+        other_agents = [a for a in agents if a.name != speaker.name]
+        if chunks is None:
+            future = executor.submit(
+                speaker.generate_response, topic=topic, other_agents=other_agents, debate_context=context
+            )
+        else:
+            def stream() -> str:
+                parts = []
+                for chunk in speaker.stream_response(topic=topic, other_agents=other_agents, debate_context=context):
+                    parts.append(chunk)
+                    chunks.put(chunk)
+                return "".join(parts)
+            future = executor.submit(stream)
+        future.add_done_callback(lambda _: history.unpin())
+        return future
+    
+    @staticmethod
+    def _relay_chunks(
+        future: Future,
+        chunks: queue.Queue,
+        round_number: int,
+        speaker_name: str,
+        on_chunk: ChunkCallback
+    ) -> None:
+        """Pass a worker's streamed chunks to on_chunk on this thread until its turn is done."""
+        while True:
+            try:
+                chunk = chunks.get(timeout=0.05)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            on_chunk(round_number, speaker_name, chunk)
+        # The worker queued everything before finishing
+        while not chunks.empty():
+            on_chunk(round_number, speaker_name, chunks.get_nowait())
+    
+    def _astart_turn(
+        self,
+        speaker: HistoricalAgent,
+        agents: List[HistoricalAgent],
+        topic: str,
+        context: DebateContext
+    ) -> asyncio.Future:
+        """Async counterpart of _start_turn(), as a task on the running loop."""
+        history = speaker.conversation_history
+        history.pin()
+        task = asyncio.ensure_future(speaker.agenerate_response(
+            topic=topic,
+            other_agents=[a for a in agents if a.name != speaker.name],
+            debate_context=context
+        ))
+        task.add_done_callback(lambda _: history.unpin())
+        return task
+    
+    def _discard_turn(self, pending) -> None:
+        """Drop a speculative turn the debate no longer needs."""
+        self.discarded_turns += 1
+        pending.cancel()
+        if isinstance(pending, asyncio.Future) and not pending.cancelled():
+            # Already running or done; keep an eventual error from being logged as unretrieved
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+    
+    def _begin_debate(
+        self,
+        agents: List[HistoricalAgent],
+        initial_context: Optional[Dict[str, Any]]
+    ) -> Tuple[float, DebateContext]:
+        """Reset per-debate state and attach agents to a fresh transcript."""
         if len(agents) < 2:
             raise ValueError("At least 2 agents are required for a debate")
         
         start_time = time.time()
-        self.debate_history = []
-        current_context = initial_context or {}
+        self.debate_history = RoundStore()
+        self.last_result = None
+        self.deadlock_detector.reset()
+        # Immutable snapshots: each round stores the context in O(1) without copying
+        current_context = DebateContext(initial_context)
         
         # Initialize positions
         for agent in agents:
             agent.current_position = agent.current_position.copy()
         
-        # Debate loop
-        for round_num in range(self.max_rounds):
-            # Determine current speaker (rotate through agents)
-            current_speaker = agents[round_num % len(agents)]
-            
-            # Generate response
-            response = current_speaker.generate_response(
-                topic=topic,
-                other_agents=[a for a in agents if a.name != current_speaker.name],
-                debate_context=current_context
-            )
+        # Pair scores are cached and only rescored for agents that change
+        self.consensus_tracker = ConsensusTracker(agents)
+        
+        # Every agent reads the same transcript instead of keeping its own copy
+        self.transcript = Transcript()
+        for agent in agents:
+            agent.attach_transcript(self.transcript)
+        
+        return start_time, current_context
+    
+    def _end_debate(self, agents: List[HistoricalAgent]) -> None:
+        """Detach agents from the debate transcript."""
+        for agent in agents:
+            agent.detach_transcript(self.transcript)
+    
+    def _complete_round(
+        self,
+        round_num: int,
+        current_speaker: HistoricalAgent,
+        topic: str,
+        response: str,
+        current_context: DebateContext,
+        agents: List[HistoricalAgent],
+        start_time: float,
+        retain_history: bool = True
+    ) -> RoundUpdate:
+        """
+        Record a generated response and check for consensus, deadlock or
+        the last round. The returned update carries the final result if the
+        debate ended.
+        """
+        # Record the round
+        round_data = DebateRound(
+            round_number=round_num + 1,
+            speaker=current_speaker.name,
+            topic=topic,
+            response=response,
+            timestamp=datetime.now(),
+            context=current_context
+        )
+        self.deadlock_detector.observe(response)
+        if retain_history:
+            self.debate_history.append(round_data)
             
-            # Record the round
-            round_data = DebateRound(
-                round_number=round_num + 1,
+            # Broadcast to every agent's conversation history with a single append
+            self.transcript.append(
                 speaker=current_speaker.name,
-                topic=topic,
-                response=response,
-                timestamp=datetime.now(),
-                context=current_context.copy()
+                content=response,
+                context=current_context
+            )
+        
+        # Check for consensus
+        consensus_score = self.consensus_tracker.record_round()
+        update = RoundUpdate(round=round_data, consensus_score=consensus_score)
+        if consensus_score >= self.consensus_threshold:
+            duration = (time.time() - start_time) / 60
+            update.result = self._create_result(
+                status=DebateStatus.CONSENSUS_REACHED,
+                agents=agents,
+                consensus_score=consensus_score,
+                duration=duration
             )
-            self.debate_history.append(round_data)
-            
-            # Add to conversation history
-            for agent in agents:
-                agent.add_to_history(
-                    speaker=current_speaker.name,
-                    content=response,
-                    context=current_context
-                )
-            
-            # Check for consensus
-            consensus_score = self._calculate_consensus_score(agents)
-            if consensus_score >= self.consensus_threshold:
-                duration = (time.time() - start_time) / 60
-                return self._create_result(
-                    status=DebateStatus.CONSENSUS_REACHED,
-                    agents=agents,
-                    consensus_score=consensus_score,
-                    duration=duration
-                )
-            
-            # Check for deadlock (no progress in recent rounds)
-            if self._is_deadlock():
-                duration = (time.time() - start_time) / 60
-                return self._create_result(
-                    status=DebateStatus.DEADLOCK,
-                    agents=agents,
-                    consensus_score=consensus_score,
-                    duration=duration
-                )
-            
-            # Update context for next round
-            current_context.update({
-                f"round_{round_num + 1}_response": response,
-                f"round_{round_num + 1}_speaker": current_speaker.name
-            })
         
+        # Check for deadlock (no progress in recent rounds)
+        elif self._is_deadlock():
+            duration = (time.time() - start_time) / 60
+            update.result = self._create_result(
+                status=DebateStatus.DEADLOCK,
+                agents=agents,
+                consensus_score=consensus_score,
+                duration=duration
+            )
+        
+        # Out of rounds: the last round's update carries the concluded result
+        elif round_num == self.max_rounds - 1:
+            update.result = self._conclude_debate(agents, start_time)
+        
+        if update.result is not None:
+            self.last_result = update.result
+        return update
+    
+    def _conclude_debate(self, agents: List[HistoricalAgent], start_time: float) -> DebateResult:
+        """Build the result for a debate that ran out of rounds."""
         # Debate concluded without consensus
         duration = (time.time() - start_time) / 60
-        final_consensus_score = self._calculate_consensus_score(agents)
+        final_consensus_score = self.consensus_tracker.current_score()
         
-        return self._create_result(
+        self.last_result = self._create_result(
             status=DebateStatus.CONCLUDED,
             agents=agents,
             consensus_score=final_consensus_score,
             duration=duration
         )
+        return self.last_result
     
     def _calculate_consensus_score(self, agents: List[HistoricalAgent]) -> float:
         """Calculate overall consensus score between all agents."""
         if len(agents) < 2:
             return 1.0
         
-        total_score = 0.0
-        pair_count = 0
-        
-        for i, agent1 in enumerate(agents):
-            for agent2 in agents[i+1:]:
-                score = agent1.calculate_consensus_score(agent2)
-                total_score += score
-                pair_count += 1
-        
-        return total_score / pair_count if pair_count > 0 else 0.0
+        return ConsensusMatrix(agents).mean_score()
     
-    def _is_deadlock(self, lookback_rounds: int = 5) -> bool:
+    def _is_deadlock(self) -> bool:
         """Check if the debate has reached a deadlock."""
-        if len(self.debate_history) < lookback_rounds:
-            return False
-        
-        # Simple deadlock detection: if the same points are being repeated
-        recent_responses = [round_data.response for round_data in self.debate_history[-lookback_rounds:]]
-        
-        # Check for repetitive content (simplified)
-        unique_responses = set(recent_responses)
-        return len(unique_responses) <= 2  # If only 2 or fewer unique responses in last 5 rounds
+        return self.deadlock_detector.is_deadlocked()
     
     def _create_result(
         self, 
@@ -179,84 +562,61 @@ class DebateSimulator:
     ) -> DebateResult:
         """Create a debate result object."""
         
-        # Extract key agreements and disagreements
-        agreements, disagreements = self._analyze_positions(agents)
-        
-        # Get final positions
+        # Snapshot positions: key agreements are computed lazily, after agents may have moved on
         final_positions = {
-            agent.name: agent.current_position for agent in agents
+            agent.name: dict(agent.current_position) for agent in agents
         }
         
+        # Key agreements and disagreements are only worked out when read
         return DebateResult(
             status=status,
             rounds=self.debate_history.copy(),
             consensus_score=consensus_score,
-            key_agreements=agreements,
-            key_disagreements=disagreements,
             final_positions=final_positions,
-            duration_minutes=duration
+            duration_minutes=duration,
+            consensus_trajectory=list(self.consensus_tracker.trajectory) if self.consensus_tracker else [],
+            position_index=PositionIndex(final_positions)
         )
     
     def _analyze_positions(self, agents: List[HistoricalAgent]) -> Tuple[List[str], List[str]]:
         """Analyze agent positions to find agreements and disagreements."""
-        agreements = []
-        disagreements = []
-        
-        # Compare positions on common topics
-        common_topics = set()
-        for agent in agents:
-            common_topics.update(agent.current_position.keys())
-        
-        for topic in common_topics:
-            positions = []
-            for agent in agents:
-                if topic in agent.current_position:
-                    positions.append((agent.name, agent.current_position[topic]))
-            
-            if len(positions) >= 2:
-                # Check if positions are similar
-                if self._positions_similar(positions):
-                    agreements.append(f"Agreement on {topic}: {positions[0][1]}")
-                else:
-                    disagreement_text = f"Disagreement on {topic}: "
-                    for name, pos in positions:
-                        disagreement_text += f"{name} ({pos}); "
-                    disagreements.append(disagreement_text.rstrip("; "))
-        
-        return agreements, disagreements
+        return PositionIndex({agent.name: agent.current_position for agent in agents}).analyze()
     
     def _positions_similar(self, positions: List[Tuple[str, str]], threshold: float = 0.7) -> bool:
-        """Check if positions are similar enough to be considered in agreement."""
-        # Simplified similarity check - in a real implementation, this would use
-        # more sophisticated NLP techniques
+        """Check if all positions are pairwise similar enough to be considered in agreement."""
         if len(positions) < 2:
             return True
         
-        # For now, just check if the first two positions contain similar keywords
-        pos1 = positions[0][1].lower()
-        pos2 = positions[1][1].lower()
-        
-        # Simple keyword overlap check
-        words1 = set(pos1.split())
-        words2 = set(pos2.split())
-        
-        if len(words1) == 0 or len(words2) == 0:
-            return False
-        
-        overlap = len(words1.intersection(words2))
-        total = len(words1.union(words2))
-        
-        return (overlap / total) >= threshold
+        similarity = jaccard_matrix([tokenize_position(position) for _, position in positions])
+        return all(
+            similarity[i, j] >= threshold
+            for i in range(len(positions)) for j in range(i + 1, len(positions))
+        )
     
-    def get_debate_transcript(self) -> str:
-        """Generate a readable transcript of the debate."""
-        transcript = "=== DEBATE TRANSCRIPT ===\n\n"
-        
-        for round_data in self.debate_history:
-            transcript += f"Round {round_data.round_number} - {round_data.speaker}:\n"
-            transcript += f"{round_data.response}\n\n"
+    def get_debate_transcript(self, offset: int = 0, limit: Optional[int] = None) -> str:
+        """
+        Generate a readable transcript of the debate, or of a page of
+        `limit` rounds from position `offset` (the heading is only on the
+        first page). TranscriptLog.get_debate_transcript() pages logged
+        debates the same way.
+        """
+        parts = ["=== DEBATE TRANSCRIPT ===\n\n"] if offset == 0 else []
+        stop = None if limit is None else offset + limit
+        for round_data in self.debate_history[offset:stop]:
+            parts.append(f"Round {round_data.round_number} - {round_data.speaker}:\n")
+            parts.append(f"{round_data.response}\n\n")
         
-        return transcript
+        return "".join(parts)
+    
+    def export_debate_jsonl(self, filepath: str, compression: Optional[str] = None) -> None:
+        """
+        Export debate data as JSONL, one line per round (see
+        debates.export). Unlike export_debate_data, rounds do not repeat
+        the context, so the file grows linearly with the debate.
+        """
+        # Imported here: debates.export builds on this module's types
+        from .export import export_rounds
+        export_rounds(self.debate_history, filepath, compression)
     
     def export_debate_data(self, filepath: str) -> None:
         """Export debate data to JSON file."""
@@ -268,7 +628,7 @@ class DebateSimulator:
                     "topic": round_data.topic,
                     "response": round_data.response,
                     "timestamp": round_data.timestamp.isoformat(),
-                    "context": round_data.context
+                    "context": dict(round_data.context)
                 }
                 for round_data in self.debate_history
             ]
@@ -0,0 +1,233 @@
+"""
+Streaming JSONL export of debates, optionally compressed.
+"""
+
+import gzip
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .context import DebateContext
+from .debate_simulator import DebateResult, DebateRound
+
+
+COMPRESSIONS = ("gzip", "zstd")
+_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+
+def infer_compression(path: str) -> Optional[str]:
+    """Compression implied by a file name: 'gzip' for .gz, 'zstd' for .zst, otherwise None."""
+    return _SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the 'zstandard' package: pip install zstandard") from None
+    return zstandard
+
+
+class JSONLExporter:
+    """
+    Writes a debate to a JSONL file one round at a time, as it is produced.
+
+    The file holds one JSON object per line:
+    - {"type": "debate", ...} opens a debate with its topic, agents and
+      initial context;
+    - {"type": "round", ...} follows for each DebateRound;
+    - {"type": "result", ...} closes the debate with its outcome.
+    Rounds do not repeat the context: the context before round N is the
+    initial context plus rounds 1..N-1, which read_rounds() rebuilds. Memory
+    use and line size therefore do not grow with the debate. Several
+    debates can be appended to one file.
+
+    Lines are flushed to the OS every flush_every rounds (0: only on close).
+    A compressed stream is sync-flushed, so everything written before a
+    crash up to the last flush can be read back. With fsync=True each flush
+    is also forced to disk.
+
+    Args:
+        path: Output file
+        compression: None, 'gzip' or 'zstd'; by default inferred from the
+            file name (.gz, .zst). zstd needs the zstandard package.
+        flush_every: Rounds between flushes
+        fsync: fsync the file on every flush
+        append: Add to an existing file instead of replacing it
+
+    Example:
+        >>> with JSONLExporter("debates.jsonl.gz") as exporter:
+        ...     simulator.debate(agents, "partition_of_india", exporter=exporter)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = None,
+        flush_every: int = 1,
+        fsync: bool = False,
+        append: bool = False
+    ):
+        compression = compression or infer_compression(path)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}. Available: {list(COMPRESSIONS)}")
+        self.path = path
+        self.compression = compression
+        self.flush_every = flush_every
+        self.fsync = fsync
+        self.rounds_written = 0
+        self._unflushed = 0
+
+        self._raw: BinaryIO = open(path, "ab" if append else "wb")
+        self._zstd_flush = None
+        if compression == "gzip":
+            # Appending adds a new gzip member, which readers concatenate
+            self._stream: BinaryIO = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif compression == "zstd":
+            zstandard = _zstandard()
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+            self._zstd_flush = zstandard.FLUSH_BLOCK
+        else:
+            self._stream = self._raw
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        self._stream.write(line.encode("utf-8") + b"\n")
+
+    def begin(self, topic: str, agents: Sequence[str], initial_context: Optional[Mapping[str, Any]] = None) -> None:
+        """Start a debate."""
+        self._write({
+            "type": "debate",
+            "topic": topic,
+            "agents": list(agents),
+            "context": dict(initial_context or {}),
+            "started": datetime.now().isoformat()
+        })
+        self.flush()
+
+    def write_round(self, round_data: DebateRound) -> None:
+        """Append one DebateRound."""
+        self._write({
+            "type": "round",
+            "round_number": round_data.round_number,
+            "speaker": round_data.speaker,
+            "topic": round_data.topic,
+            "response": round_data.response,
+            "timestamp": round_data.timestamp.isoformat()
+        })
+        self.rounds_written += 1
+        self._unflushed += 1
+        if self.flush_every and self._unflushed >= self.flush_every:
+            self.flush()
+
+    def write_result(self, result: DebateResult) -> None:
+        """Close the current debate with its DebateResult."""
+        self._write({
+            "type": "result",
+            "status": result.status.value,
+            "consensus_score": result.consensus_score,
+            "rounds": len(result.rounds),
+            "duration_minutes": result.duration_minutes,
+            "key_agreements": list(result.key_agreements),
+            "key_disagreements": list(result.key_disagreements),
+            "final_positions": result.final_positions,
+            "consensus_trajectory": list(result.consensus_trajectory)
+        })
+        self.flush()
+
+    def flush(self) -> None:
+        """Push everything written so far to the OS (and to disk with fsync)."""
+        if self.compression == "gzip":
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == "zstd":
+            self._stream.flush(self._zstd_flush)
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+        self._unflushed = 0
+
+    def close(self) -> None:
+        if self._raw.closed:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+        self._raw.close()
+
+    def __enter__(self) -> 'JSONLExporter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _open_lines(path: str, compression: Optional[str]) -> Iterator[bytes]:
+    compression = compression or infer_compression(path)
+    with open(path, "rb") as raw:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
+        elif compression == "zstd":
+            stream = io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True))
+        else:
+            stream = raw
+        try:
+            yield from stream
+        except EOFError:
+            # A compressed stream cut short by a crash; keep what was flushed
+            return
+
+
+def read_records(path: str, compression: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the records of a JSONL export. A truncated tail, such as
+    the line being written when a process crashed, is skipped.
+    """
+    for line in _open_lines(path, compression):
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            return
+
+
+def read_rounds(path: str, compression: Optional[str] = None) -> Iterator[DebateRound]:
+    """
+    Rebuild the DebateRounds of a JSONL export, each with the context it
+    had when it was produced. Contexts share structure the way they do in
+    a live debate, so reading stays O(1) per round.
+    """
+    context = DebateContext()
+    for record in read_records(path, compression):
+        kind = record.get("type")
+        if kind == "debate":
+            context = DebateContext(record.get("context"))
+        elif kind == "round":
+            yield DebateRound(
+                round_number=record["round_number"],
+                speaker=record["speaker"],
+                topic=record["topic"],
+                response=record["response"],
+                timestamp=datetime.fromisoformat(record["timestamp"]),
+                context=context
+            )
+            context = context.with_round(record["speaker"], record["response"])
+
+
+def export_rounds(
+    rounds: Sequence[DebateRound],
+    path: str,
+    compression: Optional[str] = None,
+    agents: Optional[List[str]] = None
+) -> None:
+    """Write already-finished rounds as one debate in the JSONL format."""
+    with JSONLExporter(path, compression=compression, flush_every=0) as exporter:
+        if rounds:
+            # The first round's context is the debate's initial context
+            first = rounds[0]
+            exporter.begin(first.topic, agents or list(dict.fromkeys(r.speaker for r in rounds)), first.context)
+        for round_data in rounds:
+            exporter.write_round(round_data)
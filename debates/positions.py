@@ -0,0 +1,106 @@
+"""
+Position similarity index for finding agreements between agents.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+@lru_cache(maxsize=16384)
+def _tokens(text: str) -> FrozenSet[str]:
+    return frozenset(text.lower().split())
+
+
+def tokenize_position(position: Any) -> FrozenSet[str]:
+    """Lower-cased word set of a position, cached per distinct position text."""
+    return _tokens(str(position))
+
+
+def jaccard_matrix(token_sets: List[FrozenSet[str]]) -> np.ndarray:
+    """All-pairs Jaccard similarity of token sets in one batched computation."""
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, tokens in enumerate(token_sets):
+        for token in tokens:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    incidence = np.zeros((len(token_sets), len(vocabulary)), dtype=np.float64)
+    incidence[rows, cols] = 1.0
+    sizes = incidence.sum(axis=1)
+
+    overlap = incidence @ incidence.T
+    union = sizes[:, None] + sizes[None, :] - overlap
+    # Empty positions never agree with anything, as before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = np.where(union > 0, overlap / union, 0.0)
+    empty = sizes == 0
+    similarity[empty, :] = 0.0
+    similarity[:, empty] = 0.0
+    return similarity
+
+
+class PositionIndex:
+    """
+    Groups agents' positions by topic and decides, per topic, whether every
+    pair of agents holding a position agrees (Jaccard word overlap at least
+    `threshold`). Position texts are tokenized once and the analysis is only
+    computed when first requested.
+    """
+
+    def __init__(self, positions: Mapping[str, Mapping[str, Any]], threshold: float = 0.7):
+        self.threshold = threshold
+        self._positions = positions
+        self._grouped: Optional[Dict[str, List[Tuple[str, Any]]]] = None
+        self._analysis: Optional[Tuple[List[str], List[str]]] = None
+
+    @property
+    def _by_topic(self) -> Dict[str, List[Tuple[str, Any]]]:
+        """topic -> [(agent name, position)], topics in first-seen order."""
+        if self._grouped is None:
+            grouped: Dict[str, List[Tuple[str, Any]]] = {}
+            for name, agent_positions in self._positions.items():
+                for topic, position in agent_positions.items():
+                    grouped.setdefault(topic, []).append((name, position))
+            self._grouped = grouped
+        return self._grouped
+
+    @property
+    def topics(self) -> List[str]:
+        return list(self._by_topic)
+
+    def positions(self, topic: str) -> List[Tuple[str, Any]]:
+        return self._by_topic.get(topic, [])
+
+    def similarity(self, topic: str) -> np.ndarray:
+        """Pairwise Jaccard matrix for the agents holding a position on the topic."""
+        return jaccard_matrix([tokenize_position(position) for _, position in self.positions(topic)])
+
+    def agrees(self, topic: str) -> bool:
+        """Whether all agents with a position on the topic agree pairwise."""
+        positions = self.positions(topic)
+        if len(positions) < 2:
+            return True
+        similarity = self.similarity(topic)
+        upper = similarity[np.triu_indices(len(positions), k=1)]
+        return bool((upper >= self.threshold).all())
+
+    def analyze(self) -> Tuple[List[str], List[str]]:
+        """Return (agreements, disagreements) for topics held by two or more agents."""
+        if self._analysis is None:
+            agreements = []
+            disagreements = []
+            for topic, positions in self._by_topic.items():
+                if len(positions) < 2:
+                    continue
+                if self.agrees(topic):
+                    agreements.append(f"Agreement on {topic}: {positions[0][1]}")
+                else:
+                    disagreement_text = f"Disagreement on {topic}: "
+                    for name, pos in positions:
+                        disagreement_text += f"{name} ({pos}); "
+                    disagreements.append(disagreement_text.rstrip("; "))
+            self._analysis = (agreements, disagreements)
+        return self._analysis
@@ -0,0 +1,426 @@
+"""
+Indexed SQLite repository of past debates.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .debate_simulator import DebateResult, DebateRound
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS debates (
+    id INTEGER PRIMARY KEY,
+    topic TEXT NOT NULL,
+    started TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS debate_agents (
+    debate_id INTEGER NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    agent_id INTEGER NOT NULL REFERENCES agents (id),
+    PRIMARY KEY (debate_id, agent_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rounds (
+    debate_id INTEGER NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    round_number INTEGER NOT NULL,
+    speaker_id INTEGER NOT NULL REFERENCES agents (id),
+    response TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    PRIMARY KEY (debate_id, round_number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    debate_id INTEGER PRIMARY KEY REFERENCES debates (id) ON DELETE CASCADE,
+    status TEXT NOT NULL,
+    consensus_score REAL NOT NULL,
+    rounds INTEGER NOT NULL,
+    duration_minutes REAL NOT NULL,
+    key_agreements TEXT NOT NULL,
+    key_disagreements TEXT NOT NULL,
+    final_positions TEXT NOT NULL,
+    consensus_trajectory TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS debates_topic ON debates (topic);
+CREATE INDEX IF NOT EXISTS debate_agents_agent ON debate_agents (agent_id, debate_id);
+CREATE INDEX IF NOT EXISTS rounds_speaker ON rounds (speaker_id);
+CREATE INDEX IF NOT EXISTS results_status ON results (status, consensus_score);
+CREATE INDEX IF NOT EXISTS results_consensus ON results (consensus_score);
+"""
+
+
+@dataclass
+class DebateSummary:
+    """A stored debate's metadata and result, without its rounds."""
+    id: int
+    topic: str
+    agents: List[str]
+    status: str
+    consensus_score: float
+    rounds: int
+    duration_minutes: float
+    started: datetime
+    key_agreements: List[str] = field(default_factory=list)
+    key_disagreements: List[str] = field(default_factory=list)
+
+
+_SUMMARY_QUERY = (
+    "SELECT d.id, d.topic, d.started, r.status, r.consensus_score, r.rounds, r.duration_minutes,"
+    " r.key_agreements, r.key_disagreements"
+    " FROM debates d JOIN results r ON r.debate_id = d.id"
+)
+
+
+def _summary(row: Tuple[Any, ...], participants: Dict[int, List[str]]) -> DebateSummary:
+    return DebateSummary(
+        id=row[0],
+        topic=row[1],
+        agents=participants.get(row[0], []),
+        status=row[3],
+        consensus_score=row[4],
+        rounds=row[5],
+        duration_minutes=row[6],
+        started=datetime.fromisoformat(row[2]),
+        key_agreements=json.loads(row[7]),
+        key_disagreements=json.loads(row[8])
+    )
+
+
+class DebateRepository:
+    """
+    SQLite store of debates, their participants, rounds and results.
+
+    Queries filter on indexed columns (topic, participant, speaker, status,
+    consensus score), and summaries and rounds are read separately and in
+    pages, so browsing never loads whole debates. add() commits each debate
+    on its own; inside bulk() many debates share one transaction, which is
+    much faster for batch runs. A nested bulk() is a savepoint: an error
+    escaping it undoes only its own writes, and the outer block may carry
+    on. Writes go through their own connection, held by one thread for the
+    length of its transaction; queries use a second connection and see only
+    committed debates, so in WAL mode readers (e.g. the web app, or other
+    threads) are not blocked while a sweep writes.
+
+    Example:
+        >>> repo = DebateRepository("debates.sqlite")
+        >>> with repo.bulk():
+        ...     for outcome in run_batch(scenarios, keep_rounds=True):
+        ...         repo.add(outcome.result, topic=outcome.scenario.topic)
+        >>> repo.find_debates(topic="partition_of_india", status="deadlock", agent="Muhammad Ali Jinnah")
+    """
+
+    def __init__(self, path: str = "debates.sqlite"):
+        self.path = path
+        self._writer = self._connect(path)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(_SCHEMA)
+        self._db = self._connect(path)
+        self._lock = threading.Lock()  # Guards _db, one statement at a time
+        self._write_lock = threading.RLock()  # Held by the thread whose transaction is open on _writer
+        self._write_owner: Optional[int] = None
+        self._agent_ids: Dict[str, int] = {}  # Committed agent rows only
+        self._new_agent_ids: List[Dict[str, int]] = []  # Rows inserted by each open bulk() level
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA foreign_keys=ON")
+        return db
+
+    @contextmanager
+    def bulk(self) -> Iterator['DebateRepository']:
+        """
+        Group every add() in the block into a single transaction, or into a
+        savepoint of the enclosing one. Other threads' writes wait until the
+        outermost block ends.
+        """
+        with self._write_lock:
+            level = len(self._new_agent_ids)
+            if level == 0:
+                self._writer.execute("BEGIN IMMEDIATE")
+                self._write_owner = threading.get_ident()
+            else:
+                self._writer.execute(f"SAVEPOINT bulk_{level}")
+            self._new_agent_ids.append({})
+            try:
+                yield self
+            except BaseException:
+                # The rolled-back agent rows are gone; their ids may be reused
+                self._new_agent_ids.pop()
+                if level == 0:
+                    self._write_owner = None
+                    self._writer.execute("ROLLBACK")
+                else:
+                    self._writer.execute(f"ROLLBACK TO bulk_{level}")
+                    self._writer.execute(f"RELEASE bulk_{level}")
+                raise
+            inserted = self._new_agent_ids.pop()
+            if level == 0:
+                self._write_owner = None
+                self._writer.execute("COMMIT")
+                self._agent_ids.update(inserted)
+            else:
+                self._writer.execute(f"RELEASE bulk_{level}")
+                self._new_agent_ids[-1].update(inserted)
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """The connection for a query: the writer inside this thread's own bulk(), so it sees its writes."""
+        if self._write_owner == threading.get_ident():
+            yield self._writer
+        else:
+            with self._lock:
+                yield self._db
+
+    def _agent_id(self, name: str) -> int:
+        agent_id = self._agent_ids.get(name)
+        if agent_id is None:
+            agent_id = next((ids[name] for ids in self._new_agent_ids if name in ids), None)
+        if agent_id is None:
+            self._writer.execute("INSERT OR IGNORE INTO agents (name) VALUES (?)", (name,))
+            agent_id = self._writer.execute("SELECT id FROM agents WHERE name = ?", (name,)).fetchone()[0]
+            self._new_agent_ids[-1][name] = agent_id
+        return agent_id
+
+    def add(
+        self,
+        result: DebateResult,
+        topic: Optional[str] = None,
+        agents: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Store a debate with its rounds and result and return its id. The
+        topic and agent names default to those of the result's rounds and
+        final positions.
+        """
+        rounds = result.rounds
+        if topic is None:
+            topic = rounds[0].topic if rounds else ""
+        if agents is None:
+            agents = list(result.final_positions) or list(dict.fromkeys(r.speaker for r in rounds))
+        started = rounds[0].timestamp if rounds else datetime.now()
+
+        with self.bulk():
+            debate_id = self._writer.execute(
+                "INSERT INTO debates (topic, started) VALUES (?, ?)", (topic, started.isoformat())
+            ).lastrowid
+            self._writer.executemany(
+                "INSERT OR IGNORE INTO debate_agents (debate_id, agent_id) VALUES (?, ?)",
+                [(debate_id, self._agent_id(name)) for name in agents]
+            )
+            self._writer.executemany(
+                "INSERT INTO rounds (debate_id, round_number, speaker_id, response, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (debate_id, r.round_number, self._agent_id(r.speaker), r.response, r.timestamp.isoformat())
+                    for r in rounds
+                ]
+            )
+            self._writer.execute(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    debate_id,
+                    result.status.value,
+                    result.consensus_score,
+                    len(rounds),
+                    result.duration_minutes,
+                    json.dumps(list(result.key_agreements), ensure_ascii=False),
+                    json.dumps(list(result.key_disagreements), ensure_ascii=False),
+                    json.dumps(result.final_positions, ensure_ascii=False, default=str),
+                    json.dumps(list(result.consensus_trajectory))
+                )
+            )
+        return debate_id
+
+    def add_many(
+        self,
+        debates: Iterable[Union[DebateResult, Tuple[DebateResult, str, Optional[Sequence[str]]]]]
+    ) -> List[int]:
+        """Store many debates in one transaction; items are results or (result, topic, agents) tuples."""
+        with self.bulk():
+            return [
+                self.add(*item) if isinstance(item, tuple) else self.add(item)
+                for item in debates
+            ]
+
+    def _where(
+        self,
+        topic: Optional[str],
+        status: Optional[str],
+        agent: Optional[str],
+        min_consensus: Optional[float],
+        max_consensus: Optional[float]
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if topic is not None:
+            clauses.append("d.topic = ?")
+            params.append(topic)
+        if status is not None:
+            clauses.append("r.status = ?")
+            params.append(getattr(status, "value", status))
+        if agent is not None:
+            # Exact name, so the lookup uses the unique index on agents.name
+            clauses.append(
+                "d.id IN (SELECT debate_id FROM debate_agents"
+                " WHERE agent_id = (SELECT id FROM agents WHERE name = ?))"
+            )
+            params.append(agent)
+        if min_consensus is not None:
+            clauses.append("r.consensus_score >= ?")
+            params.append(min_consensus)
+        if max_consensus is not None:
+            clauses.append("r.consensus_score <= ?")
+            params.append(max_consensus)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def find_debates(
+        self,
+        topic: Optional[str] = None,
+        status: Optional[str] = None,
+        agent: Optional[str] = None,
+        min_consensus: Optional[float] = None,
+        max_consensus: Optional[float] = None,
+        limit: Optional[int] = 100,
+        offset: int = 0
+    ) -> List[DebateSummary]:
+        """
+        Summaries of matching debates, newest first. `status` is a
+        DebateStatus or its value, `agent` the exact name of a
+        participant.
+        """
+        where, params = self._where(topic, status, agent, min_consensus, max_consensus)
+        with self._reading() as db:
+            rows = db.execute(
+                f"{_SUMMARY_QUERY}{where} ORDER BY d.id DESC LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+            participants = self._participants(db, [row[0] for row in rows])
+        return [_summary(row, participants) for row in rows]
+
+    def count_debates(
+        self,
+        topic: Optional[str] = None,
+        status: Optional[str] = None,
+        agent: Optional[str] = None,
+        min_consensus: Optional[float] = None,
+        max_consensus: Optional[float] = None
+    ) -> int:
+        """Number of debates find_debates() would match without a limit."""
+        where, params = self._where(topic, status, agent, min_consensus, max_consensus)
+        with self._reading() as db:
+            return db.execute(
+                f"SELECT COUNT(*) FROM debates d JOIN results r ON r.debate_id = d.id{where}", params
+            ).fetchone()[0]
+
+    @staticmethod
+    def _participants(db: sqlite3.Connection, debate_ids: List[int]) -> Dict[int, List[str]]:
+        if not debate_ids:
+            return {}
+        marks = ",".join("?" * len(debate_ids))
+        participants: Dict[int, List[str]] = {}
+        for debate_id, name in db.execute(
+            "SELECT da.debate_id, a.name FROM debate_agents da JOIN agents a ON a.id = da.agent_id"
+            f" WHERE da.debate_id IN ({marks}) ORDER BY a.name",
+            debate_ids
+        ):
+            participants.setdefault(debate_id, []).append(name)
+        return participants
+
+    def get_debate(self, debate_id: int) -> Optional[DebateSummary]:
+        """Summary of one debate, or None if there is no such debate."""
+        with self._reading() as db:
+            row = db.execute(_SUMMARY_QUERY + " WHERE d.id = ?", (debate_id,)).fetchone()
+            participants = self._participants(db, [debate_id]) if row else {}
+        return _summary(row, participants) if row else None
+
+    def get_rounds(self, debate_id: int, offset: int = 0, limit: Optional[int] = None) -> List[DebateRound]:
+        """
+        A page of a debate's rounds, in order. Rounds are returned without
+        their context snapshots, which are not stored.
+        """
+        with self._reading() as db:
+            rows = db.execute(
+                "SELECT r.round_number, a.name, d.topic, r.response, r.timestamp"
+                " FROM rounds r JOIN agents a ON a.id = r.speaker_id JOIN debates d ON d.id = r.debate_id"
+                " WHERE r.debate_id = ? ORDER BY r.round_number LIMIT ? OFFSET ?",
+                (debate_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [
+            DebateRound(
+                round_number=row[0],
+                speaker=row[1],
+                topic=row[2],
+                response=row[3],
+                timestamp=datetime.fromisoformat(row[4]),
+                context={}
+            )
+            for row in rows
+        ]
+
+    def find_rounds(
+        self,
+        speaker: Optional[str] = None,
+        topic: Optional[str] = None,
+        limit: Optional[int] = 100,
+        offset: int = 0
+    ) -> List[Tuple[int, DebateRound]]:
+        """(debate id, round) pairs by an exact speaker name and/or topic, newest debates first."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if speaker is not None:
+            clauses.append("r.speaker_id = (SELECT id FROM agents WHERE name = ?)")
+            params.append(speaker)
+        if topic is not None:
+            clauses.append("d.topic = ?")
+            params.append(topic)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._reading() as db:
+            rows = db.execute(
+                "SELECT r.debate_id, r.round_number, a.name, d.topic, r.response, r.timestamp"
+                " FROM rounds r JOIN agents a ON a.id = r.speaker_id JOIN debates d ON d.id = r.debate_id"
+                f"{where} ORDER BY r.debate_id DESC, r.round_number LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return [
+            (row[0], DebateRound(
+                round_number=row[1],
+                speaker=row[2],
+                topic=row[3],
+                response=row[4],
+                timestamp=datetime.fromisoformat(row[5]),
+                context={}
+            ))
+            for row in rows
+        ]
+
+    def topics(self) -> List[str]:
+        """Every stored topic, for filter menus."""
+        with self._reading() as db:
+            return [row[0] for row in db.execute("SELECT DISTINCT topic FROM debates ORDER BY topic")]
+
+    def agents(self) -> List[str]:
+        """Every stored agent name."""
+        with self._reading() as db:
+            return [row[0] for row in db.execute("SELECT name FROM agents ORDER BY name")]
+
+    def delete(self, debate_id: int) -> None:
+        """Remove a debate with its rounds and result."""
+        with self.bulk():
+            self._writer.execute("DELETE FROM debates WHERE id = ?", (debate_id,))
+
+    def close(self) -> None:
+        with self._write_lock, self._lock:
+            self._writer.close()
+            self._db.close()
+
+    def __enter__(self) -> 'DebateRepository':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
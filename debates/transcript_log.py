@@ -0,0 +1,443 @@
+"""
+Append-only binary transcript log with offset indexes, read through mmap.
+
+Usage:
+    python -m debates.transcript_log transcripts.log            # list debates
+    python -m debates.transcript_log transcripts.log 42 --offset 100 --limit 20
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .debate_simulator import DebateResult, DebateRound
+
+
+_MAGIC = b"DTLOG\x00\x01\n"
+# Round record: round number, epoch timestamp, speaker and response byte
+# lengths, then the UTF-8 speaker and response
+_ROUND = struct.Struct("<IdHI")
+# Debate record: byte length of a UTF-8 JSON header (topic, agents, context)
+_DEBATE = struct.Struct("<I")
+# Round index entry: log offset of the round record
+_ROUND_ENTRY = struct.Struct("<Q")
+# Debate index entry: log offset of the debate record, position of its first round in the round index
+_DEBATE_ENTRY = struct.Struct("<QQ")
+
+
+def index_paths(path: str) -> Tuple[str, str]:
+    """The round and debate index files that accompany a transcript log."""
+    return path + ".idx", path + ".debates"
+
+
+def _trim(path: str, entry_size: int) -> int:
+    """Drop a partially written trailing index entry; returns the number of whole entries."""
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size % entry_size:
+        os.truncate(path, size - size % entry_size)
+    return size // entry_size
+
+
+class TranscriptLogWriter:
+    """
+    Appends debates to a binary transcript log.
+
+    The log (`path`) holds a debate record followed by one record per
+    round, each round's speaker and response stored as raw UTF-8. Two
+    fixed-width indexes sit beside it: `path.idx` holds the log offset of
+    every round, `path.debates` the offset of every debate and the index
+    position of its first round. Nothing is ever rewritten, so a crash
+    loses at most the unflushed tail, and readers can map the files while
+    they grow. Debates are numbered from 0 in the order they are begun.
+
+    The writer has the exporter interface of JSONLExporter, so it can be
+    passed to DebateSimulator.debate()/iter_rounds() to log a debate as it
+    runs. One debate is written at a time: rounds belong to the debate
+    most recently begun. append_debate() writes a finished debate in one
+    step and is safe to call from several threads.
+
+    Args:
+        path: Log file; created, or appended to if it exists
+        flush_every: Rounds between flushes (0: only on begin, result and close)
+        fsync: fsync the files on every flush
+
+    Example:
+        >>> with TranscriptLogWriter("transcripts.log") as log:
+        ...     simulator.debate(agents, "partition_of_india", exporter=log)
+    """
+
+    def __init__(self, path: str, flush_every: int = 1, fsync: bool = False):
+        self.path = path
+        self.flush_every = flush_every
+        self.fsync = fsync
+        self.debate_id: Optional[int] = None
+        self._lock = threading.RLock()
+        self._unflushed = 0
+
+        round_index, debate_index = index_paths(path)
+        self._round_count = _trim(round_index, _ROUND_ENTRY.size)
+        self._debate_count = _trim(debate_index, _DEBATE_ENTRY.size)
+
+        self._log: BinaryIO = open(path, "ab")
+        self._offset = self._log.tell()
+        if self._offset == 0:
+            self._log.write(_MAGIC)
+            self._offset = len(_MAGIC)
+        else:
+            with open(path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    self._log.close()
+                    raise ValueError(f"{path} is not a transcript log")
+        self._round_index: BinaryIO = open(round_index, "ab")
+        self._debate_index: BinaryIO = open(debate_index, "ab")
+
+    def _append(self, data: bytes) -> int:
+        offset = self._offset
+        self._log.write(data)
+        self._offset += len(data)
+        return offset
+
+    def begin(self, topic: str, agents: Sequence[str], initial_context: Optional[Mapping[str, Any]] = None) -> int:
+        """Start a debate and return its id."""
+        header = json.dumps({
+            "topic": topic,
+            "agents": list(agents),
+            "context": dict(initial_context or {}),
+            "started": datetime.now().isoformat()
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        with self._lock:
+            offset = self._append(_DEBATE.pack(len(header)) + header)
+            self._debate_index.write(_DEBATE_ENTRY.pack(offset, self._round_count))
+            self.debate_id = self._debate_count
+            self._debate_count += 1
+            self.flush()
+            return self.debate_id
+
+    def write_round(self, round_data: DebateRound) -> None:
+        """Append one round to the current debate."""
+        if self.debate_id is None:
+            raise RuntimeError("write_round() called before begin()")
+        speaker = round_data.speaker.encode("utf-8")
+        response = round_data.response.encode("utf-8")
+        with self._lock:
+            offset = self._append(
+                _ROUND.pack(round_data.round_number, round_data.timestamp.timestamp(), len(speaker), len(response))
+                + speaker + response
+            )
+            self._round_index.write(_ROUND_ENTRY.pack(offset))
+            self._round_count += 1
+            self._unflushed += 1
+            if self.flush_every and self._unflushed >= self.flush_every:
+                self.flush()
+
+    def write_result(self, result: DebateResult) -> None:
+        """Finish the current debate. Only transcripts are logged; the result itself is not stored."""
+        self.flush()
+
+    def append_debate(
+        self,
+        rounds: Sequence[DebateRound],
+        topic: Optional[str] = None,
+        agents: Optional[Sequence[str]] = None,
+        initial_context: Optional[Mapping[str, Any]] = None
+    ) -> int:
+        """Write a finished debate's rounds as one debate and return its id."""
+        if topic is None:
+            topic = rounds[0].topic if rounds else ""
+        if agents is None:
+            agents = list(dict.fromkeys(r.speaker for r in rounds))
+        with self._lock:
+            flush_every, self.flush_every = self.flush_every, 0
+            try:
+                debate_id = self.begin(topic, agents, initial_context)
+                for round_data in rounds:
+                    self.write_round(round_data)
+            finally:
+                self.flush_every = flush_every
+            self.flush()
+            return debate_id
+
+    def flush(self) -> None:
+        """Push everything written so far to the OS (and to disk with fsync)."""
+        with self._lock:
+            # Log before indexes, so an index entry never points past the data
+            for f in (self._log, self._round_index, self._debate_index):
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._unflushed = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log.closed:
+                return
+            self.flush()
+            for f in (self._log, self._round_index, self._debate_index):
+                f.close()
+
+    def __enter__(self) -> 'TranscriptLogWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _map(path: str) -> Optional[mmap.mmap]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _Mapping(NamedTuple):
+    """The log and its indexes as mapped at one moment; replaced whole on refresh."""
+    log: mmap.mmap
+    view: memoryview
+    rounds: Optional[mmap.mmap]
+    debates: Optional[mmap.mmap]
+    round_count: int
+    debate_count: int
+
+    def debate_entry(self, debate_id: int) -> Tuple[int, int, int]:
+        """(debate record offset, first round position, round count) of a debate."""
+        offset, first = _DEBATE_ENTRY.unpack_from(self.debates, debate_id * _DEBATE_ENTRY.size)
+        if debate_id + 1 < self.debate_count:
+            end = _DEBATE_ENTRY.unpack_from(self.debates, (debate_id + 1) * _DEBATE_ENTRY.size)[1]
+        else:
+            end = self.round_count
+        return offset, first, end - first
+
+
+class TranscriptLog:
+    """
+    Reads a transcript log written by TranscriptLogWriter.
+
+    The log and its indexes are memory-mapped, so opening a multi-GB log
+    costs nothing up front. Finding round N of debate D is two index
+    lookups and one record header read, independent of the size of the
+    log or the debate, and only the pages touched are read from disk.
+    response_view() returns a round's UTF-8 response as a memoryview into
+    the mapping, without copying it; write_transcript() streams whole
+    transcripts the same way.
+
+    The log may still be growing: lookups past the mapped end remap the
+    files before giving up. Memoryviews from response_view() keep their
+    mapping alive, and must be released before close().
+
+    Example:
+        >>> log = TranscriptLog("transcripts.log")
+        >>> log.get_round(42, 1000).response
+        >>> page = log.get_rounds(42, offset=100, limit=20)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._speakers: Dict[bytes, str] = {}
+        self._mapping: Optional[_Mapping] = None
+        self._round_index: Optional[BinaryIO] = None  # Kept open to see, with one fstat, whether rounds were added
+        self.refresh()
+
+    def refresh(self) -> _Mapping:
+        """Remap the files to pick up debates and rounds written since they were mapped."""
+        round_index, debate_index = index_paths(self.path)
+        if self._round_index is None and os.path.exists(round_index):
+            self._round_index = open(round_index, "rb")
+        log = _map(self.path)
+        if log is None or log[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{self.path} is not a transcript log")
+        rounds = _map(round_index)
+        debates = _map(debate_index)
+        # The previous mapping is left to the garbage collector, as views into it may still be in use
+        self._mapping = _Mapping(
+            log=log,
+            view=memoryview(log),
+            rounds=rounds,
+            debates=debates,
+            round_count=len(rounds) // _ROUND_ENTRY.size if rounds is not None else 0,
+            debate_count=len(debates) // _DEBATE_ENTRY.size if debates is not None else 0
+        )
+        return self._mapping
+
+    def _grown(self, mapping: _Mapping) -> bool:
+        """Whether rounds have been written since the files were mapped."""
+        if self._round_index is None:
+            return os.path.exists(index_paths(self.path)[0])
+        mapped = len(mapping.rounds) if mapping.rounds is not None else 0
+        return os.fstat(self._round_index.fileno()).st_size > mapped
+
+    def _current(self) -> _Mapping:
+        if self._mapping is None:
+            raise ValueError(f"{self.path} is closed")
+        return self._mapping
+
+    def __len__(self) -> int:
+        """Number of debates in the log."""
+        return self._current().debate_count
+
+    def _locate(self, debate_id: int, needed: Optional[int] = None) -> Tuple[_Mapping, int, int, int]:
+        """
+        A mapping holding the debate, with the debate's record offset, first
+        round position and round count. The files are remapped if the
+        debate is not mapped yet, or if its first `needed` rounds (all of
+        them when None) are not and the round index has grown since.
+        """
+        mapping = self._current()
+        if debate_id < 0:
+            raise IndexError(f"No debate {debate_id} in {self.path}")
+        if debate_id >= mapping.debate_count:
+            mapping = self.refresh()
+            if debate_id >= mapping.debate_count:
+                raise IndexError(f"No debate {debate_id} in {self.path}")
+        offset, first, count = mapping.debate_entry(debate_id)
+        if debate_id == mapping.debate_count - 1 and (needed is None or needed > count) and self._grown(mapping):
+            # The last debate has grown since it was mapped
+            mapping = self.refresh()
+            offset, first, count = mapping.debate_entry(debate_id)
+        return mapping, offset, first, count
+
+    def round_count(self, debate_id: int) -> int:
+        """Number of rounds logged for a debate."""
+        return self._locate(debate_id)[3]
+
+    def debate(self, debate_id: int) -> Dict[str, Any]:
+        """A debate's header: topic, agents, initial context, start time and round count."""
+        mapping, offset, _, count = self._locate(debate_id)
+        header = self._header(mapping, offset)
+        header["rounds"] = count
+        return header
+
+    @staticmethod
+    def _header(mapping: _Mapping, offset: int) -> Dict[str, Any]:
+        (length,) = _DEBATE.unpack_from(mapping.log, offset)
+        start = offset + _DEBATE.size
+        return json.loads(str(mapping.view[start:start + length], "utf-8"))
+
+    def _record(self, mapping: _Mapping, position: int) -> Tuple[int, float, str, int, int]:
+        """(round number, timestamp, speaker, response start, response end) of the round at an index position."""
+        (offset,) = _ROUND_ENTRY.unpack_from(mapping.rounds, position * _ROUND_ENTRY.size)
+        number, timestamp, speaker_length, response_length = _ROUND.unpack_from(mapping.log, offset)
+        start = offset + _ROUND.size
+        raw_speaker = mapping.log[start:start + speaker_length]
+        speaker = self._speakers.get(raw_speaker)
+        if speaker is None:
+            speaker = self._speakers.setdefault(raw_speaker, raw_speaker.decode("utf-8"))
+        start += speaker_length
+        return number, timestamp, speaker, start, start + response_length
+
+    def _round(self, mapping: _Mapping, position: int, topic: str) -> DebateRound:
+        number, timestamp, speaker, start, end = self._record(mapping, position)
+        return DebateRound(
+            round_number=number,
+            speaker=speaker,
+            topic=topic,
+            response=str(mapping.view[start:end], "utf-8"),
+            timestamp=datetime.fromtimestamp(timestamp),
+            context={}
+        )
+
+    def _span(
+        self,
+        debate_id: int,
+        offset: int,
+        limit: Optional[int]
+    ) -> Tuple[_Mapping, int, range]:
+        """A mapping, the debate's record offset and the index positions of a page of its rounds."""
+        offset = max(offset, 0)
+        mapping, record, first, count = self._locate(debate_id, None if limit is None else offset + limit)
+        stop = count if limit is None else min(count, offset + limit)
+        return mapping, record, range(first + offset, first + max(stop, offset))
+
+    def _at(self, debate_id: int, round_number: int) -> Tuple[_Mapping, int, int]:
+        mapping, record, first, count = self._locate(debate_id, round_number)
+        if not 1 <= round_number <= count:
+            raise IndexError(f"Debate {debate_id} has no round {round_number}")
+        return mapping, record, first + round_number - 1
+
+    def response_view(self, debate_id: int, round_number: int) -> memoryview:
+        """The UTF-8 response of round N (1-based) of a debate, as a zero-copy view into the log."""
+        mapping, _, position = self._at(debate_id, round_number)
+        _, _, _, start, end = self._record(mapping, position)
+        return mapping.view[start:end]
+
+    def get_round(self, debate_id: int, round_number: int) -> DebateRound:
+        """Round N (1-based) of a debate. Context snapshots are not logged, so context is empty."""
+        mapping, record, position = self._at(debate_id, round_number)
+        return self._round(mapping, position, self._header(mapping, record)["topic"])
+
+    def iter_rounds(self, debate_id: int, offset: int = 0, limit: Optional[int] = None) -> Iterator[DebateRound]:
+        """Iterate over a debate's rounds from position `offset`, at most `limit` of them."""
+        mapping, record, positions = self._span(debate_id, offset, limit)
+        topic = self._header(mapping, record)["topic"]
+        for position in positions:
+            yield self._round(mapping, position, topic)
+
+    def get_rounds(self, debate_id: int, offset: int = 0, limit: Optional[int] = None) -> List[DebateRound]:
+        """A page of a debate's rounds, in order; reads only the records on the page."""
+        return list(self.iter_rounds(debate_id, offset, limit))
+
+    def get_debate_transcript(self, debate_id: int, offset: int = 0, limit: Optional[int] = None) -> str:
+        """A page of a debate's readable transcript, formatted like DebateSimulator.get_debate_transcript()."""
+        parts = ["=== DEBATE TRANSCRIPT ===\n\n"] if offset == 0 else []
+        for round_data in self.iter_rounds(debate_id, offset, limit):
+            parts.append(f"Round {round_data.round_number} - {round_data.speaker}:\n{round_data.response}\n\n")
+        return "".join(parts)
+
+    def write_transcript(self, debate_id: int, out: BinaryIO, offset: int = 0, limit: Optional[int] = None) -> None:
+        """Write a page of a debate's transcript as UTF-8 to a binary file, straight from the mapping."""
+        mapping, _, positions = self._span(debate_id, offset, limit)
+        if offset == 0:
+            out.write(b"=== DEBATE TRANSCRIPT ===\n\n")
+        for position in positions:
+            number, _, speaker, start, end = self._record(mapping, position)
+            out.write(f"Round {number} - {speaker}:\n".encode("utf-8"))
+            out.write(mapping.view[start:end])
+            out.write(b"\n\n")
+
+    def close(self) -> None:
+        if self._round_index is not None:
+            self._round_index.close()
+            self._round_index = None
+        mapping, self._mapping = self._mapping, None
+        if mapping is not None:
+            mapping.view.release()
+            for mapped in (mapping.log, mapping.rounds, mapping.debates):
+                if mapped is not None:
+                    mapped.close()
+
+    def __enter__(self) -> 'TranscriptLog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Read debates from a transcript log")
+    parser.add_argument("path", help="Transcript log file")
+    parser.add_argument("debate", type=int, nargs="?", default=None, help="Debate id (default: list debates)")
+    parser.add_argument("--offset", type=int, default=0, help="First round to print, from 0")
+    parser.add_argument("--limit", type=int, default=None, help="Rounds to print")
+    args = parser.parse_args(argv)
+
+    with TranscriptLog(args.path) as log:
+        if args.debate is None:
+            for debate_id in range(len(log)):
+                header = log.debate(debate_id)
+                print(f"{debate_id}\t{header['started']}\t{header['topic']}\t"
+                      f"{', '.join(header['agents'])}\t{header['rounds']} rounds")
+        else:
+            sys.stdout.flush()
+            log.write_transcript(args.debate, sys.stdout.buffer, args.offset, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+LLM client layer for model-backed political agents.
+"""
+
+from .types import CompletionRequest, CompletionResponse, DeadlineExceeded, LLMError
+from .providers import Provider, OpenAIProvider, AnthropicProvider, get_provider
+from .cache import ResponseCache, request_key
+from .scheduler import Priority, RateLimits, Scheduler, TokenBucket, AdaptiveLimiter, get_scheduler, set_scheduler
+from .client import LLMClient
+from .batching import MicroBatcher
+from .cassette import Cassette, CassetteMiss
+
+__all__ = [
+    'CompletionRequest',
+    'CompletionResponse',
+    'LLMError',
+    'DeadlineExceeded',
+    'Provider',
+    'OpenAIProvider',
+    'AnthropicProvider',
+    'get_provider',
+    'ResponseCache',
+    'request_key',
+    'Priority',
+    'RateLimits',
+    'Scheduler',
+    'TokenBucket',
+    'AdaptiveLimiter',
+    'get_scheduler',
+    'set_scheduler',
+    'LLMClient',
+    'MicroBatcher',
+    'Cassette',
+    'CassetteMiss'
+]
@@ -0,0 +1,129 @@
+"""
+Micro-batching of concurrent completion requests.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from .types import CompletionRequest, CompletionResponse
+
+
+class MicroBatcher:
+    """
+    Coalesces completion requests made concurrently, from threads or
+    coroutines, into LLMClient.complete_batch() calls.
+
+    The first request of a batch opens a wait window of max_wait seconds.
+    Everything submitted until the window closes, or until max_batch_size
+    requests are waiting, goes out together, fanned out over the client's
+    pool. Each caller gets back its own response or error. With
+    use_batch_api=True a batch instead becomes one job on the provider's
+    batch endpoint where it has one (Anthropic's Message Batches). Those
+    jobs are asynchronous and can take hours, so only opt in for offline
+    sweeps, never for calls a live debate waits on.
+
+    A MicroBatcher has the same complete()/acomplete() interface as
+    LLMClient, so it can be handed to agents as their llm_client.
+
+    Example:
+        >>> batcher = MicroBatcher(LLMClient("anthropic"), max_wait=0.05)
+        >>> for delegate in delegates:
+        ...     delegate.llm_client = batcher
+        >>> votes = simulator.poll_assembly(proposal, delegates[0], delegates)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_batch_size: int = 64,
+        max_wait: float = 0.02,
+        max_in_flight: int = 4,
+        use_batch_api: bool = False
+    ):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.use_batch_api = use_batch_api
+
+        self._pending: List[Tuple[CompletionRequest, Future]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-batch")
+        self.stats: Dict[str, int] = {"requests": 0, "batches": 0}
+
+        self._thread = threading.Thread(target=self._collect, name="llm-microbatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: CompletionRequest) -> 'Future[CompletionResponse]':
+        """Queue a request for the next batch and return a future for its response."""
+        future: 'Future[CompletionResponse]' = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((request, future))
+            self.stats["requests"] += 1
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def complete(self, request: CompletionRequest) -> CompletionResponse:
+        """Blocking completion through the batcher."""
+        return self.submit(request).result()
+
+    async def acomplete(self, request: CompletionRequest) -> CompletionResponse:
+        """Async completion through the batcher; no thread is held while waiting."""
+        return await asyncio.wrap_future(self.submit(request))
+
+    def _collect(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                self.stats["batches"] += 1
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[CompletionRequest, Future]]) -> None:
+        try:
+            results = self.client.complete_batch(
+                [request for request, _ in batch], return_exceptions=True, use_batch_api=self.use_batch_api
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Send any queued requests, wait for in-flight batches, and stop. The client stays open."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'MicroBatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
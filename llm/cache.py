@@ -0,0 +1,235 @@
+"""
+Two-tier response cache for LLM completions.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .types import CompletionResponse
+
+
+def request_key(provider: str, payload: Dict[str, Any]) -> str:
+    """
+    Stable hash of a provider request body: the rendered system prompt and
+    messages plus every model parameter (model, max_tokens, temperature, stop).
+    """
+    blob = json.dumps([provider, payload], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+_Entry = Tuple[str, str, int, int, float]  # text, model, input_tokens, output_tokens, created
+
+_TOUCH_BATCH = 64  # Memory hits whose disk access times are written together
+_TOUCH_INTERVAL = 5.0  # Seconds after which pending access times are written anyway
+
+
+class ResponseCache:
+    """
+    LRU cache of completions, held in memory and optionally persisted to SQLite.
+
+    Lookups try the in-memory tier first, then the disk tier; disk hits are
+    promoted back into memory. The memory tier keeps at most max_entries
+    responses, the disk tier at most max_bytes of response text, evicting the
+    least recently used entries first. Memory hits also count as uses on
+    disk: their access times are written back in batches. Entries older than ttl seconds are
+    treated as misses and dropped. The database uses WAL mode so several
+    worker processes can share one cache file.
+
+    Example:
+        >>> cache = ResponseCache("responses.sqlite", ttl=7 * 24 * 3600)
+        >>> client = LLMClient("openai", cache=cache)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._memory: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._touched: Dict[str, float] = {}  # Key -> access time of memory hits not yet written to disk
+        self._touched_since = 0.0
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, model TEXT NOT NULL,"
+                " input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @property
+    def hits(self) -> int:
+        return self.stats["memory_hits"] + self.stats["disk_hits"]
+
+    @property
+    def misses(self) -> int:
+        return self.stats["misses"]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[CompletionResponse]:
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[4], now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    if self._db is not None:
+                        self._touch(key, now)
+                    return self._response(entry)
+                del self._memory[key]
+                self._delete(key)
+                self.stats["expired"] += 1
+
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, model, input_tokens, output_tokens, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[4], now):
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._remember(key, tuple(row))
+                        self.stats["disk_hits"] += 1
+                        return self._response(row)
+                    self._delete(key)
+                    self.stats["expired"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, response: CompletionResponse) -> None:
+        """Store a response in both tiers."""
+        now = time.time()
+        entry = (response.text, response.model, response.input_tokens, response.output_tokens, now)
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["stores"] += 1
+            if self._db is None:
+                return
+
+            size = len(response.text.encode("utf-8"))
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, *entry[:4], size, now, now)
+            )
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+
+    def _touch(self, key: str, now: float) -> None:
+        if not self._touched:
+            self._touched_since = now
+        self._touched[key] = now
+        if len(self._touched) >= _TOUCH_BATCH or now - self._touched_since >= _TOUCH_INTERVAL:
+            self._flush_touched()
+
+    def _flush_touched(self) -> None:
+        """Write the access times of memory hits to the disk tier, so its LRU eviction sees them."""
+        if self._touched and self._db is not None:
+            self._db.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+        self._touched.clear()
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            # The disk tier still holds evicted entries when there is one
+            self._memory.popitem(last=False)
+            if self._db is None:
+                self.stats["evictions"] += 1
+
+    def _delete(self, key: str) -> None:
+        if self._db is not None:
+            row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_bytes -= row[0]
+
+    def _evict_disk(self) -> None:
+        # Other processes may share the file, so re-total before trimming
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self._disk_bytes <= self.max_bytes:
+            return
+
+        self._flush_touched()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                if self._disk_bytes <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+                self.stats["evictions"] += 1
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _response(entry: Tuple[Any, ...]) -> CompletionResponse:
+        text, model, input_tokens, output_tokens = entry[:4]
+        return CompletionResponse(text=text, model=model, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._disk_bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._db is not None:
+                return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return len(self._memory)
+
+    def close(self) -> None:
+        """Close the SQLite connection; the memory tier stays usable."""
+        with self._lock:
+            if self._db is not None:
+                self._flush_touched()
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,306 @@
+"""
+Record and replay of model calls, for deterministic offline debates.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from .types import CompletionRequest, CompletionResponse, DeadlineExceeded, LLMError
+
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LLMError):
+    """Raised on replay when a request was never recorded."""
+
+
+def interaction_key(request: CompletionRequest) -> str:
+    """Stable hash of everything in a request that can change the response."""
+    blob = json.dumps(
+        [
+            request.system, request.system_suffix, request.messages,
+            request.model, request.max_tokens, request.temperature, request.stop
+        ],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Cassette:
+    """
+    Records the model calls agents make, or replays them without a provider.
+
+    In record mode every call goes to `client` and each successful response
+    is appended to a gzip-compressed JSONL file. The file holds one line per
+    call, keyed by a hash of the request. In replay mode no client is needed and no
+    network I/O happens: responses come back from the file, in recorded
+    order when the same request was made several times. Replays take no time
+    unless simulate_latency is set. Then each call sleeps for its recorded
+    latency times latency_scale. Failed calls, such as ones that missed
+    their deadline, are recorded too and fail again on replay with the same
+    error, so agents fall back to their templates at the same turns.
+
+    A Cassette has the same complete()/stream()/complete_batch() interface
+    as LLMClient, so it can be handed to agents as their llm_client.
+
+    Args:
+        path: Cassette file
+        client: LLMClient (or MicroBatcher) to record from
+        mode: "record", "replay", or None to replay if the file exists and
+            record otherwise
+
+    Example:
+        >>> with Cassette("debate.cassette", LLMClient("anthropic")) as cassette:
+        ...     simulator.debate([GandhiAgent(llm_client=cassette), JinnahAgent(llm_client=cassette)], topic)
+        >>> with Cassette("debate.cassette", mode="replay") as cassette:
+        ...     ...  # Same debate, same responses, no provider calls
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client: Any = None,
+        mode: Optional[str] = None,
+        simulate_latency: bool = False,
+        latency_scale: float = 1.0
+    ):
+        if mode is None:
+            mode = "replay" if os.path.exists(path) else "record"
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and client is None:
+            raise ValueError("Recording a cassette needs a client")
+
+        self.path = path
+        self.client = client
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._responses: Dict[str, List[Dict[str, Any]]] = {}
+        self._played: Dict[str, int] = {}
+        self._file = None
+        self.stats: Dict[str, int] = {"recorded": 0, "replayed": 0, "misses": 0}
+
+        if mode == "replay":
+            self._load()
+        else:
+            # Written beside the target and moved into place on close, so an
+            # interrupted recording never clobbers a good cassette
+            self._file = gzip.open(path + ".tmp", "wt", encoding="utf-8")
+            self._file.write(json.dumps({"cassette": CASSETTE_VERSION}) + "\n")
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("cassette") != CASSETTE_VERSION:
+                raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette")
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        """Number of recorded calls."""
+        with self._lock:
+            return sum(len(entries) for entries in self._responses.values())
+
+    def _record(self, key: str, response: CompletionResponse) -> None:
+        entry = {
+            "key": key,
+            "text": response.text,
+            "model": response.model,
+            "input_tokens": response.input_tokens,
+            "output_tokens": response.output_tokens,
+            "cached_input_tokens": response.cached_input_tokens,
+            "latency": round(response.latency, 4),
+        }
+        with self._lock:
+            self._responses.setdefault(key, []).append(entry)
+            self._file.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+            self.stats["recorded"] += 1
+
+    def _record_error(self, key: str, error: LLMError, latency: float, text: str = "") -> None:
+        """Record a failed call, so replay fails it the same way (and agents fall back the same way)."""
+        entry = {
+            "key": key,
+            "error": "deadline" if isinstance(error, DeadlineExceeded) else "error",
+            "message": str(error),
+            "status": error.status,
+            "text": text,  # What a stream produced before failing
+            "latency": round(latency, 4),
+        }
+        with self._lock:
+            self._responses.setdefault(key, []).append(entry)
+            self._file.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+            self.stats["recorded"] += 1
+
+    @staticmethod
+    def _error(entry: Dict[str, Any]) -> Optional[LLMError]:
+        """The exception a recorded failure replays as, or None for a response."""
+        kind = entry.get("error")
+        if kind is None:
+            return None
+        if kind == "deadline":
+            return DeadlineExceeded(entry["message"])
+        return LLMError(entry["message"], status=entry.get("status"))
+
+    def _lookup(self, request: CompletionRequest) -> Dict[str, Any]:
+        key = interaction_key(request)
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                self.stats["misses"] += 1
+                raise CassetteMiss(f"No recorded response for request {key} in {self.path}")
+            # Repeats of a request replay in recorded order, then stick at the last one
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            self.stats["replayed"] += 1
+            return entries[min(played, len(entries) - 1)]
+
+    def _replay_delay(self, entry: Dict[str, Any]) -> float:
+        return entry["latency"] * self.latency_scale if self.simulate_latency else 0.0
+
+    def _wait(self, entry: Dict[str, Any], deadline: Optional[float]) -> None:
+        """Sleep for the simulated latency, failing like the client would if it exceeds the deadline."""
+        delay = self._replay_delay(entry)
+        if deadline is not None and delay > deadline:
+            time.sleep(deadline)
+            raise DeadlineExceeded(f"Replayed call missed its deadline of {deadline}s")
+        if delay:
+            time.sleep(delay)
+
+    @staticmethod
+    def _response(entry: Dict[str, Any]) -> CompletionResponse:
+        return CompletionResponse(
+            text=entry["text"],
+            model=entry["model"],
+            input_tokens=entry["input_tokens"],
+            output_tokens=entry["output_tokens"],
+            cached_input_tokens=entry["cached_input_tokens"],
+            latency=entry["latency"]
+        )
+
+    def complete(self, request: CompletionRequest, deadline: Optional[float] = None) -> CompletionResponse:
+        """Complete a request through the client (recording) or from the cassette (replay)."""
+        if self.mode == "record":
+            start = time.perf_counter()
+            try:
+                response = (
+                    self.client.complete(request) if deadline is None else self.client.complete(request, deadline)
+                )
+            except LLMError as e:
+                self._record_error(interaction_key(request), e, time.perf_counter() - start)
+                raise
+            self._record(interaction_key(request), response)
+            return response
+
+        entry = self._lookup(request)
+        self._wait(entry, deadline)
+        error = self._error(entry)
+        if error is not None:
+            raise error
+        return self._response(entry)
+
+    async def acomplete(self, request: CompletionRequest, deadline: Optional[float] = None) -> CompletionResponse:
+        """Async variant of complete(); replays sleep without holding a thread."""
+        if self.mode == "record":
+            return await asyncio.to_thread(self.complete, request, deadline)
+
+        entry = self._lookup(request)
+        delay = self._replay_delay(entry)
+        if deadline is not None and delay > deadline:
+            await asyncio.sleep(deadline)
+            raise DeadlineExceeded(f"Replayed call missed its deadline of {deadline}s")
+        if delay:
+            await asyncio.sleep(delay)
+        error = self._error(entry)
+        if error is not None:
+            raise error
+        return self._response(entry)
+
+    def stream(self, request: CompletionRequest, deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Stream a completion. Recording passes the client's chunks through;
+        replay yields the recorded text as one chunk. A recorded failure is
+        replayed after the text the stream produced before it.
+        """
+        if self.mode == "record":
+            start = time.perf_counter()
+            parts: List[str] = []
+            try:
+                chunks = self.client.stream(request) if deadline is None else self.client.stream(request, deadline)
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+            except LLMError as e:
+                self._record_error(interaction_key(request), e, time.perf_counter() - start, "".join(parts))
+                raise
+            self._record(
+                interaction_key(request),
+                CompletionResponse(text="".join(parts), model=request.model or "", latency=time.perf_counter() - start)
+            )
+            return
+
+        entry = self._lookup(request)
+        self._wait(entry, deadline)
+        if entry["text"]:
+            yield entry["text"]
+        error = self._error(entry)
+        if error is not None:
+            raise error
+
+    def complete_batch(
+        self,
+        batch: Sequence[CompletionRequest],
+        return_exceptions: bool = False,
+        use_batch_api: bool = False
+    ) -> List[Union[CompletionResponse, LLMError]]:
+        """Complete several requests, returning responses in order."""
+        if self.mode == "record":
+            results = self.client.complete_batch(batch, return_exceptions=True, use_batch_api=use_batch_api)
+            for request, result in zip(batch, results):
+                if isinstance(result, CompletionResponse):
+                    self._record(interaction_key(request), result)
+                elif isinstance(result, LLMError):
+                    self._record_error(interaction_key(request), result, 0.0)
+        else:
+            results = []
+            for request in batch:
+                try:
+                    results.append(self.complete(request))
+                except LLMError as e:
+                    results.append(e)
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, LLMError):
+                    raise result
+        return results
+
+    def generate(self, system: str, prompt: str, **params: Any) -> str:
+        """Convenience wrapper: one user prompt in, response text out."""
+        request = CompletionRequest(system=system, messages=[{"role": "user", "content": prompt}], **params)
+        return self.complete(request).text
+
+    def close(self) -> None:
+        """Finish writing a recording. The client stays open."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                os.replace(self.path + ".tmp", self.path)
+
+    def __enter__(self) -> 'Cassette':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
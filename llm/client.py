@@ -0,0 +1,522 @@
+"""
+Pooled HTTP client for model providers.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import ResponseCache, request_key
+from .providers import Provider, get_provider
+from .scheduler import Priority, Scheduler, get_scheduler
+from .types import CompletionRequest, CompletionResponse, DeadlineExceeded, LLMError
+
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMClient:
+    """
+    Thread-safe client for one provider and default model.
+
+    Requests go through a single requests.Session whose connection pool is
+    sized to max_concurrency, so connections are kept alive and reused
+    across calls; a semaphore caps in-flight requests at the same number.
+    Retryable failures (429, 5xx, connection errors) are retried with
+    exponential backoff, honouring Retry-After when the provider sends it.
+    With a ResponseCache, identical requests (same prompt and model
+    parameters) are answered from the cache without a provider call.
+    Every completion also passes through the process-wide Scheduler, which
+    applies rate limits and adaptive concurrency across all clients and
+    serves higher-priority clients first.
+
+    To cut tail latency, a call can be hedged: if it has not answered after
+    the hedge_percentile latency of recent calls, an identical request is
+    sent and whichever answers first wins. The other is abandoned. It
+    cannot be interrupted mid-request, but it is not retried and its answer
+    is dropped. A deadline (per client, or per call) bounds the whole call,
+    retries included, and raises DeadlineExceeded once it passes.
+
+    Example:
+        >>> client = LLMClient("anthropic", max_concurrency=16, timeout=30)
+        >>> agent = GandhiAgent(llm_client=client)
+        >>> hedged = LLMClient("anthropic", hedge_percentile=0.95, deadline=20)
+    """
+
+    def __init__(
+        self,
+        provider: Union[str, Provider] = "openai",
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        cache: Optional[ResponseCache] = None,
+        batch_poll_interval: float = 1.0,
+        batch_timeout: float = 3600.0,
+        priority: Priority = Priority.NORMAL,
+        scheduler: Optional[Scheduler] = None,
+        deadline: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        hedge_window: int = 200
+    ):
+        if hedge_percentile is not None and not 0.0 < hedge_percentile < 1.0:
+            raise ValueError("hedge_percentile must be in (0, 1)")
+        self.provider = get_provider(provider)
+        self.model = model or self.provider.default_model
+        self.base_url = (base_url or os.environ.get(self.provider.base_url_env) or self.provider.default_base_url).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get(self.provider.api_key_env, "")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.cache = cache
+        self.batch_poll_interval = batch_poll_interval
+        self.batch_timeout = batch_timeout
+        self.priority = priority
+        self._scheduler = scheduler
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: 'deque[float]' = deque(maxlen=hedge_window)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, pool_block=True, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        self.stats: Dict[str, int] = {
+            "requests": 0, "retries": 0, "errors": 0, "batches": 0,
+            "hedges": 0, "hedge_wins": 0, "deadlines_missed": 0
+        }
+        self._stats_lock = threading.Lock()
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """The scheduler this client's calls go through (the process-wide one by default)."""
+        return self._scheduler or get_scheduler()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _resolve(self, request: CompletionRequest) -> Dict[str, Any]:
+        return self.provider.payload(
+            request,
+            model=request.model or self.model,
+            max_tokens=request.max_tokens if request.max_tokens is not None else self.max_tokens,
+            temperature=request.temperature if request.temperature is not None else self.temperature
+        )
+
+    @staticmethod
+    def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        return None
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = self._retry_after(response)
+        return retry_after if retry_after is not None else self.backoff * (2 ** attempt)
+
+    def _schedule(self, payload: Optional[Dict[str, Any]], expires: Optional[float] = None):
+        """Scheduler slot for a completion payload; other requests (batch jobs, polling) are not scheduled."""
+        if payload is None or "model" not in payload:
+            return nullcontext(None)
+        # Providers count the prompt plus the maximum output against token limits
+        tokens = len(json.dumps(payload)) // 4 + int(payload.get("max_tokens") or 0)
+        return self.scheduler.slot(self.provider.name, payload["model"], tokens, self.priority, expires)
+
+    def _expiry(self, deadline: Optional[float]) -> Optional[float]:
+        """Monotonic time at which a call given `deadline` seconds (default: the client's) expires."""
+        deadline = deadline if deadline is not None else self.deadline
+        return time.monotonic() + deadline if deadline is not None else None
+
+    def _deadline_error(self, cause: Optional[Exception] = None) -> DeadlineExceeded:
+        message = f"{self.provider.name} call missed its deadline"
+        return DeadlineExceeded(f"{message}: {cause}" if cause is not None else message)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        expires: Optional[float] = None,
+        abandoned: Optional[threading.Event] = None,
+        parse: bool = False
+    ) -> Union[requests.Response, CompletionResponse]:
+        """
+        Send one HTTP request through the pool and scheduler, retrying
+        retryable failures until `expires` (a time.monotonic() value).
+        Setting `abandoned` stops further attempts. With `parse`, the
+        successful response is returned as a CompletionResponse and its
+        token usage reported to the scheduler, which refunds the unused
+        part of the call's reservation.
+        """
+        headers = self.provider.headers(self.api_key)
+
+        error: Optional[LLMError] = None
+        for attempt in range(self.max_retries + 1):
+            if abandoned is not None and abandoned.is_set():
+                raise LLMError(f"{self.provider.name} request abandoned")
+            if expires is not None and time.monotonic() >= expires:
+                raise self._deadline_error(error)
+            response = None
+            result = None
+            # Every wait (client slot, scheduler slot, Retry-After pause, rate limits) counts against the deadline
+            if not self._slots.acquire(timeout=None if expires is None else max(0.0, expires - time.monotonic())):
+                raise self._deadline_error(error)
+            try:
+                with self._schedule(payload, expires) as ticket:
+                    read_timeout = self.timeout
+                    if expires is not None:
+                        read_timeout = max(0.001, min(read_timeout, expires - time.monotonic()))
+                    self._count("requests")
+                    start = time.perf_counter()
+                    try:
+                        response = self._session.request(
+                            method, url, json=payload, headers=headers,
+                            timeout=(self.connect_timeout, read_timeout), stream=stream
+                        )
+                    except requests.RequestException as e:
+                        error = LLMError(f"{self.provider.name} request failed: {e}")
+                    latency = time.perf_counter() - start
+                    used_tokens = None
+                    if parse and response is not None and response.status_code < 400:
+                        result = self.provider.parse(response.json())
+                        # Zero means the provider sent no usage; keep the whole reservation then
+                        used_tokens = result.input_tokens + result.output_tokens or None
+                    if ticket is not None:
+                        ticket.report(
+                            latency,
+                            overloaded=response is None or response.status_code in RETRYABLE_STATUS,
+                            used_tokens=used_tokens,
+                            retry_after=self._retry_after(response)
+                        )
+            except DeadlineExceeded as e:
+                # Raised by a scheduler wait; reported in this client's terms
+                raise self._deadline_error(error or e) from None
+            finally:
+                self._slots.release()
+            if response is None and expires is not None and time.monotonic() >= expires:
+                raise self._deadline_error(error)
+
+            if response is not None:
+                if response.status_code < 400:
+                    return result if parse else response
+                error = LLMError(
+                    f"{self.provider.name} returned {response.status_code}: {response.text[:200]}",
+                    status=response.status_code
+                )
+                if response.status_code not in RETRYABLE_STATUS:
+                    self._count("errors")
+                    raise error
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                if expires is not None and time.monotonic() + delay >= expires:
+                    raise self._deadline_error(error)
+                self._count("retries")
+                time.sleep(delay)
+
+        self._count("errors")
+        raise error
+
+    def complete(self, request: CompletionRequest, deadline: Optional[float] = None) -> CompletionResponse:
+        """
+        Send a completion request, blocking until it finishes.
+
+        Args:
+            deadline: Seconds the call may take, overriding the client's
+                deadline; DeadlineExceeded is raised when it passes
+        """
+        payload = self._resolve(request)
+
+        key = None
+        if self.cache is not None:
+            key = request_key(self.provider.name, payload)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            result = self._hedged(payload, self._expiry(deadline))
+        except DeadlineExceeded:
+            self._count("deadlines_missed")
+            raise
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _post(
+        self,
+        payload: Dict[str, Any],
+        expires: Optional[float] = None,
+        abandoned: Optional[threading.Event] = None
+    ) -> CompletionResponse:
+        start = time.perf_counter()
+        result = self._send(
+            "POST", self.base_url + self.provider.path, payload, expires=expires, abandoned=abandoned, parse=True
+        )
+        result.latency = time.perf_counter() - start
+        with self._stats_lock:
+            self._latencies.append(result.latency)
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while hedging is off or still warming up."""
+        if self.hedge_percentile is None:
+            return None
+        with self._stats_lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(self.hedge_percentile * len(latencies)))]
+
+    def _hedged(self, payload: Dict[str, Any], expires: Optional[float]) -> CompletionResponse:
+        """Complete a payload, sending a duplicate if the first attempt runs past the hedge delay."""
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._post(payload, expires)
+
+        def remaining(limit: Optional[float] = None) -> Optional[float]:
+            if expires is None:
+                return limit
+            left = max(0.0, expires - time.monotonic())
+            return left if limit is None else min(left, limit)
+
+        abandoned = threading.Event()
+        executor = self._get_hedge_executor()
+        attempts: List[Future] = [executor.submit(self._post, payload, expires, abandoned)]
+        backup: Optional[Future] = None
+        try:
+            done, _ = wait(attempts, timeout=remaining(delay))
+            if not done and remaining() != 0.0:
+                self._count("hedges")
+                backup = executor.submit(self._post, payload, expires, abandoned)
+                attempts.append(backup)
+
+            error: Optional[BaseException] = None
+            while attempts:
+                done, _ = wait(attempts, timeout=remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise self._deadline_error()
+                for future in done:
+                    attempts.remove(future)
+                    if future.exception() is None:
+                        if future is backup:
+                            self._count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            abandoned.set()
+            for future in attempts:
+                future.cancel()
+
+    def stream(self, request: CompletionRequest, deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Stream a completion as text chunks while the provider generates it.
+
+        Retries only happen before the first chunk arrives. The deadline
+        bounds the wait for the stream to start. The joined text is stored
+        in the response cache, and a cached request is replayed as a single
+        chunk.
+        """
+        payload = self._resolve(request)
+        key = None
+        if self.cache is not None:
+            key = request_key(self.provider.name, payload)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached.text
+                return
+
+        try:
+            response = self._send(
+                "POST", self.base_url + self.provider.path, {**payload, "stream": True},
+                stream=True, expires=self._expiry(deadline)
+            )
+        except DeadlineExceeded:
+            self._count("deadlines_missed")
+            raise
+        parts: List[str] = []
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = self.provider.stream_delta(json.loads(data))
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        except requests.RequestException as e:
+            self._count("errors")
+            raise LLMError(f"{self.provider.name} stream interrupted: {e}")
+        finally:
+            response.close()
+
+        if key is not None:
+            self.cache.put(key, CompletionResponse(text="".join(parts), model=payload.get("model", "")))
+
+    def complete_batch(
+        self,
+        batch: Sequence[CompletionRequest],
+        return_exceptions: bool = False,
+        use_batch_api: bool = False
+    ) -> List[Union[CompletionResponse, LLMError]]:
+        """
+        Complete several requests at once, returning responses in order.
+
+        Cached requests are answered locally. The rest are fanned out
+        concurrently over the connection pool, or, with use_batch_api=True
+        and a provider that has one, sent as one job to its batch endpoint.
+        Batch jobs are asynchronous and may take up to a day to process, so
+        they suit offline sweeps, not calls a live debate is waiting on.
+
+        Args:
+            return_exceptions: Put each failed request's LLMError in its slot
+                instead of raising the first one
+            use_batch_api: Use the provider's batch endpoint (ignored when it
+                has none)
+        """
+        results: List[Any] = [None] * len(batch)
+        pending: List[Tuple[int, Dict[str, Any], Optional[str]]] = []
+        for index, request in enumerate(batch):
+            payload = self._resolve(request)
+            key = request_key(self.provider.name, payload) if self.cache is not None else None
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, payload, key))
+
+        if pending and use_batch_api and self.provider.batch_path is not None:
+            outcomes = self._run_batch_job([payload for _, payload, _ in pending])
+        elif pending:
+            outcomes = list(self._get_executor().map(
+                self._complete_payload, [payload for _, payload, _ in pending]
+            ))
+        else:
+            outcomes = []
+
+        for (index, _, key), outcome in zip(pending, outcomes):
+            if isinstance(outcome, CompletionResponse) and key is not None:
+                self.cache.put(key, outcome)
+            results[index] = outcome
+
+        if not return_exceptions:
+            for outcome in results:
+                if isinstance(outcome, LLMError):
+                    raise outcome
+        return results
+
+    def _complete_payload(self, payload: Dict[str, Any]) -> Union[CompletionResponse, LLMError]:
+        try:
+            return self._post(payload)
+        except LLMError as e:
+            return e
+
+    def _run_batch_job(self, payloads: List[Dict[str, Any]]) -> List[Union[CompletionResponse, LLMError]]:
+        """Submit payloads as one provider batch job and wait for its results."""
+        start = time.perf_counter()
+        self._count("batches")
+        url = self.base_url + self.provider.batch_path
+        job = self._send("POST", url, self.provider.batch_payload(payloads)).json()
+
+        deadline = start + self.batch_timeout
+        while True:
+            done, results_url = self.provider.batch_status(job)
+            if done:
+                break
+            if time.perf_counter() > deadline:
+                raise LLMError(f"{self.provider.name} batch {job.get('id')} did not finish in {self.batch_timeout}s")
+            time.sleep(self.batch_poll_interval)
+            job = self._send("GET", f"{url}/{job['id']}").json()
+
+        outcomes: List[Union[CompletionResponse, LLMError]] = [
+            LLMError(f"{self.provider.name} batch returned no result for request {i}") for i in range(len(payloads))
+        ]
+        latency = time.perf_counter() - start
+        for line in self._send("GET", results_url).text.splitlines():
+            if line.strip():
+                index, outcome = self.provider.parse_batch_result(json.loads(line))
+                if isinstance(outcome, CompletionResponse):
+                    outcome.latency = latency
+                outcomes[index] = outcome
+        return outcomes
+
+    async def acomplete(self, request: CompletionRequest, deadline: Optional[float] = None) -> CompletionResponse:
+        """
+        Async variant of complete(). The call itself is blocking and runs on
+        a thread pool sized to max_concurrency, so that is also the limit on
+        calls in flight from coroutines.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.complete, request, deadline)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix=f"llm-{self.provider.name}"
+                )
+            return self._executor
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        # Separate from _get_executor(), whose threads may be the ones waiting on hedged attempts
+        with self._executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * self.max_concurrency, thread_name_prefix=f"llm-{self.provider.name}-hedge"
+                )
+            return self._hedge_executor
+
+    def generate(self, system: str, prompt: str, **params: Any) -> str:
+        """Convenience wrapper: one user prompt in, response text out."""
+        request = CompletionRequest(system=system, messages=[{"role": "user", "content": prompt}], **params)
+        return self.complete(request).text
+
+    def close(self) -> None:
+        """Close pooled connections and the async worker threads (not the cache)."""
+        self._session.close()
+        with self._executor_lock:
+            for executor in (self._executor, self._hedge_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False)
+            self._executor = self._hedge_executor = None
+
+    def __enter__(self) -> 'LLMClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
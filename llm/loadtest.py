@@ -0,0 +1,102 @@
+"""
+Offline load test for the pooled LLM client against the mock server.
+
+Usage:
+    python -m llm.loadtest --requests 2000 --concurrency 32 --latency 0.05
+    python -m llm.loadtest --url http://127.0.0.1:8765 --provider anthropic
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .client import LLMClient
+from .mock_server import MockLLMServer
+from .types import CompletionRequest, LLMError
+
+
+def run_load_test(
+    client: LLMClient,
+    total_requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Fire total_requests completions from `concurrency` threads and summarize latency."""
+    latencies: List[float] = []
+    errors = 0
+
+    def call(i: int) -> Optional[float]:
+        request = CompletionRequest(
+            system="You are a delegate at a load test.",
+            messages=[{"role": "user", "content": f"Statement {i}"}]
+        )
+        try:
+            return client.complete(request).latency
+        except LLMError:
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency in pool.map(call, range(total_requests)):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "requests_per_second": total_requests / elapsed if elapsed > 0 else 0.0,
+        "latency_mean": statistics.mean(latencies) if latencies else 0.0,
+        "latency_p50": percentile(0.50),
+        "latency_p95": percentile(0.95),
+        "latency_p99": percentile(0.99),
+        "client_stats": dict(client.stats),
+    }
+
+
+def main() -> int:
+    """Command line entry point for the load test."""
+    parser = argparse.ArgumentParser(description="Load-test the LLM client against a mock server")
+    parser.add_argument("--url", default=None, help="Target server (default: start a local mock server)")
+    parser.add_argument("--provider", default="openai", choices=["openai", "anthropic"])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock server 429 rate")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = MockLLMServer(latency=args.latency, error_rate=args.error_rate).start()
+        url = server.url
+
+    try:
+        with LLMClient(args.provider, base_url=url, api_key="mock", max_concurrency=args.concurrency, backoff=0.01) as client:
+            report = run_load_test(client, args.requests, args.concurrency)
+        if server is not None:
+            report["server_stats"] = dict(server.stats)
+    finally:
+        if server is not None:
+            server.stop()
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+Local stand-in for the OpenAI and Anthropic HTTP APIs.
+
+Serves deterministic completions so the client layer and LLM-backed
+debates can be exercised and load-tested offline.
+
+Usage:
+    python -m llm.mock_server --port 8765 --latency 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8765 OPENAI_API_KEY=mock python main.py --llm openai --agents gandhi jinnah --topic x
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+
+OPENAI_PATH = "/v1/chat/completions"
+ANTHROPIC_PATH = "/v1/messages"
+ANTHROPIC_BATCH_PATH = "/v1/messages/batches"
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def mock_completion(system: str, messages: List[Dict[str, str]], model: str) -> str:
+    """Deterministic response text for a prompt."""
+    prompt = messages[-1]["content"] if messages else ""
+    digest = hashlib.sha256((system + "\n" + prompt).encode("utf-8")).hexdigest()[:8]
+
+    if "JSON" in prompt:
+        accept = int(digest, 16) % 2 == 0
+        return json.dumps({
+            "accept": accept,
+            "reasoning": f"Mock evaluation {digest}",
+            "counter_proposal": "" if accept else f"Mock counter-proposal {digest}"
+        })
+
+    speaker = system.strip().splitlines()[0] if system.strip() else "the speaker"
+    return (
+        f"[{model} mock {digest}] Speaking as described ({speaker[:60]}), "
+        f"I have considered the {len(messages)} message(s) before me and maintain my position."
+    )
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse pooled connections
+    server: 'MockLLMServer'
+
+    def setup(self) -> None:
+        super().setup()
+        self.server._record("connections")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: Union[Dict[str, Any], str], headers: Optional[Dict[str, str]] = None) -> None:
+        if isinstance(body, str):
+            data, content_type = body.encode("utf-8"), "application/x-jsonl"
+        else:
+            data, content_type = json.dumps(body).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, status: int, events: Iterator[str], headers: Optional[Dict[str, str]] = None) -> None:
+        """Send server-sent events with chunked transfer encoding, as they are produced."""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        for event in events:
+            data = event.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "invalid JSON"}})
+            return
+
+        self.server._record("requests")
+        status, response, headers = self.server.respond(self.path, body)
+        try:
+            if isinstance(response, (dict, str)):
+                self._send(status, response, headers)
+            else:
+                self._send_stream(status, response, headers)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timed out or abandoned a hedged request)
+            self.close_connection = True
+
+    def do_GET(self) -> None:
+        self.server._record("requests")
+        self._send(*self.server.respond(self.path, None, method="GET"))
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server speaking the OpenAI Chat Completions, Anthropic
+    Messages and Anthropic Message Batches formats.
+
+    Args:
+        host, port: Bind address; port 0 picks a free port (see .url)
+        latency: Seconds to wait before answering each request
+        jitter: Extra uniformly random latency, in seconds
+        error_rate: Fraction of requests answered with HTTP 429
+        token_latency: Seconds between chunks of a streamed response
+        slow_rate: Fraction of requests that are slow outliers
+        slow_latency: Extra seconds an outlier waits
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        token_latency: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0
+    ):
+        super().__init__((host, port), _MockHandler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.stats: Dict[str, int] = {
+            "connections": 0, "requests": 0, "rate_limited": 0, "batched_requests": 0, "slow": 0
+        }
+        self._stats_lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._cached_prefixes: Set[bytes] = set()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def respond(
+        self,
+        path: str,
+        body: Optional[Dict[str, Any]],
+        method: str = "POST"
+    ) -> Tuple[int, Union[Dict[str, Any], str, Iterator[str]], Dict[str, str]]:
+        """Build (status, JSON body, JSONL text or stream of SSE events, extra headers) for a request."""
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            self._record("slow")
+            delay += self.slow_latency
+        if delay:
+            time.sleep(delay)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._record("rate_limited")
+            return 429, {"error": {"type": "rate_limit_error", "message": "mock rate limit"}}, {"Retry-After": "0"}
+
+        if method == "POST" and path == OPENAI_PATH:
+            completion = self._openai_completion(body)
+            if body.get("stream"):
+                return 200, self._openai_events(completion), {}
+            return 200, completion, {}
+        if method == "POST" and path == ANTHROPIC_PATH:
+            message = self._anthropic_message(body)
+            if body.get("stream"):
+                return 200, self._anthropic_events(message), {}
+            return 200, message, {}
+        if method == "POST" and path == ANTHROPIC_BATCH_PATH:
+            return 200, self._create_batch(body), {}
+        if method == "GET" and path.startswith(ANTHROPIC_BATCH_PATH + "/"):
+            batch_id, _, tail = path[len(ANTHROPIC_BATCH_PATH) + 1:].partition("/")
+            with self._stats_lock:
+                batch = self._batches.get(batch_id)
+            if batch is not None and tail == "":
+                return 200, batch["job"], {}
+            if batch is not None and tail == "results":
+                return 200, batch["results"], {}
+        return 404, {"error": {"message": f"unknown path {method} {path}"}}, {}
+
+    def _openai_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body.get("model", "mock-model")
+        messages = body.get("messages", [])
+        system = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        conversation = [m for m in messages if m.get("role") != "system"]
+        text = mock_completion(system, conversation, model)
+        prompt_tokens = sum(_count_tokens(m.get("content", "")) for m in messages)
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": _count_tokens(text)},
+        }
+
+    def _anthropic_message(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body.get("model", "mock-model")
+        messages = body.get("messages", [])
+        system = body.get("system", "")
+        cache_read = cache_write = 0
+        if isinstance(system, list):
+            # Emulate prompt caching of the block marked with cache_control
+            for block in system:
+                if block.get("cache_control"):
+                    tokens = _count_tokens(block["text"])
+                    digest = hashlib.sha256(block["text"].encode("utf-8")).digest()
+                    with self._stats_lock:
+                        cached = digest in self._cached_prefixes
+                        self._cached_prefixes.add(digest)
+                    if cached:
+                        cache_read += tokens
+                    else:
+                        cache_write += tokens
+            system = "".join(block.get("text", "") for block in system)
+        text = mock_completion(system, messages, model)
+        input_tokens = _count_tokens(system) + sum(_count_tokens(m.get("content", "")) for m in messages)
+        return {
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {
+                "input_tokens": input_tokens - cache_read - cache_write,
+                "cache_read_input_tokens": cache_read,
+                "cache_creation_input_tokens": cache_write,
+                "output_tokens": _count_tokens(text),
+            },
+        }
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        """Split text into word-sized chunks, pausing token_latency before each."""
+        for chunk in re.findall(r"\S+\s*|\s+", text):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield chunk
+
+    def _openai_events(self, completion: Dict[str, Any]) -> Iterator[str]:
+        base = {"id": completion["id"], "object": "chat.completion.chunk", "model": completion["model"]}
+        for chunk in self._chunks(completion["choices"][0]["message"]["content"]):
+            delta = {"index": 0, "delta": {"content": chunk}, "finish_reason": None}
+            yield f"data: {json.dumps({**base, 'choices': [delta]})}\n\n"
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    def _anthropic_events(self, message: Dict[str, Any]) -> Iterator[str]:
+        def event(name: str, data: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+
+        yield event("message_start", {"message": {**message, "content": []}})
+        yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for chunk in self._chunks(message["content"][0]["text"]):
+            yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+        yield event("content_block_stop", {"index": 0})
+        yield event("message_delta", {"delta": {"stop_reason": "end_turn"}, "usage": message["usage"]})
+        yield event("message_stop", {})
+
+    def _create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a Message Batches job synchronously; it is already ended when returned."""
+        items = body.get("requests", [])
+        lines = [
+            json.dumps({
+                "custom_id": item["custom_id"],
+                "result": {"type": "succeeded", "message": self._anthropic_message(item["params"])}
+            })
+            for item in items
+        ]
+        with self._stats_lock:
+            batch_id = f"msgbatch_mock{len(self._batches)}"
+            job = {
+                "id": batch_id,
+                "type": "message_batch",
+                "processing_status": "ended",
+                "request_counts": {"processing": 0, "succeeded": len(items), "errored": 0, "canceled": 0, "expired": 0},
+                "results_url": f"{self.url}{ANTHROPIC_BATCH_PATH}/{batch_id}/results",
+            }
+            self._batches[batch_id] = {"job": job, "results": "\n".join(lines) + "\n"}
+            self.stats["batched_requests"] += len(items)
+        return job
+
+    def start(self) -> 'MockLLMServer':
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'MockLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local mock OpenAI/Anthropic API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests that are slow outliers")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="Extra seconds for a slow outlier")
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        args.host, args.port, args.latency, args.jitter, args.error_rate, token_latency=args.token_latency,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency
+    )
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
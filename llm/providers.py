@@ -0,0 +1,223 @@
+"""
+Wire formats for the supported model providers.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .types import CompletionRequest, CompletionResponse, LLMError
+
+
+class Provider(ABC):
+    """
+    Translates CompletionRequests to a provider's HTTP API and back.
+    Providers hold no connection state; LLMClient owns the HTTP session.
+    """
+
+    name: str = ""
+    path: str = ""
+    default_base_url: str = ""
+    default_model: str = ""
+    api_key_env: str = ""
+    base_url_env: str = ""
+    batch_path: Optional[str] = None  # Batch endpoint, for providers that have one
+
+    @abstractmethod
+    def headers(self, api_key: str) -> Dict[str, str]:
+        """HTTP headers for a request."""
+        pass
+
+    @abstractmethod
+    def payload(self, request: CompletionRequest, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """JSON body for a request."""
+        pass
+
+    @abstractmethod
+    def parse(self, data: Dict[str, Any]) -> CompletionResponse:
+        """Turn a decoded JSON response into a CompletionResponse."""
+        pass
+
+    @abstractmethod
+    def stream_delta(self, event: Dict[str, Any]) -> Optional[str]:
+        """Text carried by one decoded server-sent event of a streamed response, if any."""
+        pass
+
+    def batch_payload(self, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """JSON body creating a batch job for request payloads, identified by position."""
+        raise NotImplementedError(f"{self.name} has no batch endpoint")
+
+    def batch_status(self, job: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """(finished, results URL) for a decoded batch job."""
+        raise NotImplementedError(f"{self.name} has no batch endpoint")
+
+    def parse_batch_result(self, data: Dict[str, Any]) -> Tuple[int, Union[CompletionResponse, LLMError]]:
+        """(position, response or error) for one line of a batch's results."""
+        raise NotImplementedError(f"{self.name} has no batch endpoint")
+
+
+class OpenAIProvider(Provider):
+    """
+    OpenAI Chat Completions API.
+
+    OpenAI's Batch API needs a file upload and has a 24 hour completion
+    window, so batches for this provider are fanned out over the pool.
+    """
+
+    name = "openai"
+    path = "/v1/chat/completions"
+    default_base_url = "https://api.openai.com"
+    default_model = "gpt-4o-mini"
+    api_key_env = "OPENAI_API_KEY"
+    base_url_env = "OPENAI_BASE_URL"
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+    def payload(self, request: CompletionRequest, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        body = {
+            "model": model,
+            # Automatic prefix caching keys on the leading tokens, so the stable part goes first
+            "messages": [{"role": "system", "content": request.full_system}] + list(request.messages),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if request.stop:
+            body["stop"] = request.stop
+        return body
+
+    def parse(self, data: Dict[str, Any]) -> CompletionResponse:
+        try:
+            text = data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise LLMError(f"Unexpected {self.name} response: {str(data)[:200]}")
+        usage = data.get("usage") or {}
+        return CompletionResponse(
+            text=text,
+            model=data.get("model", ""),
+            input_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+            cached_input_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+            raw=data
+        )
+
+    def stream_delta(self, event: Dict[str, Any]) -> Optional[str]:
+        if "error" in event:
+            raise LLMError(f"{self.name} stream failed: {event['error']}")
+        choices = event.get("choices") or []
+        if choices:
+            return (choices[0].get("delta") or {}).get("content")
+        return None
+
+
+class AnthropicProvider(Provider):
+    """
+    Anthropic Messages API.
+
+    The stable system prefix is sent as its own block marked with
+    cache_control, so repeated calls read it from the prompt cache; the
+    dynamic suffix follows in a separate, uncached block. Batches go to the
+    Message Batches endpoint as a single job.
+    """
+
+    name = "anthropic"
+    path = "/v1/messages"
+    default_base_url = "https://api.anthropic.com"
+    default_model = "claude-3-5-haiku-latest"
+    api_key_env = "ANTHROPIC_API_KEY"
+    base_url_env = "ANTHROPIC_BASE_URL"
+    api_version = "2023-06-01"
+    batch_path = "/v1/messages/batches"
+
+    def __init__(self, cache_system_prefix: bool = True):
+        self.cache_system_prefix = cache_system_prefix
+
+    def system_blocks(self, request: CompletionRequest) -> Union[str, List[Dict[str, Any]]]:
+        """The system field: a plain string, or text blocks with the prefix marked for caching."""
+        if not self.cache_system_prefix or not request.system:
+            return request.full_system
+        blocks: List[Dict[str, Any]] = [
+            {"type": "text", "text": request.system, "cache_control": {"type": "ephemeral"}}
+        ]
+        if request.system_suffix:
+            blocks.append({"type": "text", "text": request.system_suffix})
+        return blocks
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        return {
+            "x-api-key": api_key,
+            "anthropic-version": self.api_version,
+            "Content-Type": "application/json",
+        }
+
+    def payload(self, request: CompletionRequest, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        body = {
+            "model": model,
+            "system": self.system_blocks(request),
+            "messages": list(request.messages),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if request.stop:
+            body["stop_sequences"] = request.stop
+        return body
+
+    def parse(self, data: Dict[str, Any]) -> CompletionResponse:
+        try:
+            text = "".join(block.get("text", "") for block in data["content"] if block.get("type") == "text")
+        except (KeyError, TypeError, AttributeError):
+            raise LLMError(f"Unexpected {self.name} response: {str(data)[:200]}")
+        usage = data.get("usage") or {}
+        return CompletionResponse(
+            text=text,
+            model=data.get("model", ""),
+            # Anthropic reports cached reads and writes separately from input_tokens
+            input_tokens=(
+                usage.get("input_tokens", 0)
+                + usage.get("cache_read_input_tokens", 0)
+                + usage.get("cache_creation_input_tokens", 0)
+            ),
+            output_tokens=usage.get("output_tokens", 0),
+            cached_input_tokens=usage.get("cache_read_input_tokens", 0),
+            raw=data
+        )
+
+    def stream_delta(self, event: Dict[str, Any]) -> Optional[str]:
+        if event.get("type") == "error":
+            raise LLMError(f"{self.name} stream failed: {event.get('error')}")
+        if event.get("type") == "content_block_delta":
+            return (event.get("delta") or {}).get("text")
+        return None
+
+    def batch_payload(self, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"requests": [{"custom_id": str(i), "params": payload} for i, payload in enumerate(payloads)]}
+
+    def batch_status(self, job: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        return job.get("processing_status") == "ended", job.get("results_url")
+
+    def parse_batch_result(self, data: Dict[str, Any]) -> Tuple[int, Union[CompletionResponse, LLMError]]:
+        index = int(data["custom_id"])
+        result = data.get("result") or {}
+        if result.get("type") == "succeeded":
+            try:
+                return index, self.parse(result["message"])
+            except LLMError as e:
+                return index, e
+        outcome = result.get("type", "failed")
+        error = result.get("error") or {}
+        message = (error.get("error") or error).get("message", outcome)
+        return index, LLMError(f"{self.name} batch request {outcome}: {message}")
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+}
+
+
+def get_provider(provider: Union[str, Provider]) -> Provider:
+    """Resolve a provider name (openai, anthropic) or pass a Provider instance through."""
+    if isinstance(provider, Provider):
+        return provider
+    if provider.lower() not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {provider}. Available: {list(PROVIDERS.keys())}")
+    return PROVIDERS[provider.lower()]()
@@ -0,0 +1,388 @@
+"""
+Process-wide scheduling of model calls: rate limits, adaptive concurrency
+and priorities.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .types import DeadlineExceeded
+
+
+class Priority(IntEnum):
+    """Scheduling class of a model call; lower values are served first."""
+    INTERACTIVE = 0  # A person is watching, e.g. web_app.py
+    NORMAL = 1
+    BATCH = 2  # Sweeps and other background work
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute`, holding
+    at most `burst` (default: one minute's worth). Waiters are served in
+    priority order, so a waiting INTERACTIVE call takes the next tokens
+    ahead of BATCH calls that queued first.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(
+        self,
+        amount: float = 1.0,
+        expires: Optional[float] = None,
+        priority: int = Priority.NORMAL
+    ) -> float:
+        """
+        Take `amount` tokens, sleeping until they are available and every
+        waiter ahead of this one, by priority then arrival, has been served.
+        Returns seconds waited. Raises DeadlineExceeded, without taking any
+        tokens, once they cannot be had before `expires` (a time.monotonic()
+        value).
+        """
+        # Requests larger than the bucket would never fit; let them drain it instead
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        with self._condition:
+            entry = (int(priority), next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            # A new head of the queue must be seen by the waiter it displaced
+            self._condition.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = None  # Until notified, while others are ahead
+                    if self._waiters[0] == entry:
+                        if self._tokens >= amount:
+                            self._tokens -= amount
+                            return now - start
+                        delay = (amount - self._tokens) / self.rate
+                    if expires is not None:
+                        if now + (delay or 0.0) > expires:
+                            raise DeadlineExceeded(
+                                f"Rate limit would delay the call past its deadline ({now - start:.2f}s waited)"
+                            )
+                        delay = expires - now if delay is None else delay
+                    self._condition.wait(delay)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def refund(self, amount: float) -> None:
+        """Return tokens that were reserved but not used."""
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+            self._condition.notify_all()
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted AIMD-style, with waiters served in priority order.
+
+    Each successful call raises the limit additively (by about one per
+    limit's worth of calls). A rate limit, a server error, or a latency more
+    than latency_tolerance times the running average (and at least
+    min_latency_excess seconds above it) cuts the limit multiplicatively by
+    `backoff`. Cuts happen at most once per cooldown, so a burst of errors
+    counts as a single congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+        min_latency_excess: float = 1.0,
+        cooldown: float = 1.0
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_excess = min_latency_excess
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.decreases = 0
+
+        self._baseline: Optional[float] = None  # Moving average of successful call latency
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int, threading.Event]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, priority: int = Priority.NORMAL, expires: Optional[float] = None) -> None:
+        """
+        Block until a slot is free, ahead of any waiter with a lower
+        priority. Raises DeadlineExceeded if none is free by `expires`.
+        """
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            event = threading.Event()
+            entry = (int(priority), next(self._sequence), event)
+            heapq.heappush(self._waiters, entry)
+        if event.wait(None if expires is None else max(0.0, expires - time.monotonic())):
+            return
+        with self._lock:
+            if event.is_set():
+                # Granted while timing out; the slot is ours
+                return
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        raise DeadlineExceeded("No concurrency slot became free before the deadline")
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._grant()
+
+    def _grant(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, event = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            event.set()
+
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        """Feed back the outcome of a call."""
+        with self._lock:
+            if not overloaded:
+                if self._baseline is None:
+                    self._baseline = latency
+                overloaded = (
+                    latency > self.latency_tolerance * self._baseline
+                    and latency - self._baseline > self.min_latency_excess
+                )
+                self._baseline += (latency - self._baseline) * 0.05
+
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.minimum), self.limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._grant()
+
+
+@dataclass
+class RateLimits:
+    """Limits for one provider (or provider and model)."""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: int = 64
+    initial_concurrency: int = 8
+
+
+class _Lane:
+    """Rate limiters and concurrency limiter for one (provider, model)."""
+
+    def __init__(self, limits: RateLimits):
+        self.requests = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self.tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        self.limiter = AdaptiveLimiter(
+            initial=min(limits.initial_concurrency, limits.max_concurrency), maximum=limits.max_concurrency
+        )
+        self.paused_until = 0.0
+        self.stats: Dict[str, float] = {"calls": 0, "overloaded": 0, "throttled_seconds": 0.0}
+
+
+class Ticket:
+    """Handle for one scheduled call; report its outcome before the slot is released."""
+
+    def __init__(self, lane: _Lane, reserved_tokens: int):
+        self._lane = lane
+        self._reserved = reserved_tokens
+        self._reported = False
+
+    def report(
+        self,
+        latency: float,
+        overloaded: bool = False,
+        used_tokens: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        Record how the call went. `overloaded` marks rate limits and server
+        errors; `retry_after` pauses the whole lane so concurrent callers do
+        not all retry at once.
+        """
+        self._reported = True
+        lane = self._lane
+        lane.limiter.record(latency, overloaded)
+        if overloaded:
+            lane.stats["overloaded"] += 1
+        if retry_after:
+            lane.paused_until = max(lane.paused_until, time.monotonic() + retry_after)
+        if lane.tokens is not None and used_tokens is not None and used_tokens < self._reserved:
+            lane.tokens.refund(self._reserved - used_tokens)
+
+
+class Scheduler:
+    """
+    Coordinates every model call in the process.
+
+    Calls are grouped into lanes by (provider, model). Each lane has
+    optional request and token buckets (see configure()), an adaptive
+    concurrency limit, and a pause set by Retry-After. A call first waits
+    out the lane's pause and rate limits, then for a concurrency slot;
+    higher-priority callers go first at both.
+
+    LLMClient uses the process default (get_scheduler()) unless given one.
+
+    Example:
+        >>> get_scheduler().configure("anthropic", requests_per_minute=50, tokens_per_minute=40000)
+        >>> client = LLMClient("anthropic", priority=Priority.BATCH)
+    """
+
+    def __init__(self, default_limits: Optional[RateLimits] = None):
+        self.default_limits = default_limits or RateLimits()
+        self._limits: Dict[Tuple[str, Optional[str]], RateLimits] = {}
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 64,
+        initial_concurrency: int = 8
+    ) -> None:
+        """Set limits for a provider, or one model of it; lanes already in use are rebuilt."""
+        limits = RateLimits(requests_per_minute, tokens_per_minute, max_concurrency, initial_concurrency)
+        with self._lock:
+            self._limits[(provider, model)] = limits
+            for key in [key for key in self._lanes if key[0] == provider and (model is None or key[1] == model)]:
+                del self._lanes[key]
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        with self._lock:
+            lane = self._lanes.get((provider, model))
+            if lane is None:
+                limits = (
+                    self._limits.get((provider, model))
+                    or self._limits.get((provider, None))
+                    or self.default_limits
+                )
+                lane = self._lanes[(provider, model)] = _Lane(limits)
+            return lane
+
+    @contextmanager
+    def slot(
+        self,
+        provider: str,
+        model: str,
+        tokens: int = 0,
+        priority: int = Priority.NORMAL,
+        expires: Optional[float] = None
+    ) -> Iterator[Ticket]:
+        """
+        Hold a slot for one call of about `tokens` tokens (prompt plus max
+        output). The lane's pause and rate limits are waited out, in
+        priority order, before a concurrency slot is taken, so no call
+        sleeps while holding one. With `expires` (a time.monotonic() value),
+        every wait here is bounded by it and DeadlineExceeded is raised once
+        it cannot be met; a call that never started is not counted as
+        overload.
+        """
+        lane = self._lane(provider, model)
+        start = time.monotonic()
+        self._throttle(lane, tokens, priority, expires)
+        try:
+            lane.limiter.acquire(priority, expires)
+        except BaseException:
+            self._refund(lane, tokens)
+            raise
+        lane.stats["throttled_seconds"] += time.monotonic() - start
+        lane.stats["calls"] += 1
+        ticket = Ticket(lane, tokens)
+        start = time.monotonic()
+        try:
+            yield ticket
+        except BaseException:
+            if not ticket._reported:
+                ticket.report(time.monotonic() - start, overloaded=True)
+            raise
+        finally:
+            lane.limiter.release()
+
+    @staticmethod
+    def _throttle(lane: _Lane, tokens: int, priority: int, expires: Optional[float]) -> None:
+        """Wait out the lane's Retry-After pause, then take from its rate limits in priority order."""
+        while True:
+            # Re-checked after sleeping, as another caller's Retry-After may have extended it
+            pause = lane.paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            if expires is not None and time.monotonic() + pause > expires:
+                raise DeadlineExceeded(f"Provider asked to retry in {pause:.2f}s, past the call's deadline")
+            time.sleep(pause)
+        if lane.requests is not None:
+            lane.requests.acquire(1, expires, priority)
+        if lane.tokens is not None and tokens:
+            try:
+                lane.tokens.acquire(tokens, expires, priority)
+            except BaseException:
+                if lane.requests is not None:
+                    lane.requests.refund(1)
+                raise
+
+    @staticmethod
+    def _refund(lane: _Lane, tokens: int) -> None:
+        """Give back what _throttle took for a call that was never sent."""
+        if lane.requests is not None:
+            lane.requests.refund(1)
+        if lane.tokens is not None and tokens:
+            lane.tokens.refund(tokens)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-lane counters and current concurrency limits, keyed 'provider/model'."""
+        with self._lock:
+            lanes = dict(self._lanes)
+        return {
+            f"{provider}/{model}": {
+                **lane.stats,
+                "concurrency_limit": lane.limiter.limit,
+                "in_flight": lane.limiter.in_flight,
+            }
+            for (provider, model), lane in lanes.items()
+        }
+
+
+_default_scheduler = Scheduler()
+
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler used by LLMClients that were not given one."""
+    return _default_scheduler
+
+
+def set_scheduler(scheduler: Scheduler) -> None:
+    """Replace the process-wide scheduler."""
+    global _default_scheduler
+    _default_scheduler = scheduler
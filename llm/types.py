@@ -0,0 +1,54 @@
+"""
+Request and response types shared by the LLM client layer.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class CompletionRequest:
+    """
+    A provider-neutral chat completion request.
+
+    The system prompt is split at a cache boundary: `system` is the stable
+    prefix (e.g. an agent's persona) and `system_suffix` the part that changes
+    between calls (e.g. its current position). Providers keep the prefix
+    byte-identical and first so their prompt caches can reuse it.
+    """
+    system: str
+    messages: List[Dict[str, str]]  # [{'role': 'user' | 'assistant', 'content': str}]
+    model: Optional[str] = None  # Defaults to the client's model
+    max_tokens: Optional[int] = None  # Defaults to the client's max_tokens
+    temperature: Optional[float] = None  # Defaults to the client's temperature
+    stop: Optional[List[str]] = None
+    system_suffix: str = ""
+
+    @property
+    def full_system(self) -> str:
+        """The complete system prompt, prefix followed by suffix."""
+        return self.system + self.system_suffix
+
+
+@dataclass
+class CompletionResponse:
+    """Text and usage returned for a CompletionRequest."""
+    text: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0  # Input tokens the provider served from its prompt cache
+    latency: float = 0.0  # Seconds spent waiting on the provider
+    raw: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+
+class LLMError(Exception):
+    """Raised when a provider call fails after all retries."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class DeadlineExceeded(LLMError):
+    """Raised when a call does not finish before its deadline."""
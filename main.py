@@ -3,12 +3,13 @@ Main application for AI Political Agents project.
 """
 
 import argparse
-from typing import List
+from typing import List, Optional
 from agents import HitlerAgent, GandhiAgent, JinnahAgent
-from debates import DebateSimulator
+from debates import DebateSimulator, DebateRepository, JSONLExporter
+from llm import Cassette, LLMClient, ResponseCache
 
 
-def create_agent(agent_name: str):
+def create_agent(agent_name: str, llm_client: Optional[LLMClient] = None):
     """Create an agent by name."""
     agents = {
         "hitler": HitlerAgent,
@@ -19,11 +20,24 @@ def create_agent(agent_name: str):
     if agent_name.lower() not in agents:
         raise ValueError(f"Unknown agent: {agent_name}. Available: {list(agents.keys())}")
     
-    return agents[agent_name.lower()]()
+    return agents[agent_name.lower()](llm_client=llm_client)
 
 
-def run_debate(agent_names: List[str], topic: str, max_rounds: int = 20):
-    """Run a debate between specified agents."""
+def run_debate(
+    agent_names: List[str],
+    topic: str,
+    max_rounds: int = 20,
+    llm_client: Optional[LLMClient] = None,
+    pipeline: bool = False,
+    jsonl_path: Optional[str] = None,
+    db_path: Optional[str] = None
+):
+    """
+    Run a debate between specified agents. With jsonl_path, rounds are
+    streamed to that JSONL file as they happen (compressed for .gz/.zst)
+    instead of exported as JSON at the end. With db_path, the finished
+    debate is also saved to that SQLite debate repository.
+    """
     
     print("=== AI Political Agents Debate ===")
     print(f"Agents: {', '.join(agent_names)}")
@@ -31,21 +45,40 @@ def run_debate(agent_names: List[str], topic: str, max_rounds: int = 20):
     print("=" * 50)
     
     # Create agents
-    agents = [create_agent(name) for name in agent_names]
+    agents = [create_agent(name, llm_client) for name in agent_names]
     
     # Create debate simulator
-    simulator = DebateSimulator(max_rounds=max_rounds, consensus_threshold=0.7)
-    
-    # Run debate
-    result = simulator.debate(
-        agents=agents,
-        topic=topic,
-        initial_context={
-            "historical_period": "1940s",
-            "context": "High-stakes political negotiation",
-            "stakes": "Critical - involves national interests and survival"
-        }
-    )
+    simulator = DebateSimulator(max_rounds=max_rounds, consensus_threshold=0.7, pipeline=pipeline)
+    
+    # Run debate, printing each response as it is streamed
+    print("\n=== DEBATE TRANSCRIPT ===\n")
+    streaming = {"round": None}
+    
+    def print_chunk(round_number: int, speaker: str, chunk: str):
+        if streaming["round"] != round_number:
+            streaming["round"] = round_number
+            print(f"Round {round_number} - {speaker}:")
+        print(chunk, end="", flush=True)
+    
+    exporter = JSONLExporter(jsonl_path) if jsonl_path else None
+    try:
+        for update in simulator.iter_rounds(
+            agents=agents,
+            topic=topic,
+            initial_context={
+                "historical_period": "1940s",
+                "context": "High-stakes political negotiation",
+                "stakes": "Critical - involves national interests and survival"
+            },
+            on_chunk=print_chunk,
+            exporter=exporter
+        ):
+            print("\n")
+            print(f"[consensus: {update.consensus_score:.2f}]\n")
+    finally:
+        if exporter is not None:
+            exporter.close()
+    result = simulator.last_result
     
     # Display results
     print(f"\n=== DEBATE RESULTS ===")
@@ -62,13 +95,17 @@ def run_debate(agent_names: List[str], topic: str, max_rounds: int = 20):
     for disagreement in result.key_disagreements:
         print(f"• {disagreement}")
     
-    print(f"\n=== DEBATE TRANSCRIPT ===")
-    print(simulator.get_debate_transcript())
-    
     # Export data
-    filename = f"{'_'.join(agent_names)}_{topic.replace(' ', '_')}_debate.json"
-    simulator.export_debate_data(filename)
-    print(f"\nDebate data exported to: {filename}")
+    if jsonl_path:
+        print(f"\nDebate data streamed to: {jsonl_path}")
+    else:
+        filename = f"{'_'.join(agent_names)}_{topic.replace(' ', '_')}_debate.json"
+        simulator.export_debate_data(filename)
+        print(f"\nDebate data exported to: {filename}")
+    if db_path:
+        with DebateRepository(db_path) as repository:
+            debate_id = repository.add(result, topic=topic)
+        print(f"Debate saved to {db_path} as #{debate_id}")
     
     return result
 
@@ -93,14 +130,96 @@ def main():
         default=20,
         help="Maximum number of debate rounds"
     )
+    parser.add_argument(
+        "--llm",
+        choices=["openai", "anthropic"],
+        default=None,
+        help="Generate responses with a model provider instead of the built-in templates"
+    )
+    parser.add_argument(
+        "--model",
+        default=None,
+        help="Model name for --llm (default: the provider's default model)"
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="SQLite file for caching model responses across runs"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Seconds a model call may take before the agent falls back to its templates"
+    )
+    parser.add_argument(
+        "--hedge",
+        type=float,
+        default=None,
+        metavar="PERCENTILE",
+        help="Duplicate model calls slower than this latency percentile, e.g. 0.95"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Start each speaker's turn before the previous one finishes (faster with --llm)"
+    )
+    parser.add_argument(
+        "--jsonl",
+        default=None,
+        metavar="PATH",
+        help="Stream rounds to a JSONL file as they happen (.gz/.zst to compress) instead of exporting JSON"
+    )
+    parser.add_argument(
+        "--db",
+        default=None,
+        metavar="PATH",
+        help="Also save the finished debate to this SQLite debate repository"
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        default=None,
+        metavar="CASSETTE",
+        help="Record every model call of the --llm debate to this file"
+    )
+    cassette_group.add_argument(
+        "--replay",
+        default=None,
+        metavar="CASSETTE",
+        help="Replay model calls from a recorded file instead of calling a provider"
+    )
     
     args = parser.parse_args()
+    if args.record and not args.llm:
+        parser.error("--record needs --llm")
     
+    llm_client = None
+    cassette = None
+    if args.llm and not args.replay:
+        cache = ResponseCache(args.cache) if args.cache else None
+        llm_client = LLMClient(
+            args.llm, model=args.model, cache=cache, deadline=args.deadline, hedge_percentile=args.hedge
+        )
+    if args.record or args.replay:
+        cassette = Cassette(args.record or args.replay, llm_client, mode="record" if args.record else "replay")
     try:
-        run_debate(args.agents, args.topic, args.rounds)
+        run_debate(
+            args.agents, args.topic, args.rounds, cassette if cassette is not None else llm_client, args.pipeline,
+            args.jsonl, args.db
+        )
     except Exception as e:
         print(f"Error: {e}")
         return 1
+    finally:
+        if cassette is not None:
+            cassette.close()
+            print(f"Cassette: {cassette.stats['recorded']} recorded, {cassette.stats['replayed']} replayed")
+        if llm_client is not None:
+            llm_client.close()
+            if llm_client.cache is not None:
+                print(f"Response cache: {llm_client.cache.hits} hits, {llm_client.cache.misses} misses")
+                llm_client.cache.close()
     
     return 0
 
@@ -2,8 +2,28 @@
 Test script for the AI Political Agents system.
 """
 
-from agents import HitlerAgent, GandhiAgent, JinnahAgent
-from debates import DebateSimulator
+import asyncio
+import importlib.util
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from agents import HitlerAgent, GandhiAgent, JinnahAgent, HistoryWindow, ExtractiveSummarizer, count_tokens
+from agents.context_window import format_turn
+from agents.agent_factory import create_agent
+from debates import (
+    DebateSimulator, ConsensusMatrix, ConsensusTracker, JSONLExporter, read_rounds, DebateRepository,
+    TranscriptLog, TranscriptLogWriter, RoundStore, NearDuplicateDetector, RepetitionDetector, PositionIndex,
+    ParquetStore
+)
+from debates.batch import scenario_grid, run_batch
+from llm import (
+    Cassette, CompletionRequest, CompletionResponse, DeadlineExceeded, LLMClient, Scheduler, ResponseCache,
+    MicroBatcher, Priority
+)
+from llm.mock_server import MockLLMServer
 
 
 def test_agent_creation():
@@ -41,6 +61,26 @@ def test_consensus_calculation(agents):
         return False
 
 
+def test_consensus_matrix(agents):
+    """Test that the vectorized consensus matrix matches the per-pair scores."""
+    print("\nTesting consensus matrix...")
+    
+    try:
+        scores = ConsensusMatrix(agents).scores()
+        for i, agent1 in enumerate(agents):
+            for j, agent2 in enumerate(agents):
+                expected = agent1.calculate_consensus_score(agent2)
+                if abs(scores[i, j] - expected) > 1e-12:
+                    print(f"✗ {agent1.name} vs {agent2.name}: {scores[i, j]:.4f} != {expected:.4f}")
+                    return False
+        
+        print(f"✓ Consensus matrix matches per-pair scores ({len(agents)}x{len(agents)})")
+        return True
+    except Exception as e:
+        print(f"✗ Error computing consensus matrix: {e}")
+        return False
+
+
 def test_debate_simulation(agents):
     """Test a short debate simulation."""
     print("\nTesting debate simulation...")
@@ -84,6 +124,682 @@ def test_agent_responses(agents):
         return False
 
 
+def test_consensus_tracker():
+    """Test that the incremental tracker matches a naive rescore after traits change."""
+    print("\nTesting consensus tracker...")
+    
+    try:
+        agents = [HitlerAgent(), GandhiAgent(), JinnahAgent()]
+        tracker = ConsensusTracker(agents)
+        agents[1].update_personality(cooperativeness=0.1, dominance=0.9)
+        agents[2].update_position({"territorial_disputes": "Partition along religious lines"})
+        
+        pairs = [(a, b) for i, a in enumerate(agents) for b in agents[i+1:]]
+        naive = sum(a.calculate_consensus_score(b) for a, b in pairs) / len(pairs)
+        matrix = ConsensusMatrix(agents).scores()
+        if abs(tracker.current_score() - naive) > 1e-9 or abs(tracker.matrix.scores() - matrix).max() > 1e-9:
+            print(f"✗ Tracker score {tracker.current_score():.4f} != naive {naive:.4f}")
+            return False
+        
+        print(f"✓ Tracker matches naive rescore after updates: {naive:.4f}")
+        return True
+    except Exception as e:
+        print(f"✗ Error tracking consensus: {e}")
+        return False
+
+
+def test_final_round_update():
+    """Test that the last RoundUpdate of a debate carries its result."""
+    print("\nTesting final round update...")
+    
+    try:
+        simulator = DebateSimulator(max_rounds=4, consensus_threshold=1.1)
+        updates = list(simulator.iter_rounds([GandhiAgent(), JinnahAgent()], "partition_of_india"))
+        
+        if updates[-1].result is None or updates[-1].result is not simulator.last_result:
+            print("✗ Last update has no result")
+            return False
+        if any(update.result is not None for update in updates[:-1]):
+            print("✗ An earlier update has a result")
+            return False
+        
+        print(f"✓ Round {updates[-1].round.round_number} update carries result: {updates[-1].result.status.value}")
+        return True
+    except Exception as e:
+        print(f"✗ Error iterating rounds: {e}")
+        return False
+
+
+def test_jsonl_export():
+    """Test that rounds streamed to JSONL read back with their contexts."""
+    print("\nTesting JSONL export...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "debate.jsonl.gz")
+            simulator = DebateSimulator(max_rounds=4, consensus_threshold=1.1)
+            with JSONLExporter(path) as exporter:
+                result = simulator.debate(
+                    [GandhiAgent(), JinnahAgent()], "partition_of_india", {"test": True}, exporter=exporter
+                )
+            restored = list(read_rounds(path))
+        
+        fields = lambda r: (r.round_number, r.speaker, r.topic, r.response, dict(r.context))
+        if [fields(r) for r in restored] != [fields(r) for r in result.rounds]:
+            print("✗ Rounds read back differ from the debate")
+            return False
+        
+        print(f"✓ {len(restored)} rounds round-tripped through JSONL")
+        return True
+    except Exception as e:
+        print(f"✗ Error exporting rounds: {e}")
+        return False
+
+
+def test_debate_repository():
+    """Test storing debates and querying them by agent and status."""
+    print("\nTesting debate repository...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            with DebateRepository(os.path.join(directory, "debates.sqlite")) as repository:
+                pair = DebateSimulator(max_rounds=3).debate([GandhiAgent(), JinnahAgent()], "partition_of_india")
+                trio = DebateSimulator(max_rounds=3).debate(
+                    [HitlerAgent(), GandhiAgent(), JinnahAgent()], "territorial_disputes"
+                )
+                pair_id, trio_id = repository.add_many([pair, trio])
+                
+                by_agent = [summary.id for summary in repository.find_debates(agent="Adolf Hitler")]
+                by_status = repository.count_debates(status=pair.status)
+                rounds = repository.get_rounds(pair_id, offset=1, limit=2)
+                if by_agent != [trio_id] or by_status < 1 or repository.count_debates(agent="Hitler"):
+                    print(f"✗ Queries returned {by_agent}, {by_status}")
+                    return False
+                if [r.response for r in rounds] != [r.response for r in pair.rounds[1:3]]:
+                    print("✗ Paged rounds differ from the debate")
+                    return False
+                
+                # A failed add() inside a bulk() is undone without aborting the outer block
+                broken = DebateSimulator(max_rounds=2).debate([GandhiAgent(), JinnahAgent()], "partition_of_india")
+                broken.rounds.append(broken.rounds[0])
+                with repository.bulk():
+                    try:
+                        repository.add(broken, agents=["Nobody"])
+                    except sqlite3.IntegrityError:
+                        pass
+                    repository.add(pair)
+                if repository.count_debates() != 3 or "Nobody" in repository.agents():
+                    print(f"✗ {repository.count_debates()} debates stored after a failed nested add")
+                    return False
+        
+        print("✓ Repository queries by agent, status and round page; failed nested add rolled back")
+        return True
+    except Exception as e:
+        print(f"✗ Error in debate repository: {e}")
+        return False
+
+
+def test_transcript_log():
+    """Test appending a debate to the transcript log and reading it back."""
+    print("\nTesting transcript log...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "transcripts.log")
+            result = DebateSimulator(max_rounds=5).debate([GandhiAgent(), JinnahAgent()], "partition_of_india")
+            with TranscriptLogWriter(path) as writer:
+                debate_id = writer.append_debate(result.rounds, topic="partition_of_india")
+            log = TranscriptLog(path)
+            try:
+                rounds = log.get_rounds(debate_id)
+                round_count = log.round_count(debate_id)
+                last = log.get_round(debate_id, round_count).response
+            finally:
+                log.close()
+        
+        fields = lambda r: (r.round_number, r.speaker, r.response)
+        if [fields(r) for r in rounds] != [fields(r) for r in result.rounds] or last != result.rounds[-1].response:
+            print("✗ Transcript log differs from the debate")
+            return False
+        
+        print(f"✓ Transcript log read back {round_count} rounds")
+        return True
+    except Exception as e:
+        print(f"✗ Error in transcript log: {e}")
+        return False
+
+
+def test_round_store():
+    """Test that a RoundStore reads back the same rounds as a list."""
+    print("\nTesting round store...")
+    
+    try:
+        simulator = DebateSimulator(max_rounds=6, consensus_threshold=1.1)
+        rounds = list(simulator.debate([GandhiAgent(), JinnahAgent()], "partition_of_india", {"test": True}).rounds)
+        store = RoundStore(rounds)
+        
+        if store != rounds or list(store[2:5]) != rounds[2:5] or store[-1] != rounds[-1]:
+            print("✗ Round store differs from the list of rounds")
+            return False
+        if any(dict(a.context) != dict(b.context) for a, b in zip(store, rounds)):
+            print("✗ Round store contexts differ")
+            return False
+        
+        print(f"✓ Round store matches {len(rounds)} rounds, slices and contexts")
+        return True
+    except Exception as e:
+        print(f"✗ Error storing rounds: {e}")
+        return False
+
+
+class _ScriptedClient:
+    """Stand-in model client that answers from a script, missing the deadline on 'slow' prompts."""
+    
+    def complete(self, request, deadline=None):
+        prompt = request.messages[-1]["content"]
+        if prompt == "slow":
+            raise DeadlineExceeded("Call missed its deadline")
+        return CompletionResponse(text=f"Answer to {prompt}", model="scripted", latency=0.01)
+
+
+def test_cassette_replay():
+    """Test that a recorded cassette replays responses and deadline misses."""
+    print("\nTesting cassette replay...")
+    
+    try:
+        prompts = ["first", "slow", "second"]
+        
+        def run(client):
+            outcomes = []
+            for prompt in prompts:
+                try:
+                    request = CompletionRequest(system="Scripted", messages=[{"role": "user", "content": prompt}])
+                    outcomes.append(client.complete(request).text)
+                except DeadlineExceeded:
+                    outcomes.append("deadline")
+            return outcomes
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "debate.cassette")
+            with Cassette(path, _ScriptedClient(), mode="record") as cassette:
+                recorded = run(cassette)
+            with Cassette(path, mode="replay") as cassette:
+                replayed = run(cassette)
+        
+        if replayed != recorded or recorded[1] != "deadline":
+            print(f"✗ Replay {replayed} != recording {recorded}")
+            return False
+        
+        print(f"✓ Cassette replayed {len(recorded)} calls, including a deadline miss")
+        return True
+    except Exception as e:
+        print(f"✗ Error replaying cassette: {e}")
+        return False
+
+
+def test_batch_sweep():
+    """Test a small process-pool sweep, with a failing scenario that does not stop it."""
+    print("\nTesting batch sweep...")
+    
+    try:
+        scenarios = scenario_grid(
+            [["gandhi", "jinnah"], ["gandhi", "nobody"]], ["partition_of_india"], max_rounds=[3, 4]
+        )
+        outcomes = sorted(run_batch(scenarios, max_workers=2, keep_rounds=True), key=lambda outcome: outcome.index)
+        
+        if [outcome.index for outcome in outcomes] != list(range(len(scenarios))):
+            print(f"✗ Sweep returned {len(outcomes)} of {len(scenarios)} outcomes")
+            return False
+        for outcome in outcomes:
+            if outcome.ok != ("nobody" not in outcome.scenario.agents):
+                print(f"✗ Scenario {outcome.index} {'succeeded' if outcome.ok else 'failed'} unexpectedly")
+                return False
+            if outcome.ok and not 0 < len(outcome.result.rounds) <= outcome.scenario.max_rounds:
+                print(f"✗ Scenario {outcome.index} kept {len(outcome.result.rounds)} rounds")
+                return False
+        
+        failed = sum(not outcome.ok for outcome in outcomes)
+        print(f"✓ Sweep of {len(scenarios)} scenarios finished, {failed} failed in isolation")
+        return True
+    except Exception as e:
+        print(f"✗ Error in batch sweep: {e}")
+        return False
+
+
+def _mock_client(server, **settings):
+    """Client for the in-process mock server, with its own scheduler so checks do not share limits."""
+    return LLMClient("openai", base_url=server.url, api_key="mock", scheduler=Scheduler(), **settings)
+
+
+def test_async_debates():
+    """Test concurrent model-backed debates on one event loop against the mock server."""
+    print("\nTesting async debates...")
+    
+    try:
+        async def run_all(client):
+            debates = [
+                DebateSimulator(max_rounds=4, consensus_threshold=1.1).adebate(
+                    [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india"
+                )
+                for _ in range(6)
+            ]
+            simulator = DebateSimulator(max_rounds=4, consensus_threshold=1.1)
+            updates = [
+                update async for update in simulator.aiter_rounds(
+                    [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india"
+                )
+            ]
+            return await asyncio.gather(*debates), updates
+        
+        with MockLLMServer(latency=0.02) as server:
+            with _mock_client(server, max_concurrency=16) as client:
+                results, updates = asyncio.run(run_all(client))
+                expected = DebateSimulator(max_rounds=4, consensus_threshold=1.1).debate(
+                    [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india"
+                )
+        
+        transcript = [r.response for r in expected.rounds]
+        if any([r.response for r in result.rounds] != transcript for result in results):
+            print("✗ Async debates differ from the synchronous debate")
+            return False
+        if [update.round.response for update in updates] != transcript or updates[-1].result is None:
+            print("✗ Async round updates differ from the synchronous debate")
+            return False
+        
+        print(f"✓ {len(results)} concurrent async debates match the synchronous transcript")
+        return True
+    except Exception as e:
+        print(f"✗ Error in async debates: {e}")
+        return False
+
+
+def test_near_duplicate_detector():
+    """Test that paraphrased repetition is flagged as a deadlock and distinct turns are not."""
+    print("\nTesting near-duplicate deadlock detection...")
+    
+    try:
+        stances = [
+            "India must remain one nation and partition will only bring bloodshed to {} brothers",
+            "Muslims need a separate homeland with guaranteed rights and {} self-governance",
+        ]
+        paraphrases = [stances[i % 2].format(word) for i, word in enumerate(["our", "my", "all", "the", "such"])]
+        distinct = [
+            "Trade between villages should be free of tariffs",
+            "The army must be reduced to a police force",
+            "Temples and mosques should share the same square",
+            "Education should be taught in the mother tongue",
+            "Salt must not be taxed by any government",
+        ]
+        
+        outcomes = {}
+        for name, responses in (("paraphrases", paraphrases), ("distinct", distinct)):
+            near, exact = NearDuplicateDetector(window=5, max_unique=2), RepetitionDetector(window=5, max_unique=2)
+            for response in responses:
+                near.observe(response)
+                exact.observe(response)
+            outcomes[name] = (near.is_deadlocked(), exact.is_deadlocked())
+        
+        if outcomes != {"paraphrases": (True, False), "distinct": (False, False)}:
+            print(f"✗ Detector outcomes {outcomes}")
+            return False
+        
+        print("✓ Paraphrased repetition flagged; exact-match detector and distinct turns are not")
+        return True
+    except Exception as e:
+        print(f"✗ Error detecting near duplicates: {e}")
+        return False
+
+
+def test_position_index():
+    """Test agreement analysis across three or more agents against a naive pairwise check."""
+    print("\nTesting position index...")
+    
+    try:
+        positions = {
+            "A": {"trade": "open all ports to free trade", "army": "disband the army", "salt": "abolish the salt tax"},
+            "B": {"trade": "open all ports to free trade", "army": "disband the army now"},
+            "C": {"trade": "open all ports to free trade now", "army": "double the army"},
+            "D": {"trade": "open all the ports to free trade"},
+        }
+        
+        def jaccard(a, b):
+            a, b = set(a.lower().split()), set(b.lower().split())
+            return len(a & b) / len(a | b)
+        
+        expected = {}
+        for topic in ("trade", "army", "salt"):
+            held = [agent_positions[topic] for agent_positions in positions.values() if topic in agent_positions]
+            if len(held) >= 2:
+                expected[topic] = all(jaccard(a, b) >= 0.7 for i, a in enumerate(held) for b in held[i+1:])
+        
+        agreements, disagreements = PositionIndex(positions).analyze()
+        topic_of = lambda line: line.split(":")[0].split(" on ")[1]
+        analyzed = {**{topic_of(line): True for line in agreements}, **{topic_of(line): False for line in disagreements}}
+        if analyzed != expected:
+            print(f"✗ Analysis {analyzed} != naive {expected}")
+            return False
+        
+        # Agreements are worked out lazily, so the result must not see positions changed after the debate
+        agents = [HitlerAgent(), GandhiAgent(), JinnahAgent()]
+        result = DebateSimulator(max_rounds=3).debate(agents, "territorial_disputes")
+        snapshot = PositionIndex({agent.name: dict(agent.current_position) for agent in agents}).analyze()
+        for agent in agents:
+            agent.update_position({topic: "total agreement" for topic in agent.current_position})
+        if (list(result.key_agreements), list(result.key_disagreements)) != snapshot:
+            print("✗ Key agreements changed after the debate ended")
+            return False
+        
+        print(f"✓ Position index matches naive analysis for {len(positions)} agents")
+        return True
+    except Exception as e:
+        print(f"✗ Error analyzing positions: {e}")
+        return False
+
+
+def test_response_cache():
+    """Test that a second run of the same debate is served from the cache file with no model calls."""
+    print("\nTesting response cache...")
+    
+    try:
+        def run(server, path):
+            with ResponseCache(path) as cache, _mock_client(server, cache=cache) as client:
+                result = DebateSimulator(max_rounds=4, consensus_threshold=1.1).debate(
+                    [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india"
+                )
+                return [r.response for r in result.rounds], cache.hits, cache.misses
+        
+        with tempfile.TemporaryDirectory() as directory, MockLLMServer() as server:
+            path = os.path.join(directory, "responses.sqlite")
+            first, _, first_misses = run(server, path)
+            requests_made = server.stats["requests"]
+            second, hits, misses = run(server, path)
+        
+        if second != first or server.stats["requests"] != requests_made or misses or hits != first_misses:
+            print(f"✗ Second run made {server.stats['requests'] - requests_made} calls, {hits} hits, {misses} misses")
+            return False
+        
+        print(f"✓ Second run served {hits} responses from the cache file, no model calls")
+        return True
+    except Exception as e:
+        print(f"✗ Error in response cache: {e}")
+        return False
+
+
+def test_history_window():
+    """Test that a long history is compacted in chunks and its prompt stays within budget."""
+    print("\nTesting history window...")
+    
+    try:
+        class CountingSummarizer(ExtractiveSummarizer):
+            def __init__(self):
+                super().__init__()
+                self.summarized = 0
+            
+            def summarize(self, previous, turns, budget):
+                self.summarized += len(turns)
+                return super().summarize(previous, turns, budget)
+        
+        summarizer = CountingSummarizer()
+        window = HistoryWindow(token_budget=1000, min_recent_turns=2, summary_budget=200, summarizer=summarizer)
+        history = []
+        largest = 0
+        for turn in range(60):
+            history.append({"speaker": f"Agent {turn % 3}", "content": f"Statement {turn}. " + "word " * 70})
+            summary, recent = window.render(history)
+            largest = max(largest, count_tokens(summary) + sum(count_tokens(format_turn(e)) for e in recent))
+            if window.compacted_turns + len(recent) != len(history):
+                print(f"✗ Turn {turn}: {window.compacted_turns} summarized + {len(recent)} verbatim != {len(history)}")
+                return False
+        
+        if largest > window.token_budget or summarizer.summarized != window.compacted_turns:
+            print(f"✗ Prompt reached {largest} tokens; {summarizer.summarized} turns summarized")
+            return False
+        if not 0 < window.compactions < len(history) // 3:
+            print(f"✗ {window.compactions} compactions for {len(history)} turns")
+            return False
+        
+        print(f"✓ {len(history)} turns kept within {largest} tokens with {window.compactions} compactions")
+        return True
+    except Exception as e:
+        print(f"✗ Error windowing history: {e}")
+        return False
+
+
+def test_micro_batcher():
+    """Test that an assembly vote through a MicroBatcher is coalesced and fanned out over the pool."""
+    print("\nTesting micro-batching...")
+    
+    try:
+        with MockLLMServer() as server:
+            client = LLMClient("anthropic", base_url=server.url, api_key="mock", scheduler=Scheduler())
+            delegates = [
+                create_agent(f"Delegate {i}", "democracy", {}, "1940s", [], "Indian") for i in range(8)
+            ]
+            proposer = GandhiAgent()
+            proposal = "Hold a plebiscite in every disputed province"
+            
+            for delegate in delegates:
+                delegate.llm_client = client
+            direct = DebateSimulator().poll_assembly(proposal, proposer, delegates)
+            requests_made = server.stats["requests"]
+            
+            with MicroBatcher(client, max_wait=0.2) as batcher:
+                for delegate in delegates:
+                    delegate.llm_client = batcher
+                batched = DebateSimulator().poll_assembly(proposal, proposer, delegates)
+            client.close()
+        
+        if batched != direct or batcher.stats["batches"] > 2 or client.stats["batches"]:
+            print(f"✗ {batcher.stats['batches']} batches, {client.stats['batches']} batch jobs")
+            return False
+        if server.stats["requests"] - requests_made != len(delegates) or server.stats["batched_requests"]:
+            print(f"✗ Server saw {server.stats['requests'] - requests_made} requests")
+            return False
+        
+        print(f"✓ {len(delegates)} votes coalesced into {batcher.stats['batches']} batch(es), fanned out over the pool")
+        return True
+    except Exception as e:
+        print(f"✗ Error in micro-batching: {e}")
+        return False
+
+
+def test_pipelined_debate():
+    """Test that a pipelined debate overlaps model calls and keeps the sequential turn order."""
+    print("\nTesting pipelined debate...")
+    
+    try:
+        def run(client, pipeline):
+            simulator = DebateSimulator(max_rounds=6, consensus_threshold=1.1, pipeline=pipeline)
+            start = time.perf_counter()
+            rounds = [
+                update.round for update in simulator.iter_rounds(
+                    [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india"
+                )
+            ]
+            return rounds, time.perf_counter() - start
+        
+        with MockLLMServer(latency=0.1) as server, _mock_client(server) as client:
+            sequential, sequential_time = run(client, False)
+            requests_made = server.stats["requests"]
+            pipelined, pipelined_time = run(client, True)
+            speculative = server.stats["requests"] - requests_made - len(pipelined)
+        
+        order = lambda rounds: [(r.round_number, r.speaker) for r in rounds]
+        if order(pipelined) != order(sequential) or speculative not in (0, 1):
+            print(f"✗ Pipelined turns {order(pipelined)} != {order(sequential)}")
+            return False
+        if pipelined_time > 0.85 * sequential_time:
+            print(f"✗ Pipelined debate took {pipelined_time:.2f}s against {sequential_time:.2f}s")
+            return False
+        
+        print(f"✓ Pipelined debate took {pipelined_time:.2f}s against {sequential_time:.2f}s, same turn order")
+        return True
+    except Exception as e:
+        print(f"✗ Error in pipelined debate: {e}")
+        return False
+
+
+def test_scheduler_priorities():
+    """Test that rate-limited calls wait by priority without holding a slot, and unused tokens are refunded."""
+    print("\nTesting scheduler priorities...")
+    
+    try:
+        scheduler = Scheduler()
+        scheduler.configure("mock", requests_per_minute=600, max_concurrency=1, initial_concurrency=1)
+        for _ in range(600):
+            with scheduler.slot("mock", "model") as ticket:
+                ticket.report(0.0)
+        
+        order = []
+        
+        def call(priority, name):
+            with scheduler.slot("mock", "model", priority=priority) as ticket:
+                order.append(name)
+                ticket.report(0.0)
+        
+        threads = [threading.Thread(target=call, args=(Priority.BATCH, f"batch {i}")) for i in range(3)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        waiting = scheduler.stats()["mock/model"]["in_flight"]
+        threads.append(threading.Thread(target=call, args=(Priority.INTERACTIVE, "interactive")))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+        if order[0] != "interactive" or waiting != 0:
+            print(f"✗ Served in order {order}, with {waiting} slots held while rate-limited")
+            return False
+        
+        # Each call reserves prompt plus max_tokens; without refunds the second would wait about a minute
+        with MockLLMServer() as server:
+            client = _mock_client(server, max_tokens=2500, deadline=2.0)
+            client.scheduler.configure("openai", tokens_per_minute=3000)
+            request = CompletionRequest(system="You are terse.", messages=[{"role": "user", "content": "Hello"}])
+            for _ in range(2):
+                client.complete(request)
+        
+        print(f"✓ Served in order {order}; unused token reservations refunded")
+        return True
+    except Exception as e:
+        print(f"✗ Error scheduling calls: {e}")
+        return False
+
+
+def test_streamed_debate():
+    """Test that on_chunk receives each response in pieces, on the calling thread, sequential or pipelined."""
+    print("\nTesting streamed debate...")
+    
+    try:
+        with MockLLMServer(token_latency=0.001) as server, _mock_client(server) as client:
+            for pipeline in (False, True):
+                chunks = {}
+                threads = set()
+                
+                def on_chunk(round_number, speaker, chunk):
+                    chunks.setdefault((round_number, speaker), []).append(chunk)
+                    threads.add(threading.get_ident())
+                
+                simulator = DebateSimulator(max_rounds=4, consensus_threshold=1.1, pipeline=pipeline)
+                rounds = [
+                    update.round for update in simulator.iter_rounds(
+                        [GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)], "partition_of_india",
+                        on_chunk=on_chunk
+                    )
+                ]
+                for r in rounds:
+                    pieces = chunks.get((r.round_number, r.speaker), [])
+                    if len(pieces) < 2 or "".join(pieces) != r.response:
+                        print(f"✗ Round {r.round_number} streamed as {len(pieces)} chunks not matching its response")
+                        return False
+                if threads != {threading.get_ident()}:
+                    print(f"✗ Chunks delivered on {len(threads)} threads (pipeline={pipeline})")
+                    return False
+        
+        print(f"✓ {len(rounds)} rounds streamed in {sum(len(p) for p in chunks.values())} chunks on the caller's thread")
+        return True
+    except Exception as e:
+        print(f"✗ Error streaming debate: {e}")
+        return False
+
+
+def test_hedging_and_deadlines():
+    """Test that slow outliers are hedged, and agents fall back to templates when a call misses its deadline."""
+    print("\nTesting hedging and deadlines...")
+    
+    try:
+        with MockLLMServer(latency=0.01, slow_rate=0.1, slow_latency=0.5, seed=1) as server:
+            client = _mock_client(server, hedge_percentile=0.5, hedge_min_samples=5)
+            start = time.perf_counter()
+            for i in range(40):
+                request = CompletionRequest(system="You are terse.", messages=[{"role": "user", "content": f"Q{i}"}])
+                client.complete(request)
+            elapsed = time.perf_counter() - start
+            hedges = client.stats["hedges"]
+            if hedges == 0 or client.stats["hedge_wins"] == 0:
+                print(f"✗ {server.stats['slow']} slow responses but {hedges} hedges")
+                return False
+        
+        with MockLLMServer(latency=0.5) as server:
+            client = _mock_client(server, deadline=0.1)
+            gandhi, jinnah = GandhiAgent(llm_client=client), JinnahAgent(llm_client=client)
+            context = {"round": 1, "topic": "partition_of_india"}
+            response = gandhi.generate_response("partition_of_india", [jinnah], context)
+            if response != gandhi.template_response("partition_of_india", [jinnah], context):
+                print("✗ Response after a missed deadline is not the template response")
+                return False
+            if client.stats["deadlines_missed"] != 1:
+                print(f"✗ {client.stats['deadlines_missed']} deadlines missed, expected 1")
+                return False
+        
+        print(f"✓ 40 calls with {hedges} hedges took {elapsed:.2f}s; a missed deadline fell back to the template")
+        return True
+    except Exception as e:
+        print(f"✗ Error hedging calls: {e}")
+        return False
+
+
+def test_parquet_store():
+    """Test that debates written to the Parquet store read back by partition and column (needs pyarrow)."""
+    print("\nTesting Parquet store...")
+    
+    if importlib.util.find_spec("pyarrow") is None:
+        print("✓ Skipped: pyarrow is not installed")
+        return True
+    
+    try:
+        simulator = DebateSimulator(max_rounds=4, consensus_threshold=1.1)
+        results = {
+            topic: simulator.debate([GandhiAgent(), JinnahAgent()], topic)
+            for topic in ("partition_of_india", "territorial_disputes")
+        }
+        with tempfile.TemporaryDirectory() as root:
+            with ParquetStore(root) as store:
+                ids = {topic: store.add(result, topic=topic) for topic, result in results.items()}
+            
+            debates = ParquetStore(root).read_debates(columns=["debate_id", "rounds"], topic="partition_of_india")
+            rounds = ParquetStore(root).read_rounds(
+                columns=["round_number", "speaker"], debate_id=ids["partition_of_india"]
+            )
+        
+        expected = results["partition_of_india"].rounds
+        if debates.column("debate_id").to_pylist() != [ids["partition_of_india"]]:
+            print(f"✗ Topic filter returned {debates.num_rows} debates")
+            return False
+        if debates.column("rounds").to_pylist() != [len(expected)] or store.files_written != 2:
+            print(f"✗ Stored {debates.column('rounds').to_pylist()} rounds in {store.files_written} writes")
+            return False
+        stored = sorted(zip(rounds.column("round_number").to_pylist(), rounds.column("speaker").to_pylist()))
+        if stored != [(r.round_number, r.speaker) for r in expected]:
+            print(f"✗ Read back rounds {stored}")
+            return False
+        
+        print(f"✓ {len(results)} debates stored in one flush; {len(stored)} rounds read back by debate_id")
+        return True
+    except Exception as e:
+        print(f"✗ Error in Parquet store: {e}")
+        return False
+
+
 def main():
     """Run all tests."""
     print("=== AI Political Agents System Test ===\n")
@@ -99,6 +815,10 @@ def main():
         print("❌ Consensus calculation failed.")
         return
     
+    if not test_consensus_matrix(agents):
+        print("❌ Consensus matrix failed.")
+        return
+    
     # Test agent responses
     if not test_agent_responses(agents):
         print("❌ Agent response generation failed.")
@@ -109,6 +829,32 @@ def main():
         print("❌ Debate simulation failed.")
         return
     
+    checks = [
+        (test_consensus_tracker, "Consensus tracker"),
+        (test_final_round_update, "Final round update"),
+        (test_jsonl_export, "JSONL export"),
+        (test_debate_repository, "Debate repository"),
+        (test_transcript_log, "Transcript log"),
+        (test_round_store, "Round store"),
+        (test_cassette_replay, "Cassette replay"),
+        (test_batch_sweep, "Batch sweep"),
+        (test_async_debates, "Async debates"),
+        (test_near_duplicate_detector, "Near-duplicate detection"),
+        (test_position_index, "Position index"),
+        (test_response_cache, "Response cache"),
+        (test_history_window, "History window"),
+        (test_micro_batcher, "Micro-batching"),
+        (test_pipelined_debate, "Pipelined debate"),
+        (test_scheduler_priorities, "Scheduler priorities"),
+        (test_streamed_debate, "Streamed debate"),
+        (test_hedging_and_deadlines, "Hedging and deadlines"),
+        (test_parquet_store, "Parquet store"),
+    ]
+    for check, name in checks:
+        if not check():
+            print(f"❌ {name} failed.")
+            return
+    
     print("\n✅ All tests passed! The system is working correctly.")
     
     # Run a sample debate
@@ -4,12 +4,13 @@ Web interface for AI Political Agents using Streamlit.
 
 import streamlit as st
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from agents import HitlerAgent, GandhiAgent, JinnahAgent
-from debates import DebateSimulator
+from debates import DebateSimulator, DebateRepository, DebateStatus, TranscriptLog, TranscriptLogWriter
+from llm import LLMClient, Priority
 
 
-def create_agent(agent_name: str):
+def create_agent(agent_name: str, llm_client: Optional[LLMClient] = None):
     """Create an agent by name."""
     agents = {
         "Hitler": HitlerAgent,
@@ -17,7 +18,85 @@ def create_agent(agent_name: str):
         "Jinnah": JinnahAgent,
     }
     
-    return agents[agent_name]()
+    return agents[agent_name](llm_client=llm_client)
+
+
+@st.cache_resource
+def get_llm_client(provider: str) -> LLMClient:
+    """One pooled client per provider, shared by every session of the app."""
+    # Interactive priority: the shared scheduler serves these calls ahead of batch sweeps
+    return LLMClient(provider, priority=Priority.INTERACTIVE)
+
+
+@st.cache_resource
+def get_repository(path: str) -> DebateRepository:
+    """One connection per archive file, shared by every session of the app."""
+    return DebateRepository(path)
+
+
+@st.cache_resource
+def get_transcript_writer(path: str) -> TranscriptLogWriter:
+    """One writer per transcript log; its appends are serialized across sessions."""
+    return TranscriptLogWriter(path)
+
+
+@st.cache_resource
+def get_transcript_log(path: str) -> TranscriptLog:
+    """Memory-mapped reader of a transcript log, remapped as the log grows."""
+    return TranscriptLog(path)
+
+
+def render_archive(repository: DebateRepository, page_size: int = 10):
+    """Browse stored debates a page at a time, loading rounds only for the opened debate."""
+    st.header("📚 Debate Archive")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        topic_filter = st.selectbox("Topic:", ["Any"] + repository.topics())
+    with col2:
+        status_filter = st.selectbox("Status:", ["Any"] + [status.value for status in DebateStatus])
+    with col3:
+        agent_filter = st.selectbox("Agent:", ["Any"] + repository.agents())
+    
+    filters = {
+        "topic": None if topic_filter == "Any" else topic_filter,
+        "status": None if status_filter == "Any" else status_filter,
+        "agent": None if agent_filter == "Any" else agent_filter,
+    }
+    total = repository.count_debates(**filters)
+    if not total:
+        st.info("No stored debates match these filters.")
+        return
+    
+    pages = (total + page_size - 1) // page_size
+    page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1)
+    summaries = repository.find_debates(**filters, limit=page_size, offset=(page - 1) * page_size)
+    st.dataframe(
+        [
+            {
+                "ID": summary.id,
+                "Topic": summary.topic,
+                "Agents": ", ".join(summary.agents),
+                "Status": summary.status,
+                "Consensus": round(summary.consensus_score, 2),
+                "Rounds": summary.rounds,
+                "Started": summary.started.strftime("%Y-%m-%d %H:%M"),
+            }
+            for summary in summaries
+        ],
+        use_container_width=True
+    )
+    
+    debate_id = st.selectbox("Open debate:", [summary.id for summary in summaries])
+    summary = next(summary for summary in summaries if summary.id == debate_id)
+    round_pages = max(1, (summary.rounds + page_size - 1) // page_size)
+    round_page = st.number_input(
+        f"Transcript page (of {round_pages}):", min_value=1, max_value=round_pages, value=1
+    )
+    for round_data in repository.get_rounds(debate_id, offset=(round_page - 1) * page_size, limit=page_size):
+        st.write(f"**Round {round_data.round_number} - {round_data.speaker}:**")
+        st.write(round_data.response)
+        st.write("---")
 
 
 def main():
@@ -53,6 +132,25 @@ def main():
         with st.expander("Advanced Settings"):
             max_rounds = st.slider("Max Rounds:", 5, 30, 15)
             consensus_threshold = st.slider("Consensus Threshold:", 0.1, 1.0, 0.7)
+            engine = st.selectbox(
+                "Response Engine:",
+                ["Templates", "openai", "anthropic"],
+                help="Generate responses with a model provider instead of the built-in templates"
+            )
+            archive_path = st.text_input(
+                "Debate Archive:",
+                value="debates.sqlite",
+                help="SQLite file that finished debates are saved to and browsed from"
+            )
+            save_debates = st.checkbox("Save debates to archive", value=False)
+            show_archive = st.checkbox("Browse debate archive", value=False)
+            log_transcripts = st.checkbox("Append transcripts to log", value=False)
+            transcript_path = st.text_input(
+                "Transcript Log:",
+                value="transcripts.log",
+                help="Append-only log that transcripts are paged from"
+            )
+            transcript_page_size = st.slider("Rounds per Transcript Page:", 5, 50, 10)
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -64,7 +162,8 @@ def main():
                 return
             
             # Create agents
-            agents = [create_agent(name) for name in selected_agents]
+            llm_client = get_llm_client(engine) if engine != "Templates" else None
+            agents = [create_agent(name, llm_client) for name in selected_agents]
             
             # Create debate simulator
             simulator = DebateSimulator(
@@ -72,21 +171,46 @@ def main():
                 consensus_threshold=consensus_threshold
             )
             
-            # Run debate
-            with st.spinner("Running debate simulation..."):
-                result = simulator.debate(
-                    agents=agents,
-                    topic=topic,
-                    initial_context={
-                        "historical_period": "1940s",
-                        "context": "High-stakes political negotiation",
-                        "stakes": "Critical - involves national interests"
-                    }
+            # Run debate, rendering each response as it is streamed
+            progress = st.progress(0.0, text="Running debate simulation...")
+            live_rounds = st.container()
+            streaming = {"round": None, "text": "", "placeholder": None}
+            
+            def render_chunk(round_number: int, speaker: str, chunk: str):
+                if streaming["round"] != round_number:
+                    with live_rounds:
+                        st.write(f"**Round {round_number} - {speaker}:**")
+                        streaming.update(round=round_number, text="", placeholder=st.empty())
+                streaming["text"] += chunk
+                streaming["placeholder"].markdown(streaming["text"])
+            
+            for update in simulator.iter_rounds(
+                agents=agents,
+                topic=topic,
+                initial_context={
+                    "historical_period": "1940s",
+                    "context": "High-stakes political negotiation",
+                    "stakes": "Critical - involves national interests"
+                },
+                on_chunk=render_chunk
+            ):
+                progress.progress(
+                    update.round.round_number / max_rounds,
+                    text=f"Round {update.round.round_number} - consensus {update.consensus_score:.2f}"
                 )
+            progress.empty()
+            live_rounds.empty()
+            result = simulator.last_result
+            if save_debates:
+                get_repository(archive_path).add(result, topic=topic)
             
-            # Store result in session state
+            # Store result in session state; a logged transcript is read back from the log page by page
             st.session_state.debate_result = result
             st.session_state.simulator = simulator
+            st.session_state.transcript = (
+                transcript_path,
+                get_transcript_writer(transcript_path).append_debate(result.rounds, topic=topic)
+            ) if log_transcripts else None
     
     with col2:
         st.header("Quick Scenarios")
@@ -144,8 +268,21 @@ def main():
         # Debate transcript
         st.subheader("📝 Debate Transcript")
         
-        with st.expander("View Full Transcript", expanded=True):
-            for i, round_data in enumerate(result.rounds):
+        with st.expander("View Transcript", expanded=True):
+            transcript = st.session_state.get("transcript")
+            if transcript is not None:
+                transcript_log = get_transcript_log(transcript[0])
+                round_count = transcript_log.round_count(transcript[1])
+            else:
+                round_count = len(result.rounds)
+            pages = max(1, (round_count + transcript_page_size - 1) // transcript_page_size)
+            page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1, key="transcript_page")
+            start = (page - 1) * transcript_page_size
+            if transcript is not None:
+                page_rounds = transcript_log.get_rounds(transcript[1], offset=start, limit=transcript_page_size)
+            else:
+                page_rounds = result.rounds[start:start + transcript_page_size]
+            for round_data in page_rounds:
                 st.write(f"**Round {round_data.round_number} - {round_data.speaker}:**")
                 st.write(round_data.response)
                 st.write("---")
@@ -184,6 +321,10 @@ def main():
                 mime="text/plain"
             )
     
+    # Past debates, read from the archive a page at a time; the archive is only opened when asked for
+    if show_archive:
+        render_archive(get_repository(archive_path))
+    
     # Footer
     st.markdown("---")
     st.markdown(